@@ -1,10 +1,16 @@
+import asyncio
 import os
 import json
 import requests
-from .http import HTTPClient
+from typing import TYPE_CHECKING, AsyncIterator, Iterator, Union
+from .async_http import AsyncHTTPClient
+from .http import HTTPClient, Page, PageNumberPaginator
 import pandas as pd
 import logging
 
+if TYPE_CHECKING:
+    import httpx
+
 # logging
 logger = logging.getLogger(__name__)
 
@@ -22,14 +28,14 @@ class ActionNetworkClient(HTTPClient):
     def create_session(self) -> requests.Session:
         """Creates ActionNetwork session"""
         headers = {"OSDI-API-Token": self.api_token, "Content-Type": "application/json"}
-        session = requests.Session()
+        session = super().create_session()
         session.headers.update(headers)
         return session
 
     def transform_response(self, response: requests.Response, **kwargs) -> dict:
         """Transforms ActionNetwork response into dict"""
         try:
-            data = response.json() or {}
+            data = self.decode_json(response) or {}
         except json.decoder.JSONDecodeError:
             data = {}
         data["status_code"] = response.status_code
@@ -38,8 +44,9 @@ class ActionNetworkClient(HTTPClient):
     def check_response_for_rate_limit(
         self, response: requests.Response
     ) -> [int, float, None]:
-        """Checks ActionNetwork response for rate limit, always returns 1"""
-        return 1
+        """Checks ActionNetwork response for rate limit headers, falling back to 1 second"""
+        rate_wait = super().check_response_for_rate_limit(response)
+        return 1 if rate_wait is None else rate_wait
 
     @staticmethod
     def extract_action_network_id(identifiers: list[str]) -> str:
@@ -98,42 +105,119 @@ class ActionNetworkClient(HTTPClient):
             )
         return pd.DataFrame(rows)
 
-    def paginate_endpoint(
-        self, base_endpoint: str, embedded_key: str, max_pages: int = None, **kwargs
-    ) -> list[dict]:
+    def iter_endpoint(
+        self,
+        base_endpoint: str,
+        embedded_key: str,
+        max_pages: int = None,
+        by_page: bool = False,
+        prefetch: int = 1,
+        **kwargs,
+    ) -> Iterator[Union[dict, list[dict]]]:
         """
-        Generic pagination helper for Action Network endpoints that return the "_embedded" resource, which all endpoints
-        that are collections of items (i.e. forms, events, submissions, etc.) do
+        Lazily yields the "_embedded" items of an Action Network collection as pages
+        arrive, so memory stays flat however big the collection is
+
+        Upcoming pages are fetched in the background while the current one is processed.
 
         :param base_endpoint: the endpoint to paginate (i.e "forms" )
         :param embedded_key: the expected key inside the "_embedded" object
                              (i.e "osdi:submissions" for base_endpoint "forms/{form_id}/submissions"
                               or   "osdi:forms" for base_endpoint "forms")
         :param max_pages: optional parameter to limit the number of pages (can be used for testing)
-        :return: list of embedded items from all pages
+        :param by_page: `False` by default, set `True` to yield each page's list of items instead
+        :param prefetch: pages fetched ahead in the background, 0 to fetch one at a time
+        :return: generator of embedded items, or of lists of them when by_page
         """
-        results = []
-        page = 1
+        paginator = self.create_paginator(
+            base_endpoint,
+            embedded_key,
+            max_pages=max_pages,
+            prefetch=prefetch,
+            **kwargs,
+        )
+        for page in paginator.pages():
+            if self.is_last_page(page, embedded_key):
+                return
+
+            if by_page:
+                yield page.items
+            else:
+                yield from page.items
+
+    def create_paginator(
+        self,
+        base_endpoint: str,
+        embedded_key: str,
+        max_pages: int = None,
+        prefetch: int = 1,
+        **kwargs,
+    ) -> PageNumberPaginator:
+        """
+        Paginator over the "_embedded" items of a collection, fetching pages with get
 
-        while True:
-            full_endpoint = f"{base_endpoint}?page={page}"
-            data = self.get(full_endpoint, **kwargs)
+        On AsyncActionNetworkClient the fetches return coroutines, for iter_pages.
 
-            embedded = data.get("_embedded", {})
-            items = embedded.get(embedded_key, [])
-            if not items:
-                # should flag end of pagination
-                logger.debug(f"No items found at page {page} for key '{embedded_key}'")
-                break
+        :param base_endpoint: the endpoint to paginate (i.e "forms" )
+        :param embedded_key: the expected key inside the "_embedded" object
+        :param max_pages: optional parameter to limit the number of pages
+        :param prefetch: pages fetched ahead in the background, 0 to fetch one at a time
+        :return: paginator
+        """
+        return PageNumberPaginator(
+            lambda page: self.get(f"{base_endpoint}?page={page}", **kwargs),
+            lambda data: data.get("_embedded", {}).get(embedded_key, []),
+            max_pages=max_pages,
+            prefetch=prefetch,
+        )
+
+    @staticmethod
+    def is_last_page(page: Page, embedded_key: str) -> bool:
+        """
+        Check for the empty page that ends pagination
+
+        :param page: fetched page
+        :param embedded_key: the expected key inside the "_embedded" object
+        :return: `True` if there are no more items
+        """
+        if page.items:
+            return False
 
-            results.extend(items)
+        # should flag end of pagination
+        logger.debug(f"No items found at page {page.request} for key '{embedded_key}'")
+        return True
 
-            if max_pages is not None and page >= max_pages:
-                break
+    def paginate_endpoint(
+        self,
+        base_endpoint: str,
+        embedded_key: str,
+        max_pages: int = None,
+        prefetch: int = 1,
+        **kwargs,
+    ) -> list[dict]:
+        """
+        Generic pagination helper for Action Network endpoints that return the "_embedded" resource, which all endpoints
+        that are collections of items (i.e. forms, events, submissions, etc.) do
 
-            page += 1
+        Use iter_endpoint for collections too big to hold in memory.
 
-        return results
+        :param base_endpoint: the endpoint to paginate (i.e "forms" )
+        :param embedded_key: the expected key inside the "_embedded" object
+                             (i.e "osdi:submissions" for base_endpoint "forms/{form_id}/submissions"
+                              or   "osdi:forms" for base_endpoint "forms")
+        :param max_pages: optional parameter to limit the number of pages (can be used for testing)
+        :param prefetch: pages fetched ahead in the background, 0 to fetch one at a time
+        :return: list of embedded items from all pages
+        """
+        return list(
+            self.iter_endpoint(
+                base_endpoint,
+                embedded_key,
+                max_pages=max_pages,
+                prefetch=prefetch,
+                **kwargs,
+            )
+        )
 
     def fetch_related_people(
         self, resource: dict, person_link_keys: list[str] = None, **kwargs
@@ -152,11 +236,30 @@ class ActionNetworkClient(HTTPClient):
                                  defaults to ['osdi:person'] but can include others if relevant (i.e. osdi:creator)
         :return: list of person dicts fetched
         """
+        # this can lead to errors, so log them in the caller function ...
+        return [
+            self.get(f"people/{action_network_id}", **kwargs)
+            for action_network_id in self.get_related_people_ids(
+                resource, person_link_keys
+            )
+        ]
+
+    @staticmethod
+    def get_related_people_ids(
+        resource: dict, person_link_keys: list[str] = None
+    ) -> list[str]:
+        """
+        Action Network ids of the people a resource links to, see fetch_related_people
+
+        :param resource: the resource dict containing `_links`
+        :param person_link_keys: keys in `_links` that indicate person links, defaults to ['osdi:person']
+        :return: list of action network ids
+        """
         # default to 'osdi:person'
         if person_link_keys is None:
             person_link_keys = ["osdi:person"]
 
-        people = []
+        action_network_ids = []
         links = resource.get("_links", {})
 
         # go through each relevant key in _link for the signups
@@ -172,10 +275,111 @@ class ActionNetworkClient(HTTPClient):
                 continue
 
             # Extract action network id from url
-            action_network_id = href.split("people/")[-1]
+            action_network_ids.append(href.split("people/")[-1])
+
+        return action_network_ids
+
 
-            # this can lead to errors, so log them in the caller function ...
-            person = self.get(f"people/{action_network_id}", **kwargs)
-            people.append(person)
+class AsyncActionNetworkClient(AsyncHTTPClient, ActionNetworkClient):
+    """
+    Asyncio ActionNetwork Client for the get/post/put/patch/delete request methods
+    and async versions of the pagination helpers
+    """
+
+    def create_session(self) -> "httpx.AsyncClient":
+        """Creates async ActionNetwork session"""
+        session = super().create_session()
+        session.headers.update(
+            {"OSDI-API-Token": self.api_token, "Content-Type": "application/json"}
+        )
+        return session
+
+    async def iter_endpoint(
+        self,
+        base_endpoint: str,
+        embedded_key: str,
+        max_pages: int = None,
+        by_page: bool = False,
+        prefetch: int = 1,
+        **kwargs,
+    ) -> AsyncIterator[Union[dict, list[dict]]]:
+        """
+        Async version of ActionNetworkClient.iter_endpoint
+
+        Usage:
+        async for form in an.iter_endpoint("forms", "osdi:forms"):
+            ...
+
+        :param base_endpoint: the endpoint to paginate (i.e "forms" )
+        :param embedded_key: the expected key inside the "_embedded" object
+        :param max_pages: optional parameter to limit the number of pages (can be used for testing)
+        :param by_page: `False` by default, set `True` to yield each page's list of items instead
+        :param prefetch: 1 by default to request the next page while the current one is processed, 0 to fetch one at a time
+        :return: async generator of embedded items, or of lists of them when by_page
+        """
+        paginator = self.create_paginator(
+            base_endpoint,
+            embedded_key,
+            max_pages=max_pages,
+            prefetch=prefetch,
+            **kwargs,
+        )
+        async for page in self.iter_pages(paginator):
+            if self.is_last_page(page, embedded_key):
+                return
+
+            if by_page:
+                yield page.items
+            else:
+                for item in page.items:
+                    yield item
+
+    async def paginate_endpoint(
+        self,
+        base_endpoint: str,
+        embedded_key: str,
+        max_pages: int = None,
+        prefetch: int = 1,
+        **kwargs,
+    ) -> list[dict]:
+        """
+        Async version of ActionNetworkClient.paginate_endpoint
 
-        return people
+        :param base_endpoint: the endpoint to paginate (i.e "forms" )
+        :param embedded_key: the expected key inside the "_embedded" object
+        :param max_pages: optional parameter to limit the number of pages (can be used for testing)
+        :param prefetch: 1 by default to request the next page while the current one is processed, 0 to fetch one at a time
+        :return: list of embedded items from all pages
+        """
+        return [
+            item
+            async for item in self.iter_endpoint(
+                base_endpoint,
+                embedded_key,
+                max_pages=max_pages,
+                prefetch=prefetch,
+                **kwargs,
+            )
+        ]
+
+    async def fetch_related_people(
+        self, resource: dict, person_link_keys: list[str] = None, **kwargs
+    ) -> list[dict]:
+        """
+        Async version of ActionNetworkClient.fetch_related_people, fetching the people concurrently
+
+        :param resource: the resource dict containing `_links`
+        :param person_link_keys: optional list of keys in `_links` that indicate person links;
+                                 defaults to ['osdi:person']
+        :return: list of person dicts fetched
+        """
+        return list(
+            await asyncio.gather(
+                *(
+                    self.get(f"people/{action_network_id}", **kwargs)
+                    for action_network_id in self.get_related_people_ids(
+                        resource, person_link_keys
+                    )
+                )
+            )
+        )
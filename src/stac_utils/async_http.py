@@ -0,0 +1,487 @@
+import asyncio
+import functools
+import inspect
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Iterable, Union
+
+import requests
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from .cache import ResponseCache
+from .compression import CompressedBody
+from .deadline import DeadlineExceededException, check_deadline, get_remaining
+from .http import CallResult, HTTPClient, Page, Paginator
+
+logger = logging.getLogger(__name__)
+
+
+def sync_only(name: str) -> Callable:
+    """
+    Stand-in for a vendor helper that only works on the sync client, so
+    calling it on an async client fails clearly instead of deep inside a request
+
+    Usage:
+    class AsyncMailChimpClient(AsyncHTTPClient, MailChimpClient):
+        upsert_member = sync_only("upsert_member")
+
+    :param name: name of the helper
+    :return: method raising TypeError
+    """
+
+    def method(self, *args, **kwargs):
+        sync_name = type(self).__name__.removeprefix("Async")
+        raise TypeError(
+            f"{name} is not supported on {type(self).__name__}, use {sync_name} instead"
+        )
+
+    method.__name__ = name
+    return method
+
+
+class AsyncHTTPClient(HTTPClient):
+    """
+    Asyncio HTTP Client class built on the HTTP Client class
+
+    Shares the HTTPClient hooks (create_session, transform_response,
+    check_for_error, check_response_for_rate_limit, refresh_auth, format_url),
+    but sends requests with an httpx.AsyncClient and caps how many are in
+    flight with a semaphore sized from max_connections.
+
+    Requires the `async` extra (httpx). Vendor helpers that call the sync
+    request methods internally are either overridden with async versions on
+    subclasses or raise TypeError (see sync_only).
+
+    Usage:
+    async with AsyncNGPVANClient(mode=1) as van:
+        people = await asyncio.gather(*(van.get(f"people/{van_id}") for van_id in van_ids))
+    """
+
+    # streamed downloads read from a requests response, see HTTPClient
+    stream = sync_only("stream")
+    download = sync_only("download")
+
+    def __init__(self, *args, **kwargs):
+        if httpx is None:
+            raise ImportError(
+                f"{type(self).__name__} requires httpx, install stac-utils-python[async]"
+            )
+
+        self._semaphore = None
+
+        super().__init__(*args, **kwargs)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """
+        Semaphore limiting the number of requests in flight
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        return self._semaphore
+
+    async def aclose(self):
+        """
+        Close the underlying session, a new session and semaphore are made on
+        next use, so the client can be used again on another event loop
+        """
+        if self._session is not None:
+            await self._session.aclose()
+            self._session = None
+        self._semaphore = None
+
+    def create_transport(self) -> "httpx.AsyncHTTPTransport":
+        """Create a pooled async transport sized from max_connections"""
+
+        return httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections_per_host
+                or self.max_connections,
+            )
+        )
+
+    def create_session(self) -> "httpx.AsyncClient":
+        """Create a session, set headers & auth
+
+        Subclasses should call this and then set their headers & auth
+        """
+
+        session = httpx.AsyncClient(
+            transport=self.create_transport(),
+            timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+        )
+        if self.accept_encoding:
+            session.headers["Accept-Encoding"] = self.accept_encoding
+        return session
+
+    def get_request_kwargs(self, kwargs: dict) -> dict:
+        """
+        Request kwargs with the timeout cut down to what's left of the deadline,
+        as an httpx.Timeout
+
+        :param kwargs: request kwargs
+        :return: kwargs, with a timeout when there's a deadline
+        """
+
+        timeout = kwargs.get("timeout")
+        if isinstance(timeout, httpx.Timeout):
+            kwargs = {**kwargs, "timeout": (timeout.connect, timeout.read)}
+
+        kwargs = super().get_request_kwargs(kwargs)
+        timeout = kwargs.get("timeout")
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            kwargs = {**kwargs, "timeout": httpx.Timeout(read, connect=connect)}
+        return kwargs
+
+    def encode_body(self, method: str, endpoint: str, body: Any, kwargs: dict) -> dict:
+        """
+        Request kwargs sending body as JSON encoded with the client's JSON codec,
+        since httpx always encodes json= with the standard library, and
+        compressed when get_request_encoding gives an encoding
+
+        :param method: Specified API method
+        :param endpoint: Specified API endpoint
+        :param body: JSON body, None for no body
+        :param kwargs: request kwargs
+        :return: kwargs, with the encoded body as content
+        """
+
+        if body is None:
+            return kwargs
+
+        data = self.compress_body(method, endpoint, self.json_codec.dumps(body))
+        kwargs = {
+            **kwargs,
+            "content": data,
+            "headers": dict(self.get_body_headers(data, kwargs.get("headers"))),
+        }
+        if isinstance(data, CompressedBody):
+            # httpx keeps a plain copy of the body, so pass the size along
+            kwargs["extensions"] = {
+                **kwargs.get("extensions", {}),
+                "raw_body_size": data.raw_size,
+            }
+        return kwargs
+
+    @asynccontextmanager
+    async def async_concurrency_slot(self):
+        """
+        Hold one of the concurrency limiter's slots for a request without
+        blocking the event loop, if there's a limiter
+        """
+
+        limiter = self.concurrency_limiter
+        if limiter is None:
+            yield
+            return
+
+        try:
+            await asyncio.wait_for(limiter.acquire_async(), get_remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceededException("Deadline passed waiting to send a request")
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    async def wait_for_rate(self, endpoint: str, response: "httpx.Response"):
+        """
+        Wait for the rate limit to pass without blocking the event loop
+
+        :param endpoint: Specified API endpoint
+        """
+
+        rate_wait = self.get_rate_wait(endpoint, response)
+        check_deadline(rate_wait, f"wait for the {endpoint} rate limit")
+        self.rate_limiter.pause(endpoint, rate_wait)
+        await asyncio.sleep(rate_wait)
+
+    async def call_api(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict = None,
+        body: dict = None,
+        return_headers: bool = False,
+        use_snake_case: bool = True,
+        override_error_logging: bool = False,
+        override_data_printing: bool = False,
+        use_cache: bool = True,
+        **kwargs,
+    ):
+        """
+        Basic async API request, retries on failures, parses errors
+
+        Identical GETs made at the same time from several tasks share one
+        request, set coalesce_gets `False` on the client to turn that off
+
+        :param method: Specified API method
+        :param endpoint: Specified API endpoint
+        :param params: Specified parameters for API call
+        :param body: Specified body for API call
+        :param return_headers: `False` by default, set `True` if returning headers is desired
+        :param use_snake_case: `True` by default, set `False` if camel case or other is desired
+        :param override_error_logging: `False` by default, set `True` if logging not desired
+        :param override_data_printing: `False` by default, set `True` if data logging not desired
+        :param use_cache: `True` by default, set `False` to skip the response cache for a GET
+        :return: Data from API call
+        """
+
+        call = functools.partial(
+            self._call_api,
+            method,
+            endpoint,
+            params=params,
+            body=body,
+            return_headers=return_headers,
+            use_snake_case=use_snake_case,
+            override_error_logging=override_error_logging,
+            override_data_printing=override_data_printing,
+            use_cache=use_cache,
+            **kwargs,
+        )
+        if not (self.coalesce_gets and method.upper() == "GET"):
+            return await call()
+
+        key = ResponseCache.make_key(
+            self.format_url(endpoint),
+            params,
+            return_headers=return_headers,
+            use_snake_case=use_snake_case,
+            use_cache=use_cache,
+            kwargs=kwargs,
+        )
+        return await self.single_flight.do_async(key, call)
+
+    async def _call_api(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict = None,
+        body: dict = None,
+        return_headers: bool = False,
+        use_snake_case: bool = True,
+        override_error_logging: bool = False,
+        override_data_printing: bool = False,
+        use_cache: bool = True,
+        **kwargs,
+    ):
+        """
+        Make the request for call_api with the HTTPClient request loop steps,
+        awaiting the waits and the send
+        """
+
+        call = self.start_call(
+            method,
+            endpoint,
+            params,
+            body,
+            kwargs,
+            return_headers=return_headers,
+            use_snake_case=use_snake_case,
+            override_error_logging=override_error_logging,
+            override_data_printing=override_data_printing,
+            use_cache=use_cache,
+        )
+        if call.done:
+            return call.data
+
+        while not call.done:
+            delay = self.next_attempt(call)
+            if delay is not None:
+                await asyncio.sleep(delay)
+            await self.rate_limiter.wait_async(endpoint)
+            self.before_send(call)
+
+            resp = None
+            sent = time.monotonic()
+            try:
+                async with self.semaphore, self.async_concurrency_slot():
+                    sent = time.monotonic()
+                    resp = await self.session.request(
+                        method, call.url, **self.get_call_kwargs(call)
+                    )
+                action = self.check_call_response(call, resp, time.monotonic() - sent)
+                if action == "rate_limited":
+                    await self.wait_for_rate(endpoint, resp)
+                elif action == "refresh_auth":
+                    refreshed = self.refresh_auth(resp)
+                    if inspect.isawaitable(refreshed):
+                        await refreshed
+                self.accept_call_response(call, resp)
+
+            except (httpx.HTTPError, requests.exceptions.RequestException) as E:
+                if not self.should_retry_call(call, resp, E, time.monotonic() - sent):
+                    raise
+
+        return self.finish_call(call)
+
+    async def iter_pages(self, paginator: Paginator) -> AsyncIterator[Page]:
+        """
+        Lazily fetch the pages of a paginator whose fetch is a coroutine function
+
+        Follows the same strategy as Paginator.pages, with prefetch the next
+        page is requested before the current one is handed over.
+
+        Usage:
+        paginator = CursorPaginator(van.get, get_items, first_request=url, get_next=get_next)
+        async for page in van.iter_pages(paginator):
+            ...
+
+        :param paginator: paginator whose fetch returns an awaitable
+        :return: async generator of Page
+        """
+
+        request = paginator.first_request
+        task = asyncio.ensure_future(paginator.fetch(request))
+        number = 0
+        try:
+            while task is not None:
+                data = await task
+                task = None
+                items = paginator.get_items(data) or []
+                number += 1
+
+                next_request = None
+                if items and (
+                    paginator.max_pages is None or number < paginator.max_pages
+                ):
+                    next_request = paginator.next_request(request, data, items)
+                if next_request is not None and paginator.prefetch:
+                    task = asyncio.ensure_future(paginator.fetch(next_request))
+
+                yield Page(number, request, data, items)
+
+                if next_request is not None and task is None:
+                    task = asyncio.ensure_future(paginator.fetch(next_request))
+                request = next_request
+        finally:
+            if task is not None:
+                task.cancel()
+
+    async def _call_spec(self, index: int, spec: Union[tuple, list, dict], **kwargs):
+        """Run a single call_many spec, capturing any error on the result"""
+
+        method, endpoint, params, body, extra = self._normalize_call_spec(spec)
+        try:
+            data = await self.call_api(
+                method, endpoint, params=params, body=body, **{**kwargs, **extra}
+            )
+        except Exception as E:
+            logger.warning(f"{method} {endpoint} failed in batch: {E}")
+            return CallResult(index, spec, error=E)
+
+        return CallResult(index, spec, data=data)
+
+    async def call_many(
+        self,
+        specs: Iterable[Union[tuple, list, dict]],
+        concurrency: int = None,
+        ordered: bool = True,
+        **kwargs,
+    ) -> AsyncIterator[CallResult]:
+        """
+        Async counterpart of HTTPClient.call_many, run as tasks on the event loop
+
+        Example usage:
+        async for result in van.call_many(("GET", f"people/{van_id}") for van_id in van_ids):
+            if result.ok: ...
+
+        :param specs: (method, endpoint[, params[, body]]) tuples or dicts with those keys
+        :param concurrency: number of tasks in flight, capped at (and defaulting to) max_connections
+        :param ordered: `True` by default, set `False` to yield results as they complete
+        :param kwargs: passed on to every call_api call
+        :return: async generator of CallResult, with errors attached rather than raised
+        """
+
+        concurrency = min(concurrency or self.max_connections, self.max_connections)
+        concurrency = max(concurrency, 1)
+        specs = iter(enumerate(specs))
+        pending = deque()
+
+        def submit_next() -> bool:
+            try:
+                index, spec = next(specs)
+            except StopIteration:
+                return False
+            pending.append(
+                asyncio.ensure_future(self._call_spec(index, spec, **kwargs))
+            )
+            return True
+
+        while len(pending) < concurrency and submit_next():
+            pass
+
+        try:
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                    await done[0]
+                else:
+                    finished, _ = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    done = [task for task in pending if task in finished]
+                    for task in done:
+                        pending.remove(task)
+
+                for task in done:
+                    submit_next()
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def get(self, *args, **kwargs):
+        """
+        Convenience wrapper for GET
+
+        Example usage: `await self.van.get(f"events/{event_id}")`
+        """
+        return await self.call_api("GET", *args, **kwargs)
+
+    async def post(self, *args, **kwargs):
+        """
+        Convenience wrapper for POST
+
+        Example usage: `await self.van.post("signups", body=payload)`
+        """
+        return await self.call_api("POST", *args, **kwargs)
+
+    async def put(self, *args, **kwargs):
+        """
+        Convenience wrapper for PUT
+        """
+        return await self.call_api("PUT", *args, **kwargs)
+
+    async def delete(self, *args, **kwargs):
+        """
+        Convenience wrapper for DELETE
+        """
+        return await self.call_api("DELETE", *args, **kwargs)
+
+    async def update(self, *args, **kwargs):
+        """
+        Convenience wrapper for UPDATE
+        """
+        return await self.call_api("UPDATE", *args, **kwargs)
+
+    async def patch(self, *args, **kwargs):
+        """
+        Convenience wrapper for PATCH
+        """
+        return await self.call_api("PATCH", *args, **kwargs)
@@ -0,0 +1,393 @@
+import asyncio
+import copy
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Mapping, Union
+
+from .deadline import DeadlineExceededException, get_remaining
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry:
+    """
+    Cached data for one GET, with the validators needed to revalidate it
+
+    :param data: transformed response data
+    :param endpoint: endpoint the data came from, for invalidation
+    :param expires: time.time() after which the entry needs revalidating
+    :param etag: ETag header of the response, if any
+    :param last_modified: Last-Modified header of the response, if any
+    """
+
+    def __init__(
+        self,
+        data: Any,
+        endpoint: str,
+        expires: float,
+        etag: str = None,
+        last_modified: str = None,
+    ):
+        self.data = data
+        self.endpoint = endpoint
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires
+
+    @property
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers to revalidate the entry with"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Opt-in LRU cache of GET responses for HTTPClient, with per-endpoint TTLs
+    and ETag / Last-Modified revalidation
+
+    Fresh entries are returned without a request. Stale entries with an ETag
+    or Last-Modified are revalidated with If-None-Match / If-Modified-Since,
+    and a 304 reuses the cached data. Pass a path to back the cache with
+    SQLite so it survives between invocations, which needs JSON-serializable
+    data. Writes (anything but GET) through the client invalidate the endpoint.
+
+    Usage:
+    van.response_cache = ResponseCache(ttls={"activistCodes": 3600, "surveyQuestions": 3600})
+
+    :param max_entries: most entries kept in memory before the least recently used is dropped
+    :param ttl: default seconds an entry is fresh for
+    :param ttls: {endpoint prefix: seconds} overriding ttl, longest prefix wins
+    :param path: optional SQLite file backing the in-memory cache
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 300,
+        ttls: dict[str, float] = None,
+        path: str = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.ttls = {self._normalize_endpoint(k): v for k, v in (ttls or {}).items()}
+        self.path = path
+        self.entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._connection = None
+
+        if path:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, "
+                "endpoint TEXT, data TEXT, expires REAL, etag TEXT, last_modified TEXT)"
+            )
+            self._connection.commit()
+
+    @staticmethod
+    def _normalize_endpoint(endpoint: str) -> str:
+        return endpoint.split("?", 1)[0].strip("/")
+
+    @staticmethod
+    def make_key(url: str, params: dict = None, **flags) -> str:
+        """
+        Key for a GET, built from the url, params and any flags that change the data
+
+        :param url: request url
+        :param params: request params
+        :return: cache key
+        """
+        return json.dumps([url, params, flags], sort_keys=True, default=str)
+
+    def get_ttl(self, endpoint: str) -> float:
+        """
+        Seconds an endpoint's responses are fresh for
+
+        :param endpoint: Specified API endpoint
+        :return: seconds
+        """
+        endpoint = self._normalize_endpoint(endpoint)
+        best = None
+        for key in self.ttls:
+            if endpoint == key or endpoint.startswith(f"{key}/") or key == "":
+                if best is None or len(key) > len(best):
+                    best = key
+
+        return self.ttl if best is None else self.ttls[best]
+
+    def get(self, key: str) -> Union[CacheEntry, None]:
+        """
+        Look up an entry, counting a hit if it's fresh and a miss otherwise
+
+        :param key: cache key
+        :return: a copy of the entry, or None
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            elif self._connection is not None:
+                entry = self._load(key)
+                if entry is not None:
+                    self._remember(key, entry)
+
+            if entry is not None and entry.fresh:
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+
+        if entry is None:
+            return None
+        # callers are free to change the data they get back
+        return CacheEntry(
+            copy.deepcopy(entry.data),
+            entry.endpoint,
+            entry.expires,
+            entry.etag,
+            entry.last_modified,
+        )
+
+    def set(self, key: str, endpoint: str, data: Any, headers: Mapping = None):
+        """
+        Store the data for a GET
+
+        Nothing is stored when the TTL is 0 and there's nothing to revalidate with
+
+        :param key: cache key
+        :param endpoint: Specified API endpoint
+        :param data: transformed response data
+        :param headers: response headers, for the ETag and Last-Modified
+        """
+        headers = headers if hasattr(headers, "get") else {}
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        entry = CacheEntry(
+            copy.deepcopy(data),
+            endpoint,
+            time.time() + self.get_ttl(endpoint),
+            etag if isinstance(etag, str) else None,
+            last_modified if isinstance(last_modified, str) else None,
+        )
+        if not (entry.fresh or entry.validators):
+            return
+
+        with self._lock:
+            self._remember(key, entry)
+            self._save(key, entry)
+
+    def revalidated(self, key: str, entry: CacheEntry, headers: Mapping = None) -> Any:
+        """
+        Refresh an entry after the server answered 304 Not Modified
+
+        :param key: cache key
+        :param entry: entry that was revalidated
+        :param headers: 304 response headers, which may carry a new ETag
+        :return: the cached data
+        """
+        with self._lock:
+            self.stats["revalidated"] += 1
+
+        headers = headers if hasattr(headers, "get") else {}
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if isinstance(etag, str):
+            entry.etag = etag
+        if isinstance(last_modified, str):
+            entry.last_modified = last_modified
+        entry.expires = time.time() + self.get_ttl(entry.endpoint)
+
+        with self._lock:
+            self._remember(key, entry)
+            self._save(key, entry)
+
+        return copy.deepcopy(entry.data)
+
+    def invalidate(self, endpoint: str = None):
+        """
+        Drop entries for an endpoint and anything under it, or everything
+
+        :param endpoint: Specified API endpoint, None to clear the cache
+        """
+        with self._lock:
+            if endpoint is None:
+                self.entries.clear()
+                if self._connection is not None:
+                    self._connection.execute("DELETE FROM responses")
+                    self._connection.commit()
+                return
+
+            endpoint = self._normalize_endpoint(endpoint)
+            for key, entry in list(self.entries.items()):
+                cached = self._normalize_endpoint(entry.endpoint)
+                if cached == endpoint or cached.startswith(f"{endpoint}/"):
+                    del self.entries[key]
+
+            if self._connection is not None:
+                self._connection.execute(
+                    "DELETE FROM responses WHERE endpoint = ? OR endpoint LIKE ?",
+                    (endpoint, f"{endpoint}/%"),
+                )
+                self._connection.commit()
+
+    def clear(self):
+        """Drop every entry and reset the stats"""
+        self.invalidate()
+        with self._lock:
+            self.stats = dict.fromkeys(self.stats, 0)
+
+    def close(self):
+        """Close the SQLite connection, if any"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _remember(self, key: str, entry: CacheEntry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _load(self, key: str) -> Union[CacheEntry, None]:
+        row = self._connection.execute(
+            "SELECT endpoint, data, expires, etag, last_modified FROM responses "
+            "WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        endpoint, data, expires, etag, last_modified = row
+        return CacheEntry(json.loads(data), endpoint, expires, etag, last_modified)
+
+    def _save(self, key: str, entry: CacheEntry):
+        if self._connection is None:
+            return
+
+        try:
+            data = json.dumps(entry.data)
+        except (TypeError, ValueError):
+            logger.debug(f"Not saving {entry.endpoint} to disk, data isn't JSON")
+            return
+
+        self._connection.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                self._normalize_endpoint(entry.endpoint),
+                data,
+                entry.expires,
+                entry.etag,
+                entry.last_modified,
+            ),
+        )
+        self._connection.commit()
+
+
+class SingleFlight:
+    """
+    Coalesces identical calls that are in flight at the same time
+
+    The first caller for a key (the leader) makes the call, everyone who asks
+    for the same key before it finishes waits and gets a copy of its result,
+    or its exception. Nothing is kept once the call finishes, see
+    ResponseCache for that.
+
+    Usage:
+    data = flight.do(key, lambda: client.get("events/123"))
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future] = {}
+        self._tasks: dict[str, asyncio.Future] = {}
+        self.stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key: str, call: Callable[[], Any]) -> Any:
+        """
+        Make a call, or wait for the identical one already in flight, for no
+        longer than the current deadline
+
+        :param key: identifies identical calls
+        :param call: function making the call
+        :return: result of the call
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.stats["calls"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            try:
+                return copy.deepcopy(future.result(timeout=get_remaining()))
+            except FutureTimeoutError:
+                raise DeadlineExceededException(
+                    f"Deadline passed waiting for the call in flight for {key}"
+                )
+
+        try:
+            result = call()
+        except BaseException as E:
+            future.set_exception(E)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+        return result
+
+    async def do_async(self, key: str, call: Callable[[], Awaitable]) -> Any:
+        """
+        Async version of do, for calls made on one event loop
+
+        :param key: identifies identical calls
+        :param call: function returning the awaitable making the call
+        :return: result of the call
+        """
+        future = self._tasks.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            try:
+                result = await asyncio.wait_for(asyncio.shield(future), get_remaining())
+            except asyncio.TimeoutError:
+                raise DeadlineExceededException(
+                    f"Deadline passed waiting for the call in flight for {key}"
+                )
+            return copy.deepcopy(result)
+
+        future = self._tasks[key] = asyncio.get_running_loop().create_future()
+        self.stats["calls"] += 1
+        try:
+            result = await call()
+        except BaseException as E:
+            future.set_exception(E)
+            # mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            del self._tasks[key]
+
+        return result
@@ -0,0 +1,249 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Union
+from urllib.parse import urlparse
+
+from .metrics import normalize_endpoint
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenException(Exception):
+    """
+    Raised instead of sending a request while its circuit is open
+
+    Callers can wait out retry_after or skip the host until then, other hosts keep working
+
+    :param key: host or endpoint template of the open circuit
+    :param retry_after: seconds until the circuit lets a probe request through
+    """
+
+    def __init__(self, key: str, retry_after: float):
+        self.key = key
+        self.retry_after = retry_after
+        super().__init__(
+            f"Circuit for {key} is open, next probe in {retry_after:.1f} seconds"
+        )
+
+
+class Circuit:
+    """
+    Rolling outcomes and state of one host or endpoint
+    """
+
+    def __init__(self):
+        self.state = CLOSED
+        self.opened_at = None
+        self.probes = 0
+        # (time.monotonic(), failed, slow)
+        self.outcomes: deque[tuple[float, bool, bool]] = deque()
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast while a host (or endpoint) is having an outage
+
+    Each circuit starts closed and keeps a rolling window of outcomes. Once
+    there are min_calls in the window and the share of failures (no response,
+    5xx or 408) or slow calls reaches its rate, the circuit opens and requests
+    raise CircuitOpenException without being sent. After open_seconds the
+    circuit is half open and lets probe_calls requests through: if they
+    succeed it closes, otherwise it opens again.
+
+    Opt-in on HTTPClient by assigning one, the same breaker can be shared by
+    several clients. A job can check any_open() to checkpoint and exit early.
+
+    Usage:
+    van.circuit_breaker = CircuitBreaker(failure_rate=0.5, open_seconds=60)
+    ...
+    if van.circuit_breaker.any_open():
+        save_checkpoint(...)
+
+    :param failure_rate: share of failed calls in the window that opens the circuit
+    :param slow_call_rate: share of slow calls in the window that opens the circuit, None to ignore latency
+    :param slow_call_seconds: calls taking longer than this count as slow
+    :param window: seconds of outcomes the rates are worked out over
+    :param min_calls: fewest calls in the window before the circuit can open
+    :param open_seconds: seconds the circuit stays open before probing
+    :param probe_calls: requests let through while half open
+    :param per_endpoint: `False` by default (one circuit per host), set `True` for one per endpoint template
+    """
+
+    failure_statuses = frozenset([408, 500, 502, 503, 504])
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        slow_call_rate: float = None,
+        slow_call_seconds: float = 30,
+        window: float = 60,
+        min_calls: int = 10,
+        open_seconds: float = 30,
+        probe_calls: int = 1,
+        per_endpoint: bool = False,
+    ):
+        self.failure_rate = failure_rate
+        self.slow_call_rate = slow_call_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.window = window
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.probe_calls = probe_calls
+        self.per_endpoint = per_endpoint
+        self.circuits: dict[str, Circuit] = {}
+        self._lock = threading.Lock()
+
+    def get_key(self, url: str, endpoint: str = None) -> str:
+        """
+        Circuit key for a request, its host or its method-less endpoint template
+
+        :param url: request url
+        :param endpoint: Specified API endpoint, defaults to the url's path
+        :return: circuit key
+        """
+        parsed = urlparse(url)
+        if not self.per_endpoint:
+            return parsed.netloc or url
+        return f"{parsed.netloc}/{normalize_endpoint(endpoint or parsed.path)}"
+
+    def _get_circuit(self, key: str) -> Circuit:
+        circuit = self.circuits.get(key)
+        if circuit is None:
+            circuit = self.circuits[key] = Circuit()
+        return circuit
+
+    def _set_state(self, key: str, circuit: Circuit, state: str):
+        if circuit.state == state:
+            return
+        log = logger.warning if state == OPEN else logger.info
+        log(f"Circuit for {key} is {state.replace('_', ' ')} (was {circuit.state})")
+        circuit.state = state
+        circuit.probes = 0
+        circuit.outcomes.clear()
+        circuit.opened_at = time.monotonic() if state == OPEN else None
+
+    def before_call(self, url: str, endpoint: str = None, probe: bool = True):
+        """
+        Check a request may be sent, raising CircuitOpenException if not
+
+        :param url: request url
+        :param endpoint: Specified API endpoint
+        :param probe: `True` by default, set `False` to only check, i.e. before a backoff sleep
+        """
+        key = self.get_key(url, endpoint)
+        with self._lock:
+            circuit = self.circuits.get(key)
+            if circuit is None or circuit.state == CLOSED:
+                return
+
+            if circuit.state == OPEN:
+                retry_after = circuit.opened_at + self.open_seconds - time.monotonic()
+                if retry_after > 0:
+                    raise CircuitOpenException(key, retry_after)
+                if not probe:
+                    return
+                self._set_state(key, circuit, HALF_OPEN)
+
+            if not probe:
+                return
+            if circuit.probes >= self.probe_calls:
+                raise CircuitOpenException(key, 0)
+            circuit.probes += 1
+
+    def record(
+        self,
+        url: str,
+        endpoint: str = None,
+        status_code: int = None,
+        elapsed: float = None,
+    ):
+        """
+        Record the outcome of a request, opening or closing its circuit as needed
+
+        :param url: request url
+        :param endpoint: Specified API endpoint
+        :param status_code: response status, None if the request never got one
+        :param elapsed: seconds the request took
+        """
+        failed = (
+            not isinstance(status_code, int) or status_code in self.failure_statuses
+        )
+        slow = elapsed is not None and elapsed > self.slow_call_seconds
+        key = self.get_key(url, endpoint)
+        now = time.monotonic()
+
+        with self._lock:
+            circuit = self._get_circuit(key)
+            if circuit.state == HALF_OPEN:
+                if failed or (slow and self.slow_call_rate is not None):
+                    self._set_state(key, circuit, OPEN)
+                elif circuit.probes >= self.probe_calls:
+                    self._set_state(key, circuit, CLOSED)
+                return
+            if circuit.state == OPEN:
+                # a request sent before the circuit opened
+                return
+
+            outcomes = circuit.outcomes
+            outcomes.append((now, failed, slow))
+            while outcomes and outcomes[0][0] < now - self.window:
+                outcomes.popleft()
+
+            calls = len(outcomes)
+            if calls < self.min_calls:
+                return
+            failures = sum(1 for outcome in outcomes if outcome[1])
+            slow_calls = sum(1 for outcome in outcomes if outcome[2])
+            if failures / calls >= self.failure_rate or (
+                self.slow_call_rate is not None
+                and slow_calls / calls >= self.slow_call_rate
+            ):
+                self._set_state(key, circuit, OPEN)
+
+    def get_state(self, url: str, endpoint: str = None) -> str:
+        """
+        State of the circuit for a request, "closed", "open" or "half_open"
+
+        :param url: request url, or a circuit key
+        :param endpoint: Specified API endpoint
+        :return: state
+        """
+        circuit = self.circuits.get(url) or self.circuits.get(
+            self.get_key(url, endpoint)
+        )
+        return circuit.state if circuit else CLOSED
+
+    def states(self) -> dict[str, str]:
+        """
+        State of every circuit
+
+        :return: {circuit key: state}
+        """
+        with self._lock:
+            return {key: circuit.state for key, circuit in self.circuits.items()}
+
+    def any_open(self) -> bool:
+        """
+        Whether any circuit is open or half open, i.e. to checkpoint and stop a job
+
+        :return: `True` if a circuit isn't closed
+        """
+        return any(state != CLOSED for state in self.states().values())
+
+    def reset(self, key: Union[str, None] = None):
+        """
+        Close a circuit, or all of them
+
+        :param key: circuit key, None for every circuit
+        """
+        with self._lock:
+            if key is None:
+                self.circuits.clear()
+            else:
+                self.circuits.pop(key, None)
@@ -0,0 +1,38 @@
+import gzip
+import zlib
+
+# Content-Encodings request bodies can be compressed with
+ENCODINGS = ("gzip", "deflate")
+
+
+class CompressedBody(bytes):
+    """
+    Compressed request body, remembering its encoding and uncompressed size
+    so the client can report both sizes once it's sent
+    """
+
+    encoding: str
+    raw_size: int
+
+
+def compress(data: bytes, encoding: str, level: int = 6) -> CompressedBody:
+    """
+    Compress a request body for a Content-Encoding
+
+    :param data: body to compress
+    :param encoding: "gzip" or "deflate"
+    :param level: compression level, 1 (fastest) to 9 (smallest)
+    :return: compressed body
+    """
+    if encoding == "gzip":
+        # fixed mtime, so the same body always compresses the same
+        compressed = gzip.compress(data, compresslevel=level, mtime=0)
+    elif encoding == "deflate":
+        compressed = zlib.compress(data, level)
+    else:
+        raise ValueError(f"Unknown encoding {encoding}, expected one of {ENCODINGS}")
+
+    body = CompressedBody(compressed)
+    body.encoding = encoding
+    body.raw_size = len(data)
+    return body
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Union
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Caps the requests in flight with a limit that adapts to how the vendor copes (AIMD)
+
+    Every healthy response raises the limit by increase / limit, so about one
+    extra slot per round of requests, up to max_limit. A 429 or 503, or a
+    latency average well above the best seen, multiplies it by decrease, at
+    most once per cooldown so one burst of errors only counts once.
+
+    Shared by the threads of call_many / map_concurrent and the tasks of the
+    async clients, see HTTPClient.concurrency_limiter.
+
+    Usage:
+    van.concurrency_limiter = AdaptiveConcurrencyLimiter(max_limit=van.max_connections)
+
+    :param max_limit: most requests in flight, i.e. the client's max_connections
+    :param min_limit: fewest requests in flight
+    :param initial: starting limit, defaults to half of max_limit
+    :param increase: slots added per round of healthy responses
+    :param decrease: factor the limit is multiplied by when the vendor is overloaded
+    :param latency_tolerance: latency average over the best one seen that counts as overload
+    :param cooldown: least seconds between decreases
+    """
+
+    overload_statuses = frozenset([429, 503])
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        initial: float = None,
+        increase: float = 1,
+        decrease: float = 0.5,
+        latency_tolerance: float = 3,
+        cooldown: float = 1,
+    ):
+        self.max_limit = max(max_limit, 1)
+        self.min_limit = max(min(min_limit, self.max_limit), 1)
+        self.limit = float(initial or max(self.max_limit / 2, self.min_limit))
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.latency = None
+        self.best_latency = None
+        self.stats = {"increases": 0, "decreases": 0}
+        self._last_decrease = None
+        self._condition = threading.Condition()
+        # (loop, future) of tasks waiting for a slot
+        self._async_waiters: list[tuple] = []
+
+    @property
+    def slots(self) -> int:
+        """Requests allowed in flight right now"""
+        return max(int(self.limit), self.min_limit)
+
+    def try_acquire(self) -> bool:
+        """
+        Take a slot if one is free
+
+        :return: `True` if a slot was taken
+        """
+        with self._condition:
+            if self.in_flight < self.slots:
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self, timeout: float = None) -> bool:
+        """
+        Wait for a free slot and take it
+
+        :param timeout: most seconds to wait, None to wait as long as it takes
+        :return: `True` if a slot was taken, `False` if the timeout passed
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self.in_flight < self.slots, timeout
+            ):
+                return False
+            self.in_flight += 1
+            return True
+
+    async def acquire_async(self):
+        """Wait for a free slot without blocking the event loop, and take it"""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self.in_flight < self.slots:
+                    self.in_flight += 1
+                    return
+                future = loop.create_future()
+                self._async_waiters.append((loop, future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self._condition:
+                    if (loop, future) in self._async_waiters:
+                        self._async_waiters.remove((loop, future))
+                raise
+
+    def release(self):
+        """Give a slot back"""
+        with self._condition:
+            self.in_flight = max(self.in_flight - 1, 0)
+            self._wake()
+
+    def _wake(self):
+        # called with the condition held, wakes as many waiters as there are free slots
+        free = self.slots - self.in_flight
+        if free <= 0:
+            return
+        self._condition.notify(free)
+        while free > 0 and self._async_waiters:
+            loop, future = self._async_waiters.pop(0)
+            loop.call_soon_threadsafe(
+                lambda future=future: future.done() or future.set_result(None)
+            )
+            free -= 1
+
+    def record(self, status_code: Union[int, None], elapsed: float = None):
+        """
+        Adapt the limit to a finished request
+
+        :param status_code: response status, None if the request never got one
+        :param elapsed: seconds the request took
+        """
+        with self._condition:
+            overloaded = status_code in self.overload_statuses
+            if elapsed is not None and not overloaded:
+                if self.latency is None:
+                    self.latency = elapsed
+                else:
+                    self.latency = 0.8 * self.latency + 0.2 * elapsed
+                if self.best_latency is None or self.latency < self.best_latency:
+                    self.best_latency = self.latency
+                else:
+                    # let the baseline follow lasting changes slowly
+                    self.best_latency += (self.latency - self.best_latency) * 0.01
+                overloaded = self.latency > self.best_latency * self.latency_tolerance
+
+            if overloaded:
+                self._decrease()
+            elif isinstance(status_code, int) and status_code < 400:
+                limit = min(self.limit + self.increase / self.limit, self.max_limit)
+                if int(limit) > int(self.limit):
+                    self.stats["increases"] += 1
+                    logger.debug(f"Concurrency limit raised to {int(limit)}")
+                self.limit = limit
+                self._wake()
+
+    def _decrease(self):
+        now = time.monotonic()
+        last = self._last_decrease
+        if last is not None and now - last < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.limit * self.decrease, self.min_limit)
+        self.stats["decreases"] += 1
+        logger.info(f"Concurrency limit cut to {self.slots}")
@@ -0,0 +1,96 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Union
+
+logger = logging.getLogger(__name__)
+
+# time.monotonic() the current operation has to finish by, None without a deadline
+_expires: ContextVar[Union[float, None]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceededException(TimeoutError):
+    """
+    Raised when an operation can't finish before its deadline, instead of starting
+    a request, backoff sleep or rate limit wait that would run past it
+    """
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Cap the combined time of the requests, retries, backoff and rate limit
+    waits made inside the block
+
+    Nested deadlines can only shorten the outer one. The deadline follows the
+    context, so asyncio tasks and call_many / paginator workers started inside
+    the block share it.
+
+    Usage:
+    with deadline(seconds=context.get_remaining_time_in_millis() / 1000 - 30):
+        van.get_paginated_items("events")
+
+    :param seconds: seconds the block has
+    """
+    expires = time.monotonic() + seconds
+    outer = _expires.get()
+    if outer is not None:
+        expires = min(expires, outer)
+
+    token = _expires.set(expires)
+    try:
+        yield
+    finally:
+        _expires.reset(token)
+
+
+def get_remaining() -> Union[float, None]:
+    """
+    Seconds left before the current deadline
+
+    :return: seconds, None without a deadline
+    """
+    expires = _expires.get()
+    if expires is None:
+        return None
+    return expires - time.monotonic()
+
+
+def check_deadline(needed: float = 0, action: str = "continue"):
+    """
+    Raise DeadlineExceededException if the deadline has passed, or will before
+    something taking needed seconds is done
+
+    :param needed: seconds about to be spent, i.e. a backoff sleep
+    :param action: what is about to happen, for the error message
+    """
+    remaining = get_remaining()
+    if remaining is None:
+        return
+    if remaining <= 0 or remaining < needed:
+        raise DeadlineExceededException(
+            f"Deadline passes in {max(remaining, 0):.1f}s, "
+            f"not enough to {action} ({needed:.1f}s)"
+        )
+
+
+def cap_timeout(
+    connect: Union[float, None], read: Union[float, None]
+) -> Union[tuple[float, float], None]:
+    """
+    Shorten request timeouts to the time left before the deadline
+
+    :param connect: connect timeout in seconds
+    :param read: read timeout in seconds
+    :return: (connect, read), or None without a deadline
+    """
+    remaining = get_remaining()
+    if remaining is None:
+        return None
+
+    check_deadline(action="send a request")
+    return (
+        remaining if connect is None else min(connect, remaining),
+        remaining if read is None else min(read, remaining),
+    )
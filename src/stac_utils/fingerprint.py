@@ -0,0 +1,193 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Union
+
+from .aws import load_from_s3, save_to_s3
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(payload: Any) -> str:
+    """
+    Stable hash of a payload, the same for equal payloads whatever their key order
+
+    :param payload: JSON-like payload
+    :return: hex digest
+    """
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class FingerprintStore(ABC):
+    """
+    Remembers the fingerprint of the last payload successfully sent for each
+    record, so records that haven't changed since can be skipped
+
+    Keys are whatever identifies the record to the vendor, i.e. the list id and
+    subscriber hash for MailChimp or the VAN ID. Call save() (or use the store
+    as a context manager) at the end of a run to persist the fingerprints.
+
+    Usage:
+    with SQLiteFingerprintStore("/tmp/fingerprints.db") as store:
+        mailchimp.fingerprint_store = store
+        for row in rows:
+            mailchimp.upsert_member(list_id, row["email"], merge_fields=row["fields"])
+    logger.info(store.stats)
+    """
+
+    def __init__(self):
+        self.stats = {"skipped": 0, "sent": 0}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.save()
+
+    @abstractmethod
+    def get(self, key: str) -> Union[str, None]:
+        """
+        Fingerprint last recorded for a key
+
+        :param key: record key
+        :return: fingerprint, or None
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: str):
+        """
+        Store the fingerprint for a key
+
+        :param key: record key
+        :param value: fingerprint
+        """
+
+    def save(self):
+        """Persist the fingerprints"""
+
+    def is_unchanged(self, key: str, value: str) -> bool:
+        """
+        Check a payload fingerprint against the last one sent, counting skips
+
+        :param key: record key
+        :param value: fingerprint of the payload about to be sent
+        :return: `True` if the same payload was already sent
+        """
+        unchanged = self.get(key) == value
+        if unchanged:
+            with self._lock:
+                self.stats["skipped"] += 1
+        return unchanged
+
+    def record(self, key: str, value: str):
+        """
+        Remember a payload fingerprint after it was sent successfully
+
+        :param key: record key
+        :param value: fingerprint of the payload sent
+        """
+        self.set(key, value)
+        with self._lock:
+            self.stats["sent"] += 1
+
+
+class SQLiteFingerprintStore(FingerprintStore):
+    """
+    Fingerprint store in a SQLite file
+
+    :param path: SQLite file, ":memory:" for a store that only lasts the run
+    :param commit_every: writes between commits, save() commits the rest
+    """
+
+    def __init__(self, path: str, commit_every: int = 1000):
+        super().__init__()
+        self.path = path
+        self.commit_every = commit_every
+        self._uncommitted = 0
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints "
+            "(key TEXT PRIMARY KEY, fingerprint TEXT)"
+        )
+        self._connection.commit()
+
+    def get(self, key: str) -> Union[str, None]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT fingerprint FROM fingerprints WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO fingerprints VALUES (?, ?)", (key, value)
+            )
+            self._uncommitted += 1
+            if self._uncommitted >= self.commit_every:
+                self._connection.commit()
+                self._uncommitted = 0
+
+    def save(self):
+        with self._lock:
+            self._connection.commit()
+            self._uncommitted = 0
+
+    def close(self):
+        """Commit and close the connection"""
+        self.save()
+        self._connection.close()
+
+
+class S3FingerprintStore(FingerprintStore):
+    """
+    Fingerprint store kept as a JSON file on S3, loaded on first use and
+    written back by save() when anything changed
+
+    :param bucket: s3 bucket
+    :param path: Path within bucket
+    :param file_name: Name of the JSON file
+    """
+
+    def __init__(self, bucket: str, path: Union[str, None], file_name: str):
+        super().__init__()
+        self.bucket = bucket
+        self.path = path
+        self.file_name = file_name
+        self._fingerprints = None
+        self._dirty = False
+
+    @property
+    def fingerprints(self) -> dict[str, str]:
+        if self._fingerprints is None:
+            with self._lock:
+                if self._fingerprints is None:
+                    self._fingerprints = load_from_s3(
+                        self.bucket, self.path, self.file_name
+                    )
+        return self._fingerprints
+
+    def get(self, key: str) -> Union[str, None]:
+        return self.fingerprints.get(key)
+
+    def set(self, key: str, value: str):
+        fingerprints = self.fingerprints
+        with self._lock:
+            fingerprints[key] = value
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            save_to_s3(self._fingerprints, self.bucket, self.path, self.file_name)
+            self._dirty = False
+        logger.info(
+            f"Saved {len(self._fingerprints)} fingerprints to s3://{self.bucket}/"
+            f"{(self.path or '').strip('/')}/{self.file_name}"
+        )
@@ -23,6 +23,7 @@ except ImportError:
     pass
 
 from .listify import listify
+from .retry import RetryPolicy
 
 RETRY_EXCEPTIONS = [InternalServerError, ServiceUnavailable]
 HTTP_RETRY_EXCEPTIONS = [429, 500, 503]
@@ -663,16 +664,22 @@ def upload_file_to_drive(
         )
 
     # batches cannot retry automatically, doing it live
-    for attempt in range(num_retries):
+    retry_policy = RetryPolicy(
+        max_retries=num_retries - 1,
+        retry_statuses=HTTP_RETRY_EXCEPTIONS,
+        retry_exceptions=(HttpError,),
+    )
+    started = time.monotonic()
+    fails = 0
+    while True:
         try:
             batch.execute()
             break
         except HttpError as e:
-            if e.resp.status in HTTP_RETRY_EXCEPTIONS and attempt < num_retries - 1:
+            fails += 1
+            if retry_policy.should_retry(fails, e.resp.status, e, started):
                 logger.warning(e)
-                # weak exponential backoff but something
-                wait_time = (2 ** attempt)
-                time.sleep(wait_time)
+                time.sleep(retry_policy.get_delay(fails))
             else:
                 logger.error(e)
                 raise
@@ -1,10 +1,32 @@
+import contextvars
+import functools
 import time
 import logging
+import threading
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from contextlib import contextmanager
-from typing import Union
+from typing import Any, Callable, Iterable, Iterator, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import CacheEntry, ResponseCache, SingleFlight
+from .circuit_breaker import CircuitBreaker
+from .compression import CompressedBody, compress
+from .concurrency import AdaptiveConcurrencyLimiter
+from .deadline import (
+    DeadlineExceededException,
+    cap_timeout,
+    check_deadline,
+    deadline,
+    get_remaining,
+)
+from .json_codec import JSONCodec, get_json_codec
+from .metrics import MetricsCollector
+from .rate_limit import RateLimiter, parse_rate_limit_headers
+from .retry import RetryPolicy
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +39,7 @@ class Client(ABC):
     def __init__(self, *args, **kwargs):
         self._session = None
         self._session_count = 0
+        self._session_lock = threading.Lock()
 
     @property
     def session(self):
@@ -25,7 +48,10 @@ class Client(ABC):
         current context manager
         """
         if self._session is None:
-            self._session = self.create_session()
+            # worker threads may all reach for the session at once
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self.create_session()
         return self._session
 
     @abstractmethod
@@ -72,6 +98,330 @@ class Client(ABC):
         """
 
 
+class CallResult:
+    """
+    Result of a single request made through HTTPClient.call_many
+
+    Errors are attached to the result instead of being raised, so one
+    bad record doesn't abort the rest of the batch
+    """
+
+    def __init__(
+        self, index: int, spec: tuple, data: Any = None, error: Exception = None
+    ):
+        self.index = index
+        self.spec = spec
+        self.data = data
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """`True` if the request finished without raising"""
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"CallResult(index={self.index}, spec={self.spec!r}, {status})"
+
+
+class CallState:
+    """
+    Progress of one call_api call through its attempts, passed between the
+    request loop steps HTTPClient and AsyncHTTPClient share
+
+    :param method: Specified API method
+    :param endpoint: Specified API endpoint
+    :param url: request URL
+    :param params: Specified parameters for API call
+    :param body: Specified body for API call
+    :param kwargs: request kwargs
+    :param retry_policy: retry policy for the call
+    :param options: return_headers, use_snake_case, override_error_logging,
+        override_data_printing and use_cache, as passed to call_api
+    """
+
+    def __init__(
+        self,
+        method: str,
+        endpoint: str,
+        url: str,
+        params: Union[dict, None],
+        body: Any,
+        kwargs: dict,
+        retry_policy: RetryPolicy,
+        return_headers: bool = False,
+        use_snake_case: bool = True,
+        override_error_logging: bool = False,
+        override_data_printing: bool = False,
+        use_cache: bool = True,
+    ):
+        self.method = method
+        self.endpoint = endpoint
+        self.url = url
+        self.params = params
+        self.body = body
+        self.kwargs = kwargs
+        self.retry_policy = retry_policy
+        self.return_headers = return_headers
+        self.use_snake_case = use_snake_case
+        self.override_error_logging = override_error_logging
+        self.override_data_printing = override_data_printing
+        self.use_cache = use_cache
+
+        self.started = time.monotonic()
+        self.fails = 0
+        self.rate_limited = False
+        self.cache_key = None
+        self.cached = None
+        self.data = None
+        self.done = False
+
+
+class Page:
+    """
+    One page fetched by a Paginator
+
+    :param number: page number, counting from 1
+    :param request: what was asked for, i.e. the offset, page number or cursor
+    :param data: response data
+    :param items: items on the page
+    """
+
+    def __init__(self, number: int, request: Any, data: Any, items: list):
+        self.number = number
+        self.request = request
+        self.data = data
+        self.items = items
+
+    def __repr__(self):
+        return (
+            f"Page(number={self.number}, request={self.request!r}, "
+            f"items={len(self.items)})"
+        )
+
+
+class Paginator(ABC):
+    """
+    Lazily walks the pages of a collection, fetching the next pages in the
+    background while the caller works on the current one
+
+    fetch is called with a request (an offset, page number or cursor) and
+    returns the page data, get_items pulls the list of items out of it. Once
+    a page is fetched the next one is started before the page is handed over.
+    Strategies whose next request can be worked out ahead of time (offsets
+    and page numbers) go further and keep up to prefetch pages in flight.
+    Pagination ends after an empty page, which is still yielded, after
+    max_pages, or when the strategy runs out of pages.
+
+    Fetched pages are yielded in order. Speculative pages that turn out not
+    to be needed are dropped, along with any errors they raised.
+
+    Usage:
+    for item in OffsetPaginator(fetch, lambda data: data["members"], count=1000):
+        ...
+
+    :param fetch: function taking a request and returning the page data
+    :param get_items: function taking the page data and returning its items
+    :param first_request: request for the first page
+    :param max_pages: optional limit on the number of pages
+    :param prefetch: pages fetched ahead in the background, 0 to fetch one at a time
+    """
+
+    # whether next_request can run ahead using the last page's data
+    predictable = False
+
+    def __init__(
+        self,
+        fetch: Callable[[Any], Any],
+        get_items: Callable[[Any], list],
+        first_request: Any = None,
+        max_pages: int = None,
+        prefetch: int = 1,
+    ):
+        self.fetch = fetch
+        self.get_items = get_items
+        self.first_request = first_request
+        self.max_pages = max_pages
+        self.prefetch = max(prefetch, 0)
+
+    @abstractmethod
+    def next_request(self, request: Any, data: Any, items: list) -> Any:
+        """
+        Work out the request for the page after this one
+
+        :param request: request of the current page
+        :param data: latest page data
+        :param items: items on the latest page
+        :return: next request, or None when there are no more pages
+        """
+
+    def __iter__(self) -> Iterator[Any]:
+        for page in self.pages():
+            yield from page.items
+
+    def pages(self) -> Iterator[Page]:
+        """
+        Lazily fetch the pages
+
+        :return: generator of Page
+        """
+
+        executor = ThreadPoolExecutor(self.prefetch) if self.prefetch else None
+        # (request, future) for pages on their way, future is None without prefetch
+        queue = deque()
+
+        def submit(request: Any):
+            future = None
+            if executor:
+                # fetch in the caller's context, i.e. inside its deadline
+                context = contextvars.copy_context()
+                future = executor.submit(context.run, self.fetch, request)
+            queue.append((request, future))
+
+        def drop_queue():
+            for _, future in queue:
+                if future is not None:
+                    future.cancel()
+            queue.clear()
+
+        number = 0
+        try:
+            submit(self.first_request)
+            while queue:
+                request, future = queue.popleft()
+                data = future.result() if future else self.fetch(request)
+                items = self.get_items(data) or []
+                number += 1
+
+                next_request = None
+                if items and (self.max_pages is None or number < self.max_pages):
+                    next_request = self.next_request(request, data, items)
+
+                if next_request is None or (queue and queue[0][0] != next_request):
+                    drop_queue()
+                if next_request is not None and not queue:
+                    submit(next_request)
+
+                if self.predictable and executor and queue:
+                    last = queue[-1][0]
+                    while len(queue) < self.prefetch and (
+                        self.max_pages is None or number + len(queue) < self.max_pages
+                    ):
+                        last = self.next_request(last, data, items)
+                        if last is None:
+                            break
+                        submit(last)
+
+                yield Page(number, request, data, items)
+        finally:
+            drop_queue()
+            if executor:
+                executor.shutdown(wait=False)
+
+
+class CursorPaginator(Paginator):
+    """
+    Paginator following a cursor or next page link from each page
+
+    :param get_next: function taking the page data and returning the next cursor, or None
+    """
+
+    def __init__(self, *args, get_next: Callable[[Any], Any], **kwargs):
+        self.get_next = get_next
+
+        super().__init__(*args, **kwargs)
+
+    def next_request(self, request: Any, data: Any, items: list) -> Any:
+        return self.get_next(data)
+
+
+class OffsetPaginator(Paginator):
+    """
+    Paginator stepping an offset by a page size, requests are offsets
+
+    :param count: items per page
+    :param get_total: optional function taking the page data and returning
+        the total number of items, pagination stops once the offset reaches it
+    """
+
+    predictable = True
+
+    def __init__(
+        self,
+        *args,
+        count: int,
+        get_total: Callable[[Any], Union[int, None]] = None,
+        **kwargs,
+    ):
+        self.count = count
+        self.get_total = get_total
+
+        kwargs.setdefault("first_request", 0)
+        super().__init__(*args, **kwargs)
+
+    def next_request(self, request: int, data: Any, items: list) -> Union[int, None]:
+        offset = request + self.count
+        total = self.get_total(data) if self.get_total else None
+        if total is not None and offset >= total:
+            return None
+
+        return offset
+
+
+class PageNumberPaginator(Paginator):
+    """
+    Paginator counting up page numbers, requests are page numbers starting at 1
+    """
+
+    predictable = True
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("first_request", 1)
+        super().__init__(*args, **kwargs)
+
+    def next_request(self, request: int, data: Any, items: list) -> int:
+        return request + 1
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with a default timeout for requests that don't set one
+
+    :param timeout: seconds, or a (connect, read) tuple
+    """
+
+    def __init__(self, *args, timeout: Union[float, tuple] = None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request: requests.PreparedRequest, timeout=None, **kwargs):
+        return super().send(
+            request, timeout=self.timeout if timeout is None else timeout, **kwargs
+        )
+
+
+class JSONSession(requests.Session):
+    """
+    Session that encodes json= request bodies with a JSONCodec
+
+    :param json_codec: codec, the standard library one by default
+    """
+
+    def __init__(self, json_codec: JSONCodec = None):
+        super().__init__()
+        self.json_codec = json_codec or JSONCodec()
+
+    def prepare_request(self, request: requests.Request) -> requests.PreparedRequest:
+        if request.json is not None and not request.data and not request.files:
+            headers = requests.structures.CaseInsensitiveDict(request.headers or {})
+            if "Content-Type" not in headers and "Content-Type" not in self.headers:
+                headers["Content-Type"] = "application/json"
+            request.headers = headers
+            request.data = self.json_codec.dumps(request.json)
+            request.json = None
+        return super().prepare_request(request)
+
+
 class HTTPClient(Client):
     """
     HTTP Client class built on Client class
@@ -81,9 +431,44 @@ class HTTPClient(Client):
     retry_limit = 3
     retry_wait = 7
     max_connections = 25
+    # connections kept per host, defaults to max_connections when None
+    max_connections_per_host = None
+    # hosts the pool keeps connections for, i.e. the API plus an auth or file host
+    pool_hosts = 4
+    # block when the pool is exhausted instead of opening throwaway connections
+    pool_block = True
+    # set False to turn off request logging for the client
+    log_requests = True
+    # longest params/body/response payload logged at debug level
+    log_payload_limit = 1000
+    # identical GETs in flight at the same time share one request
+    coalesce_gets = True
+    # seconds to connect, and to wait for each read, on every request
+    connect_timeout = 10
+    read_timeout = 60
+    # adapt the requests in flight (up to max_connections) to 429s, 503s and latency
+    adaptive_concurrency = False
+    # JSON library for request bodies and responses, "auto" picks the fastest installed
+    json_library = "auto"
+    # Accept-Encoding sent with every request, None for the library's default
+    accept_encoding = "gzip, deflate"
+    # compress JSON request bodies with "gzip" or "deflate", for APIs that take it
+    request_encoding = None
+    # smallest request body worth compressing, in bytes
+    compress_min_bytes = 1024
 
     def __init__(self, *args, **kwargs):
         self._rate_limits = None
+        self._rate_limiter = None
+        self._retry_policy = None
+        self._rate_limiter_lock = threading.Lock()
+        self.metrics = MetricsCollector()
+        self.json_codec = get_json_codec(self.json_library)
+        self.response_cache = self.create_response_cache()
+        self.circuit_breaker = self.create_circuit_breaker()
+        self.concurrency_limiter = self.create_concurrency_limiter()
+        self.single_flight = SingleFlight()
+        self.hooks: dict[str, list[Callable]] = {"pre_request": [], "post_request": []}
 
         super().__init__(*args, **kwargs)
 
@@ -97,11 +482,262 @@ class HTTPClient(Client):
 
         return self._rate_limits
 
-    def wait_for_rate(self, endpoint: str, response: requests.Response):
+    @property
+    def rate_limiter(self) -> RateLimiter:
         """
-        Wait for the rate limit to pass
+        Get the limiter that paces requests before they are sent
+
+        Assign the same RateLimiter to several clients to share one budget
+        """
+        if self._rate_limiter is None:
+            # every worker thread has to share the same budget
+            with self._rate_limiter_lock:
+                if self._rate_limiter is None:
+                    self._rate_limiter = self.create_rate_limiter()
 
+        return self._rate_limiter
+
+    @rate_limiter.setter
+    def rate_limiter(self, rate_limiter: RateLimiter):
+        self._rate_limiter = rate_limiter
+
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        """
+        Get the policy deciding which failures are retried and the backoff
+
+        Defaults to create_retry_policy(), assign a RetryPolicy to override it
+        """
+        if self._retry_policy is None:
+            return self.create_retry_policy()
+
+        return self._retry_policy
+
+    @retry_policy.setter
+    def retry_policy(self, retry_policy: RetryPolicy):
+        self._retry_policy = retry_policy
+
+    def create_retry_policy(self) -> RetryPolicy:
+        """
+        Create the default retry policy from retry_limit and retry_wait:
+        a linear retry_wait ladder that retries everything but 404s
+        """
+
+        return RetryPolicy(
+            max_retries=self.retry_limit,
+            backoff="linear",
+            base_delay=self.retry_wait,
+            max_delay=None,
+            jitter=False,
+            retry_statuses=None,
+            # 404s are not worth retrying
+            status_rules={404: 0},
+        )
+
+    def create_response_cache(self) -> Union[ResponseCache, None]:
+        """
+        Create the GET response cache, None (no caching) by default
+
+        Subclasses can return a ResponseCache, or assign one to response_cache
+        """
+
+        return None
+
+    def create_circuit_breaker(self) -> Union[CircuitBreaker, None]:
+        """
+        Create the circuit breaker, None (no breaker) by default
+
+        Subclasses can return a CircuitBreaker, or assign one to circuit_breaker
+        """
+
+        return None
+
+    def create_concurrency_limiter(self) -> Union[AdaptiveConcurrencyLimiter, None]:
+        """
+        Create the adaptive concurrency limiter when adaptive_concurrency is set
+
+        Subclasses can return their own, or assign one to concurrency_limiter
+        """
+
+        if not self.adaptive_concurrency:
+            return None
+        return AdaptiveConcurrencyLimiter(max_limit=self.max_connections)
+
+    @contextmanager
+    def concurrency_slot(self):
+        """
+        Hold one of the concurrency limiter's slots for a request, if there's a limiter
+
+        Raises DeadlineExceededException if no slot frees up before the deadline
+        """
+
+        limiter = self.concurrency_limiter
+        if limiter is None:
+            yield
+            return
+
+        if not limiter.acquire(timeout=get_remaining()):
+            raise DeadlineExceededException("Deadline passed waiting to send a request")
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    def check_circuit(self, url: str, endpoint: str = None, probe: bool = True):
+        """
+        Raise CircuitOpenException if the request's circuit is open
+
+        :param url: request url
         :param endpoint: Specified API endpoint
+        :param probe: `True` by default, set `False` to check without taking a half open probe
+        """
+
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_call(url, endpoint, probe=probe)
+
+    def deadline(self, seconds: float):
+        """
+        Context manager capping the combined time of every request, retry,
+        backoff and rate limit wait inside it, see stac_utils.deadline
+
+        Calls that can't finish in time raise DeadlineExceededException.
+
+        Example usage:
+        with van.deadline(seconds=600):
+            van.get_paginated_items("events")
+
+        :param seconds: seconds the block has
+        """
+
+        return deadline(seconds)
+
+    def get_request_kwargs(self, kwargs: dict) -> dict:
+        """
+        Request kwargs with the timeout cut down to what's left of the deadline
+
+        :param kwargs: request kwargs
+        :return: kwargs, with a timeout when there's a deadline
+        """
+
+        timeout = kwargs.get("timeout")
+        connect, read = self.connect_timeout, self.read_timeout
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+        elif timeout is not None:
+            connect = read = timeout
+
+        timeout = cap_timeout(connect, read)
+        return kwargs if timeout is None else {**kwargs, "timeout": timeout}
+
+    def get_request_encoding(self, method: str, endpoint: str) -> Union[str, None]:
+        """
+        Content-Encoding to compress a request body with, request_encoding by default
+
+        Subclasses can override this to only compress the endpoints that accept it
+
+        :param method: Specified API method
+        :param endpoint: Specified API endpoint, or url
+        :return: "gzip", "deflate" or None to send the body as is
+        """
+
+        return self.request_encoding
+
+    def compress_body(self, method: str, endpoint: str, data: bytes) -> bytes:
+        """
+        Compress an encoded request body, if the endpoint takes compressed
+        bodies and it's at least compress_min_bytes
+
+        :param method: Specified API method
+        :param endpoint: Specified API endpoint, or url
+        :param data: encoded body
+        :return: CompressedBody, or data as is
+        """
+
+        encoding = self.get_request_encoding(method, endpoint)
+        if encoding is None or len(data) < self.compress_min_bytes:
+            return data
+        return compress(data, encoding)
+
+    def get_body_headers(self, data: bytes, headers: dict = None) -> dict:
+        """
+        Request headers for an encoded JSON body, with its Content-Encoding
+
+        :param data: encoded body
+        :param headers: request headers
+        :return: headers
+        """
+
+        headers = requests.structures.CaseInsensitiveDict(headers or {})
+        if "Content-Type" not in headers and "Content-Type" not in self.session.headers:
+            headers["Content-Type"] = "application/json"
+        if isinstance(data, CompressedBody):
+            headers["Content-Encoding"] = data.encoding
+        return headers
+
+    def encode_body(self, method: str, endpoint: str, body: Any, kwargs: dict) -> dict:
+        """
+        Request kwargs sending body as JSON, compressed when get_request_encoding
+        gives an encoding
+
+        :param method: Specified API method
+        :param endpoint: Specified API endpoint, or url
+        :param body: JSON body, None for no body
+        :param kwargs: request kwargs
+        :return: kwargs, with the body as json= or as encoded data=
+        """
+
+        if body is None or self.get_request_encoding(method, endpoint) is None:
+            return {"json": body, **kwargs}
+
+        data = self.compress_body(method, endpoint, self.json_codec.dumps(body))
+        return {
+            **kwargs,
+            "data": data,
+            "headers": self.get_body_headers(data, kwargs.get("headers")),
+        }
+
+    def get_cached(
+        self, method: str, endpoint: str, params: dict, kwargs: dict, **flags
+    ) -> tuple[Union[str, None], Union[CacheEntry, None]]:
+        """
+        Look up a GET in the response cache
+
+        Adds the revalidation headers to kwargs when the entry is stale
+
+        :param method: Specified API method
+        :param endpoint: Specified API endpoint
+        :param params: Specified parameters for API call
+        :param kwargs: request kwargs, updated in place
+        :param flags: call_api options that change the data, part of the key
+        :return: cache key (None when the call isn't cacheable) and entry
+        """
+
+        if self.response_cache is None or method.upper() != "GET":
+            return None, None
+
+        key = self.response_cache.make_key(self.format_url(endpoint), params, **flags)
+        entry = self.response_cache.get(key)
+        if entry is not None and not entry.fresh and entry.validators:
+            kwargs["headers"] = {**entry.validators, **(kwargs.get("headers") or {})}
+
+        return key, entry
+
+    def create_rate_limiter(self) -> RateLimiter:
+        """
+        Create the request pacing limiter from the client's rate limits
+        """
+
+        return RateLimiter(self.rate_limits)
+
+    def get_rate_wait(
+        self, endpoint: str, response: requests.Response
+    ) -> Union[int, float]:
+        """
+        Work out how long to wait for the rate limit to pass
+
+        :param endpoint: Specified API endpoint
+        :param response: The rate limited response
+        :return: seconds to wait
         """
 
         rate_wait = self.check_response_for_rate_limit(response)
@@ -115,6 +751,21 @@ class HTTPClient(Client):
             else:
                 rate_wait = self.retry_wait
 
+        return rate_wait
+
+    def wait_for_rate(self, endpoint: str, response: requests.Response):
+        """
+        Wait for the rate limit to pass
+
+        The rate limiter is paused for the same time, so other workers
+        sharing it hold off instead of hitting the limit too
+
+        :param endpoint: Specified API endpoint
+        """
+
+        rate_wait = self.get_rate_wait(endpoint, response)
+        check_deadline(rate_wait, f"wait for the {endpoint} rate limit")
+        self.rate_limiter.pause(endpoint, rate_wait)
         time.sleep(rate_wait)
 
     def check_response_for_rate_limit(
@@ -122,10 +773,41 @@ class HTTPClient(Client):
     ) -> Union[int, float, None]:
         """
         Inspect the response for rate limit information
+
+        Uses Retry-After (seconds or HTTP-date), or the reset time from
+        X-RateLimit-* style headers once the remaining budget is spent
+
+        :param response: API response
+        :return: seconds to wait, or None if the response doesn't say
         """
 
+        info = parse_rate_limit_headers(getattr(response, "headers", None))
+
+        if "retry_after" in info:
+            return info["retry_after"]
+        if info.get("remaining") == 0 and "reset" in info:
+            return info["reset"]
+
         return None
 
+    def update_rate_limit_state(self, endpoint: str, response: requests.Response):
+        """
+        Feed rate limit headers back into the rate limiter, so that once a
+        response says the budget is spent, no worker sends until it resets
+
+        :param endpoint: Specified API endpoint
+        :param response: API response
+        """
+
+        info = parse_rate_limit_headers(getattr(response, "headers", None))
+
+        if info.get("remaining") == 0 and info.get("reset"):
+            logger.info(
+                f"Rate limit budget spent for {endpoint}, "
+                f"holding requests for {info['reset']:.1f}s"
+            )
+            self.rate_limiter.pause(endpoint, info["reset"])
+
     def format_url(self, endpoint: str) -> str:
         """
         Prepare the URL for a request
@@ -138,6 +820,191 @@ class HTTPClient(Client):
 
         return url
 
+    @staticmethod
+    def _byte_count(payload: Any) -> Union[int, None]:
+        if isinstance(payload, (bytes, bytearray, str)):
+            return len(payload)
+        return None
+
+    def _response_sizes(
+        self, response: requests.Response, bytes_in: int = None
+    ) -> dict[str, int]:
+        """
+        Bytes sent and received for a response, uncompressed (bytes_out,
+        bytes_in) and on the wire (wire_bytes_out, wire_bytes_in)
+        """
+        try:
+            request = response.request
+        except (AttributeError, RuntimeError):
+            # httpx raises RuntimeError for responses built without a request
+            request = None
+        # requests keeps the sent payload on .body, httpx on .content
+        sent = getattr(request, "body", None) or getattr(request, "content", None)
+        wire_bytes_out = self._byte_count(sent) or 0
+        bytes_out = wire_bytes_out
+        if isinstance(sent, CompressedBody):
+            bytes_out = sent.raw_size
+        elif isinstance(getattr(request, "extensions", None), dict):
+            # httpx copies the body, so the async client passes the size along
+            bytes_out = request.extensions.get("raw_body_size", wire_bytes_out)
+
+        if bytes_in is None:
+            bytes_in = self._byte_count(getattr(response, "content", None)) or 0
+        # httpx counts the bytes downloaded, urllib3 the bytes read from the socket
+        wire_bytes_in = getattr(response, "num_bytes_downloaded", None)
+        if not isinstance(wire_bytes_in, int):
+            tell = getattr(getattr(response, "raw", None), "tell", None)
+            wire_bytes_in = tell() if callable(tell) else None
+        if not isinstance(wire_bytes_in, int) or not wire_bytes_in:
+            wire_bytes_in = bytes_in
+
+        return {
+            "bytes_out": bytes_out,
+            "bytes_in": bytes_in,
+            "wire_bytes_out": wire_bytes_out,
+            "wire_bytes_in": wire_bytes_in,
+        }
+
+    def add_hook(self, event: str, callback: Callable):
+        """
+        Register a callback run around every request
+
+        pre_request callbacks get method, endpoint, url, params and body,
+        post_request callbacks get method, endpoint, response, elapsed and error,
+        all as keyword arguments
+
+        Example usage: `self.van.add_hook("post_request", lambda **kw: print(kw["elapsed"]))`
+
+        :param event: "pre_request" or "post_request"
+        :param callback: function to call
+        """
+
+        if event not in self.hooks:
+            raise ValueError(f"Unknown hook event: {event}")
+        self.hooks[event].append(callback)
+
+    def run_hooks(self, event: str, **kwargs):
+        """Call every callback registered for an event"""
+
+        for callback in self.hooks[event]:
+            callback(**kwargs)
+
+    def record_response(
+        self,
+        method: str,
+        endpoint: str,
+        response: Union[requests.Response, None],
+        elapsed: float,
+        error: Exception = None,
+        bytes_in: int = None,
+    ):
+        """
+        Log and record metrics, the circuit breaker outcome and the latency
+        for the concurrency limiter of a finished request, then run post_request hooks
+
+        :param method: Specified API method
+        :param endpoint: Specified API endpoint
+        :param response: API response, None if the request raised before getting one
+        :param elapsed: seconds the request took
+        :param error: exception raised by the request, if any
+        :param bytes_in: bytes received, for streamed responses already consumed
+        """
+
+        sizes = {}
+        status_code = None
+        if response is not None:
+            sizes = self._response_sizes(response, bytes_in)
+            self.log_response(method, endpoint, response, elapsed, sizes)
+            status_code = getattr(response, "status_code", None)
+
+        self.metrics.record_request(method, endpoint, status_code, elapsed, **sizes)
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record(
+                self.format_url(endpoint), endpoint, status_code, elapsed
+            )
+        if self.concurrency_limiter is not None:
+            self.concurrency_limiter.record(status_code, elapsed)
+        self.run_hooks(
+            "post_request",
+            method=method,
+            endpoint=endpoint,
+            response=response,
+            elapsed=elapsed,
+            error=error,
+        )
+
+    def _truncate(self, payload: Any) -> str:
+        text = str(payload)
+        if len(text) > self.log_payload_limit:
+            return f"{text[: self.log_payload_limit]}... ({len(text)} chars)"
+        return text
+
+    def log_request(self, method: str, endpoint: str, params: dict, body: Any):
+        """
+        Log the request payload at debug level, only formatting it if
+        debug logging is on
+
+        :param method: Specified API method
+        :param endpoint: Specified API endpoint
+        :param params: Specified parameters for API call
+        :param body: Specified body for API call
+        """
+
+        if self.log_requests and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"{method} {endpoint} params={self._truncate(params)} "
+                f"body={self._truncate(body)}"
+            )
+
+    def log_response(
+        self,
+        method: str,
+        endpoint: str,
+        response: requests.Response,
+        elapsed: float,
+        sizes: dict[str, int] = None,
+    ):
+        """
+        Log a one line summary of the response at info level, with the bytes on
+        the wire when the request or response was compressed
+
+        :param method: Specified API method
+        :param endpoint: Specified API endpoint
+        :param response: API response
+        :param elapsed: seconds the request took
+        :param sizes: bytes sent and received, worked out from the response by default
+        """
+
+        if not (self.log_requests and logger.isEnabledFor(logging.INFO)):
+            return
+
+        sizes = sizes or self._response_sizes(response)
+        compressed = ""
+        if (sizes["wire_bytes_out"], sizes["wire_bytes_in"]) != (
+            sizes["bytes_out"],
+            sizes["bytes_in"],
+        ):
+            compressed = (
+                f" (wire out={sizes['wire_bytes_out']}B in={sizes['wire_bytes_in']}B)"
+            )
+        logger.info(
+            f"{method} {endpoint} {getattr(response, 'status_code', None)} "
+            f"{elapsed * 1000:.0f}ms out={sizes['bytes_out']}B "
+            f"in={sizes['bytes_in']}B{compressed}"
+        )
+
+    def log_data(self, method: str, endpoint: str, data: Any):
+        """
+        Log the transformed response at debug level
+
+        :param method: Specified API method
+        :param endpoint: Specified API endpoint
+        :param data: Data from API call
+        """
+
+        if self.log_requests and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"{method} {endpoint} data={self._truncate(data)}")
+
     def call_api(
         self,
         method: str,
@@ -148,11 +1015,15 @@ class HTTPClient(Client):
         use_snake_case: bool = True,
         override_error_logging: bool = False,
         override_data_printing: bool = False,
+        use_cache: bool = True,
         **kwargs,
     ):
         """
         Basic API request, retries on failures, parses errors
 
+        Identical GETs made at the same time from several threads share one
+        request, set coalesce_gets `False` on the client to turn that off
+
         :param method: Specified API method
         :param endpoint: Specified API endpoint
         :param params: Specified parameters for API call
@@ -160,61 +1031,550 @@ class HTTPClient(Client):
         :param return_headers: `False` by default, set `True` if returning headers is desired
         :param use_snake_case: `True` by default, set `False` if camel case or other is desired
         :param override_error_logging: `False` by default, set `True` if logging not desired
-        :param override_data_printing: `False` by default, set `True` if data printing not desired
+        :param override_data_printing: `False` by default, set `True` if data logging not desired
+        :param use_cache: `True` by default, set `False` to skip the response cache for a GET
         :return: Data from API call
         """
 
-        fails = 0
-        print(f"{method} {endpoint}: {params} {body}")
+        call = functools.partial(
+            self._call_api,
+            method,
+            endpoint,
+            params=params,
+            body=body,
+            return_headers=return_headers,
+            use_snake_case=use_snake_case,
+            override_error_logging=override_error_logging,
+            override_data_printing=override_data_printing,
+            use_cache=use_cache,
+            **kwargs,
+        )
+        if not (self.coalesce_gets and method.upper() == "GET"):
+            return call()
+
+        key = ResponseCache.make_key(
+            self.format_url(endpoint),
+            params,
+            return_headers=return_headers,
+            use_snake_case=use_snake_case,
+            use_cache=use_cache,
+            kwargs=kwargs,
+        )
+        return self.single_flight.do(key, call)
 
-        while True:
-            time.sleep(fails * self.retry_wait)
+    def _call_api(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict = None,
+        body: dict = None,
+        return_headers: bool = False,
+        use_snake_case: bool = True,
+        override_error_logging: bool = False,
+        override_data_printing: bool = False,
+        use_cache: bool = True,
+        **kwargs,
+    ):
+        """Make the request for call_api, with retries, caching and logging"""
+
+        call = self.start_call(
+            method,
+            endpoint,
+            params,
+            body,
+            kwargs,
+            return_headers=return_headers,
+            use_snake_case=use_snake_case,
+            override_error_logging=override_error_logging,
+            override_data_printing=override_data_printing,
+            use_cache=use_cache,
+        )
+        if call.done:
+            return call.data
+
+        while not call.done:
+            delay = self.next_attempt(call)
+            if delay is not None:
+                time.sleep(delay)
+            self.rate_limiter.wait(endpoint)
+            self.before_send(call)
 
-            url = self.format_url(endpoint)
             resp = None
+            sent = time.monotonic()
+            try:
+                with self.concurrency_slot():
+                    sent = time.monotonic()
+                    resp = self.session.request(
+                        method, call.url, **self.get_call_kwargs(call)
+                    )
+                action = self.check_call_response(call, resp, time.monotonic() - sent)
+                if action == "rate_limited":
+                    self.wait_for_rate(endpoint, resp)
+                elif action == "refresh_auth":
+                    self.refresh_auth(resp)
+                self.accept_call_response(call, resp)
+
+            except requests.exceptions.RequestException as E:
+                if not self.should_retry_call(call, resp, E, time.monotonic() - sent):
+                    raise
+
+        return self.finish_call(call)
+
+    def start_call(
+        self,
+        method: str,
+        endpoint: str,
+        params: Union[dict, None],
+        body: Any,
+        kwargs: dict,
+        **options,
+    ) -> CallState:
+        """
+        First step of _call_api, serving a fresh cached GET or logging the request
+
+        The request loop is split into steps shared by HTTPClient and
+        AsyncHTTPClient, so the async client only overrides the waits and the send.
+
+        :param method: Specified API method
+        :param endpoint: Specified API endpoint
+        :param params: Specified parameters for API call
+        :param body: Specified body for API call
+        :param kwargs: request kwargs
+        :param options: call_api options, see CallState
+        :return: state of the call, already done for a fresh cached GET
+        """
+
+        call = CallState(
+            method,
+            endpoint,
+            self.format_url(endpoint),
+            params,
+            body,
+            kwargs,
+            self.retry_policy,
+            **options,
+        )
+        if call.use_cache:
+            call.cache_key, call.cached = self.get_cached(
+                method,
+                endpoint,
+                params,
+                kwargs,
+                return_headers=call.return_headers,
+                use_snake_case=call.use_snake_case,
+            )
+            if call.cached is not None and call.cached.fresh:
+                call.data = call.cached.data
+                call.done = True
+                return call
+
+        self.log_request(method, endpoint, params, body)
+        return call
+
+    def next_attempt(self, call: CallState) -> Union[float, None]:
+        """
+        Check the circuit and deadline before an attempt
+
+        :param call: state of the call
+        :return: seconds to back off before the attempt, None right after a rate limit wait
+        """
+
+        # don't back off for a retry that can't be sent
+        if call.fails:
+            self.check_circuit(call.url, call.endpoint, probe=False)
+            self.metrics.increment("retries", call.method, call.endpoint)
+
+        # a rate limit wait already slept exactly as long as needed
+        if call.rate_limited:
+            call.rate_limited = False
+            return None
+
+        delay = call.retry_policy.get_delay(call.fails)
+        check_deadline(delay, f"{'retry' if call.fails else 'send'} {call.endpoint}")
+        return delay
+
+    def before_send(self, call: CallState):
+        """
+        Check the circuit again once the rate limit allows the request, and run the pre_request hooks
+
+        :param call: state of the call
+        """
+
+        self.check_circuit(call.url, call.endpoint)
+        self.run_hooks(
+            "pre_request",
+            method=call.method,
+            endpoint=call.endpoint,
+            url=call.url,
+            params=call.params,
+            body=call.body,
+        )
+
+    def get_call_kwargs(self, call: CallState) -> dict:
+        """
+        Session request kwargs for an attempt, with the params and encoded body
+
+        :param call: state of the call
+        :return: kwargs
+        """
+
+        kwargs = self.get_request_kwargs(call.kwargs)
+        return {
+            "params": call.params,
+            **self.encode_body(call.method, call.endpoint, call.body, kwargs),
+        }
+
+    def check_call_response(
+        self, call: CallState, response: requests.Response, elapsed: float
+    ) -> Union[str, None]:
+        """
+        Record and transform a response, working out what has to happen before
+        it's accepted or retried
+
+        :param call: state of the call
+        :param response: API response
+        :param elapsed: seconds the request took
+        :return: "rate_limited" to wait for the rate limit, "refresh_auth" to refresh the auth, otherwise None
+        """
+
+        method, endpoint = call.method, call.endpoint
+        self.record_response(method, endpoint, response, elapsed)
+        self.update_rate_limit_state(endpoint, response)
+        if call.cached is not None and response.status_code == 304:
+            call.data = self.response_cache.revalidated(
+                call.cache_key, call.cached, response.headers
+            )
+            call.done = True
+            return None
+
+        call.data = self.transform_response(
+            response,
+            return_headers=call.return_headers,
+            use_snake_case=call.use_snake_case,
+        )
+
+        self.check_for_error(response, call.data, call.override_error_logging)
+
+        if response.status_code in [429]:
+            logger.warning(f"429: Rate limit on {method} {endpoint}")
+            self.metrics.increment("rate_limited", method, endpoint)
+            call.fails += 1
+            call.rate_limited = True
+            return "rate_limited"
+        elif response.status_code in [401]:
+            logger.warning("401: Refreshing client auth")
+            self.metrics.increment("auth_refreshes", method, endpoint)
+            call.fails += 1
+            return "refresh_auth"
+
+        return None
+
+    def accept_call_response(self, call: CallState, response: requests.Response):
+        """
+        Raise for a failed response, otherwise finish the call and cache its data
+
+        :param call: state of the call
+        :param response: API response
+        """
+
+        if call.done:
+            return
+
+        response.raise_for_status()
+        self.check_for_error(response, call.data)
+        self.update_response_cache(
+            call.method, call.endpoint, call.cache_key, call.data, response
+        )
+        call.done = True
+
+    def should_retry_call(
+        self,
+        call: CallState,
+        response: Union[requests.Response, None],
+        error: Exception,
+        elapsed: float,
+    ) -> bool:
+        """
+        Count a failed attempt, recording it if it never got a response
+
+        :param call: state of the call
+        :param response: API response, None if the request raised before getting one
+        :param error: exception raised by the attempt
+        :param elapsed: seconds the attempt took
+        :return: `True` if the call should be retried
+        """
 
+        call.fails += 1
+        if response is None:
+            self.record_response(call.method, call.endpoint, None, elapsed, error)
+
+        # connection errors won't have a status code sometimes
+        status_code = getattr(response, "status_code", None)
+        return call.retry_policy.should_retry(
+            call.fails, status_code, error, call.started
+        )
+
+    def finish_call(self, call: CallState) -> Any:
+        """
+        Log the data of a finished call
+
+        :param call: state of the call
+        :return: Data from API call
+        """
+
+        if not call.override_data_printing:
+            self.log_data(call.method, call.endpoint, call.data)
+
+        return call.data
+
+    def update_response_cache(
+        self,
+        method: str,
+        endpoint: str,
+        cache_key: Union[str, None],
+        data: Any,
+        response: requests.Response,
+    ):
+        """
+        Store a successful GET in the response cache, or invalidate the
+        endpoint after any other successful call
+
+        :param method: Specified API method
+        :param endpoint: Specified API endpoint
+        :param cache_key: key from get_cached, None if the call isn't cacheable
+        :param data: Data from API call
+        :param response: API response
+        """
+
+        if self.response_cache is None:
+            return
+
+        if cache_key is not None:
+            self.response_cache.set(cache_key, endpoint, data, response.headers)
+        elif method.upper() != "GET":
+            self.response_cache.invalidate(endpoint)
+
+    @staticmethod
+    def _normalize_call_spec(spec: Union[tuple, list, dict]) -> tuple:
+        """
+        Turn a call_many spec into (method, endpoint, params, body, kwargs)
+
+        Specs are either (method, endpoint[, params[, body]]) tuples or dicts
+        with `method`, `endpoint`, `params` and `body` keys, where any other
+        dict keys are passed on to call_api
+        """
+
+        if isinstance(spec, dict):
+            extra = {
+                key: value
+                for key, value in spec.items()
+                if key not in {"method", "endpoint", "params", "body"}
+            }
+            return (
+                spec["method"],
+                spec["endpoint"],
+                spec.get("params"),
+                spec.get("body"),
+                extra,
+            )
+
+        method, endpoint, *rest = spec
+        if len(rest) > 2:
+            raise ValueError(f"Too many values in call spec: {spec}")
+        rest += [None] * (2 - len(rest))
+        return method, endpoint, rest[0], rest[1], {}
+
+    def _call_spec(self, index: int, spec: Union[tuple, list, dict], **kwargs):
+        """Run a single call_many spec, capturing any error on the result"""
+
+        method, endpoint, params, body, extra = self._normalize_call_spec(spec)
+        try:
+            data = self.call_api(
+                method, endpoint, params=params, body=body, **{**kwargs, **extra}
+            )
+        except Exception as E:
+            logger.warning(f"{method} {endpoint} failed in batch: {E}")
+            return CallResult(index, spec, error=E)
+
+        return CallResult(index, spec, data=data)
+
+    def stream(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict = None,
+        body: Any = None,
+        chunk_size: int = 1 << 16,
+        **kwargs,
+    ) -> Iterator[bytes]:
+        """
+        Stream a large response, yielding its body decompressed chunk by chunk
+        instead of holding the whole of it in memory
+
+        The request is paced, checked against the circuit breaker and recorded
+        like call_api requests, but isn't retried since the body is consumed as
+        it arrives. Not available on the async clients.
+
+        Usage:
+        with open("/tmp/export.csv", "wb") as file:
+            for chunk in client.stream("GET", "exports/123/download"):
+                file.write(chunk)
+
+        :param method: Specified API method
+        :param endpoint: Specified API endpoint
+        :param params: Specified parameters for API call
+        :param body: Specified body for API call
+        :param chunk_size: most bytes per chunk
+        :param kwargs: any other params accepted by requests
+        :return: decompressed chunks
+        """
+
+        url = self.format_url(endpoint)
+        self.rate_limiter.wait(endpoint)
+        self.check_circuit(url, endpoint)
+
+        with self.concurrency_slot():
+            sent = time.monotonic()
             try:
-                resp = self.session.request(
-                    method, url, params=params, json=body, **kwargs
+                response = self.session.request(
+                    method,
+                    url,
+                    params=params,
+                    stream=True,
+                    **self.encode_body(
+                        method, endpoint, body, self.get_request_kwargs(kwargs)
+                    ),
                 )
-                data = self.transform_response(
-                    resp, return_headers=return_headers, use_snake_case=use_snake_case
+            except requests.exceptions.RequestException as E:
+                elapsed = time.monotonic() - sent
+                self.record_response(method, endpoint, None, elapsed, E)
+                raise
+
+            bytes_in = 0
+            try:
+                response.raise_for_status()
+                # urllib3 decompresses gzip and deflate bodies as they're read
+                for chunk in response.iter_content(chunk_size):
+                    bytes_in += len(chunk)
+                    yield chunk
+            finally:
+                response.close()
+                self.record_response(
+                    method,
+                    endpoint,
+                    response,
+                    time.monotonic() - sent,
+                    bytes_in=bytes_in,
                 )
 
-                self.check_for_error(resp, data, override_error_logging)
+    def download(self, endpoint: str, path: str, method: str = "GET", **kwargs) -> int:
+        """
+        Stream a large response into a file, decompressing it on the way
 
-                if resp.status_code in [429]:
-                    print("429: Rate limit")
-                    fails += 1
-                    self.wait_for_rate(endpoint, resp)
-                elif resp.status_code in [401]:
-                    print("401: Refreshing client auth")
-                    fails += 1
-                    self.refresh_auth(resp)
+        :param endpoint: Specified API endpoint
+        :param path: file to write
+        :param method: Specified API method, GET by default
+        :param kwargs: params, body, chunk_size and anything else stream() takes
+        :return: bytes written
+        """
+
+        written = 0
+        with open(path, "wb") as file:
+            for chunk in self.stream(method, endpoint, **kwargs):
+                written += file.write(chunk)
+        logger.info(f"Downloaded {written}B from {endpoint} to {path}")
+        return written
+
+    def call_many(
+        self,
+        specs: Iterable[Union[tuple, list, dict]],
+        concurrency: int = None,
+        ordered: bool = True,
+        **kwargs,
+    ) -> Iterator[CallResult]:
+        """
+        Run many requests concurrently on a bounded thread pool
+
+        Every request goes through call_api, so retries, auth refreshes and
+        rate limit waits behave exactly as they do for single calls. Specs are
+        consumed lazily, so a generator of 50k records never sits in memory.
+
+        Example usage:
+        for result in self.van.call_many(("GET", f"people/{van_id}") for van_id in van_ids):
+            if result.ok: ...
+
+        :param specs: (method, endpoint[, params[, body]]) tuples or dicts with those keys
+        :param concurrency: number of worker threads, capped at (and defaulting to) max_connections
+        :param ordered: `True` by default, set `False` to yield results as they complete
+        :param kwargs: passed on to every call_api call
+        :return: generator of CallResult, with errors attached rather than raised
+        """
 
-                resp.raise_for_status()
-                self.check_for_error(resp, data)
+        yield from self.map_concurrent(
+            lambda indexed: self._call_spec(*indexed, **kwargs),
+            enumerate(specs),
+            concurrency=concurrency,
+            ordered=ordered,
+        )
 
-                break
+    def map_concurrent(
+        self,
+        func: Callable[[Any], Any],
+        items: Iterable[Any],
+        concurrency: int = None,
+        ordered: bool = True,
+    ) -> Iterator[Any]:
+        """
+        Run a function over items on a bounded thread pool, i.e. requests that
+        don't go through call_api
 
-            except requests.exceptions.RequestException:
-                fails += 1
+        Items are consumed lazily. An error is raised when its result is reached,
+        after which nothing more is sent.
 
-                # 404s are not worth retrying
-                try:
-                    if resp.status_code in [404]:
-                        raise
-                except AttributeError:
-                    # connection errors won't have a status code sometimes
-                    pass
+        :param func: function to call with each item
+        :param items: items to call it with
+        :param concurrency: number of worker threads, capped at (and defaulting to) max_connections
+        :param ordered: `True` by default, set `False` to yield results as they complete
+        :return: generator of the function's results
+        """
 
-                if fails > self.retry_limit:
-                    raise
+        concurrency = min(concurrency or self.max_connections, self.max_connections)
+        concurrency = max(concurrency, 1)
+        items = iter(items)
+        pending = deque()
 
-        if not override_data_printing:
-            print(data)
+        def submit_next(executor: ThreadPoolExecutor) -> bool:
+            try:
+                item = next(items)
+            except StopIteration:
+                return False
+            # run in the caller's context, i.e. inside its deadline
+            context = contextvars.copy_context()
+            pending.append(executor.submit(context.run, func, item))
+            return True
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            # keep a small backlog queued so workers never sit idle
+            while len(pending) < concurrency * 2 and submit_next(executor):
+                pass
 
-        return data
+            try:
+                while pending:
+                    if ordered:
+                        done = [pending.popleft()]
+                    else:
+                        finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        done = [future for future in pending if future in finished]
+                        for future in done:
+                            pending.remove(future)
+
+                    for future in done:
+                        submit_next(executor)
+                        yield future.result()
+            finally:
+                # the caller stopped early, don't send what's still queued
+                for future in pending:
+                    future.cancel()
 
     def get(self, *args, **kwargs):
         """
@@ -268,15 +1628,43 @@ class HTTPClient(Client):
         This could be a static function or calling the API
 
         Rate limits are a tuple of the number of requests allowed
-        over a number of seconds.
+        over a number of minutes, and are used to pace requests
+        before they are sent (see rate_limiter).
         """
 
         return {}
 
+    def create_adapter(self) -> HTTPAdapter:
+        """Create a pooled transport adapter
+
+        Each host gets a pool of max_connections_per_host (or max_connections)
+        connections, and pools are kept for up to pool_hosts hosts. Connections
+        are kept alive and reused across requests, and when a host's pool is
+        exhausted (with pool_block set) callers wait for a free connection
+        instead of opening and discarding extra ones. Requests without a
+        timeout of their own get connect_timeout and read_timeout.
+        """
+
+        return TimeoutHTTPAdapter(
+            timeout=(self.connect_timeout, self.read_timeout),
+            pool_connections=self.pool_hosts,
+            pool_maxsize=self.max_connections_per_host or self.max_connections,
+            pool_block=self.pool_block,
+        )
+
     def create_session(self) -> requests.Session:
-        """Create a session, set headers & auth"""
+        """Create a session, set headers & auth
+
+        Subclasses should call this and then set their headers & auth,
+        so every session shares the same pooled transport
+        """
 
-        session = requests.Session()
+        session = JSONSession(self.json_codec)
+        if self.accept_encoding:
+            session.headers["Accept-Encoding"] = self.accept_encoding
+        adapter = self.create_adapter()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
         return session
 
     def refresh_auth(self, response: requests.Response):
@@ -287,6 +1675,21 @@ class HTTPClient(Client):
         garbage collected (ie: soup.decompose() for BeautifulSoup)
         """
 
+    def decode_json(self, response: requests.Response) -> Any:
+        """
+        Decode a JSON response body with the client's JSON codec
+
+        Responses that don't hold their body as bytes fall back to response.json()
+
+        :param response: API response
+        :return: decoded body
+        """
+
+        content = response.content
+        if not isinstance(content, (bytes, bytearray)):
+            return response.json()
+        return self.json_codec.loads(content)
+
     def check_for_error(self, *args, **kwargs):
         """Check a valid API response for error messages
         and raise an exception as needed
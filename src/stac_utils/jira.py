@@ -1,11 +1,16 @@
 import logging
 import os
+from typing import TYPE_CHECKING
 
 import requests
 
 from json.decoder import JSONDecodeError
+from .async_http import AsyncHTTPClient
 from .http import HTTPClient
 
+if TYPE_CHECKING:
+    import httpx
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,7 +47,7 @@ class JiraClient(HTTPClient):
             "X-Atlassian-Token": "nocheck",
             "Accept": "application/json",
         }
-        session = requests.Session()
+        session = super().create_session()
         session.headers.update(headers)
         session.auth = (self.api_user, self.api_key)
 
@@ -57,7 +62,7 @@ class JiraClient(HTTPClient):
         """
 
         try:
-            data = response.json() or {}
+            data = self.decode_json(response) or {}
         except JSONDecodeError as E:
             if response.status_code == 204:
                 data = {}
@@ -87,3 +92,21 @@ class JiraClient(HTTPClient):
         :return: endpoint string to interact with the ticket's transitions
         """
         return f"{self.get_issue_url(issue_key)}/transitions"
+
+
+class AsyncJiraClient(AsyncHTTPClient, JiraClient):
+    """
+    Asyncio Jira Client, same parameters as JiraClient
+    """
+
+    def create_session(self) -> "httpx.AsyncClient":
+        """
+        Creates and returns async session
+        """
+        session = super().create_session()
+        session.headers.update(
+            {"X-Atlassian-Token": "nocheck", "Accept": "application/json"}
+        )
+        session.auth = (self.api_user, self.api_key)
+
+        return session
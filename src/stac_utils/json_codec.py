@@ -0,0 +1,157 @@
+import json
+import logging
+import math
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+logger = logging.getLogger(__name__)
+
+
+def has_non_finite_float(obj: Any) -> bool:
+    """
+    Check a payload for NaN or infinite floats, which JSON can't represent
+
+    :param obj: JSON-like payload
+    :return: `True` if any float in it is NaN or infinite
+    """
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(has_non_finite_float(val) for val in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(has_non_finite_float(val) for val in obj)
+    return False
+
+
+class JSONCodec:
+    """
+    Encodes request bodies and decodes responses with the standard library json
+
+    Subclasses swap in a faster library, and fall back to the standard library
+    for anything their library rejects. They raise the same json.JSONDecodeError
+    on bad input, and encoding refuses NaN, infinity and dates like json does
+    rather than sending null or a date string. Their output is compact, so its
+    bytes can differ from json's, and orjson still encodes UUIDs and enums that
+    json rejects.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        """
+        Encode a payload, like requests does for json=
+
+        :param obj: JSON-like payload
+        :return: UTF-8 encoded JSON
+        """
+        return json.dumps(obj, allow_nan=False).encode()
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Decode JSON
+
+        :param data: JSON as bytes or text
+        :return: decoded payload
+        """
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    JSON codec using orjson
+    """
+
+    name = "orjson"
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            # dates, dataclasses and subclasses are left to json, which rejects
+            # what it can't encode
+            data = orjson.dumps(
+                obj,
+                option=orjson.OPT_PASSTHROUGH_DATETIME
+                | orjson.OPT_PASSTHROUGH_DATACLASS
+                | orjson.OPT_PASSTHROUGH_SUBCLASS,
+            )
+        except orjson.JSONEncodeError:
+            # i.e. integers wider than 64 bits or non-str keys
+            return super().dumps(obj)
+        # orjson writes NaN and infinity as null, only look for them when there's one
+        if b"null" in data and has_non_finite_float(obj):
+            return super().dumps(obj)
+        return data
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return super().loads(data)
+
+
+class UjsonCodec(JSONCodec):
+    """
+    JSON codec using ujson
+    """
+
+    name = "ujson"
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return ujson.dumps(obj, ensure_ascii=False, allow_nan=False).encode()
+        except (TypeError, OverflowError):
+            return super().dumps(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        try:
+            return ujson.loads(data)
+        except ValueError:
+            return super().loads(data)
+
+
+JSON_CODECS = {
+    "orjson": OrjsonCodec,
+    "ujson": UjsonCodec,
+    "json": JSONCodec,
+}
+
+
+def is_available(name: str) -> bool:
+    """
+    Check the library for a codec is installed
+
+    :param name: "orjson", "ujson" or "json"
+    :return: `True` if it can be used
+    """
+    return {"orjson": orjson, "ujson": ujson}.get(name, json) is not None
+
+
+def get_json_codec(name: str = "auto") -> JSONCodec:
+    """
+    Get a JSON codec by library name
+
+    Usage:
+    codec = get_json_codec()
+    data = codec.loads(response.content)
+
+    :param name: "auto" by default for the fastest installed (orjson, then ujson, then json), or a library name
+    :return: codec
+    """
+    if name == "auto":
+        name = next(name for name in JSON_CODECS if is_available(name))
+    elif name not in JSON_CODECS:
+        raise ValueError(
+            f"Unknown JSON library {name}, expected auto or one of {list(JSON_CODECS)}"
+        )
+    elif not is_available(name):
+        raise ImportError(f"{name} is not installed")
+
+    return JSON_CODECS[name]()
@@ -1,23 +1,58 @@
 import os
 import json
 import requests
-from .http import HTTPClient
+from .async_http import AsyncHTTPClient, sync_only
+from .deadline import check_deadline
+from .fingerprint import FingerprintStore, fingerprint
+from .http import HTTPClient, OffsetPaginator, Page
+from .retry import RetryPolicy
 import logging
 import hashlib
+import tarfile
+import threading
 from datetime import datetime, date
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Union
 import time
-import random
+
+if TYPE_CHECKING:
+    import httpx
+    import pandas
 
 # logging
 logger = logging.getLogger(__name__)
 
+# date formats tried in order, covering most common cases
+DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%m/%d/%Y", "%d-%m-%Y", "%m-%d-%Y")
+BIRTHDAY_FORMATS = ("%m/%d", "%m-%d") + DATE_FORMATS
+# values a column format is inferred from
+FORMAT_SAMPLE_SIZE = 100
+
 
 class MailChimpClient(HTTPClient):
     """
     MailChimp Utils for working with the MailChimp API
     """
 
+    # MailChimp allows 10 simultaneous connections per user
+    # see: https://mailchimp.com/developer/marketing/docs/fundamentals/#api-limits
+    max_connections = 10
+    # seconds a list's merge field types are cached for
+    merge_fields_ttl = 3600
+    # optional JSON file keeping merge field types between runs, i.e. in /tmp on Lambda
+    merge_fields_cache_path = None
+    # merge field type to the formatter method used for it, anything else is text
+    merge_field_formatters = {
+        "date": "format_date",
+        "birthday": "format_birthday",
+        "address": "format_address",
+        "number": "format_number",
+        "zip": "format_zip",
+    }
+    # most emails MailChimp takes in one static segment add / remove call
+    segment_batch_size = 500
+    # members per tag from which update_tags uses batch operations rather than segments
+    tag_batch_threshold = 50000
+
     def __init__(self, api_key: str = None, *args, **kwargs):
         self.api_key = api_key or os.environ.get("MAILCHIMP_API_KEY")
 
@@ -27,11 +62,19 @@ class MailChimpClient(HTTPClient):
         self.base_url = f"https://{self.data_center}.api.mailchimp.com/3.0"
         # set total amount of retries for endpoints
         self.max_retries = 3
+        # list_id: (expires, {"Merge Tag": "Data Type"}, {"Merge Tag": formatter})
+        self._merge_fields = {}
+        self._merge_fields_lock = threading.Lock()
+        # optional FingerprintStore, upserts identical to the last one sent are skipped
+        self.fingerprint_store: FingerprintStore = None
+        # optional FingerprintStore for iter_changed_members marks, kept apart from the
+        # payload fingerprints so clearing one doesn't reset the other
+        self.sync_state_store: FingerprintStore = None
         super().__init__(*args, **kwargs)
 
     def create_session(self) -> requests.Session:
         """Creates MailChimp session"""
-        session = requests.Session()
+        session = super().create_session()
         #  https://mailchimp.com/developer/marketing/docs/fundamentals/#api-structure
         session.auth = ("anystring", self.api_key)
         session.headers.update({"Content-Type": "application/json"})
@@ -47,7 +90,7 @@ class MailChimpClient(HTTPClient):
         try:
             # for handling 204 and empty responses
             if response.status_code != 204 and response.content:
-                data = response.json() or {}
+                data = self.decode_json(response) or {}
             else:
                 data = {}
         except (ValueError, json.decoder.JSONDecodeError):
@@ -55,6 +98,36 @@ class MailChimpClient(HTTPClient):
         data["status_code"] = response.status_code
         return data
 
+    def create_retry_policy(self) -> RetryPolicy:
+        """
+        MailChimp retries use binary exponential backoff with full jitter,
+        making up to max_retries attempts in total
+
+        see: https://en.wikipedia.org/wiki/Exponential_backoff
+        see: https://staclabs.atlassian.net/browse/DATA-4171
+        """
+        return RetryPolicy(
+            max_retries=self.max_retries - 1,
+            backoff="exponential",
+            base_delay=4,
+        )
+
+    def get_body_kwargs(self, method: str, endpoint_url: str, kwargs: dict) -> dict:
+        """
+        Request kwargs with the timeout for the deadline, and a json= body
+        compressed when get_request_encoding gives an encoding
+
+        :param method: HTTP method
+        :param endpoint_url: full API endpoint URL
+        :param kwargs: request kwargs
+        :return: kwargs
+        """
+        kwargs = self.get_request_kwargs(kwargs)
+        if "json" not in kwargs:
+            return kwargs
+        kwargs = dict(kwargs)
+        return self.encode_body(method, endpoint_url, kwargs.pop("json"), kwargs)
+
     def request_with_retry(
         self,
         method: str,
@@ -62,12 +135,11 @@ class MailChimpClient(HTTPClient):
         **kwargs,
     ) -> requests.Response:
         """
-        This method handles MailChimp 429 (rate limit / Too Many Requests) responses with binary exponential backoff
-
-        Retries up to max_retries times, applying a random delay between 0 and (2^(i+1)-1) seconds on each attempt
+        This method handles MailChimp 429 (rate limit / Too Many Requests), transient server errors and
+        connection errors with the client's retry_policy (binary exponential backoff with full jitter by default)
 
-        see: https://en.wikipedia.org/wiki/Exponential_backoff
-        see: https://staclabs.atlassian.net/browse/DATA-4171
+        Makes up to max_retries attempts, and returns the last response if they all fail.
+        Each attempt goes through the pre_request hooks and record_response, like call_api.
 
         :param method: HTTP method used ('GET', 'POST', 'PUT',etc)
         :param endpoint_url: full API endpoint URL
@@ -75,108 +147,351 @@ class MailChimpClient(HTTPClient):
         :return: requests response object
         """
         method = method.upper().strip()
+        # endpoint relative to base_url, for metrics, hooks and the circuit breaker
+        endpoint = endpoint_url
+        if endpoint.startswith(self.base_url):
+            endpoint = endpoint[len(self.base_url) :].strip("/")
+        retry_policy = self.retry_policy
+        started = time.monotonic()
         response = None
+        fails = 0
 
-        for attempt in range(1, self.max_retries + 1):
-            try:
-                response = self.session.request(
-                    method=method, url=endpoint_url, **kwargs
-                )
-            except requests.exceptions.RequestException:
-                continue
+        while True:
+            error = None
+            self.check_circuit(endpoint_url, endpoint)
+            self.run_hooks(
+                "pre_request",
+                method=method,
+                endpoint=endpoint,
+                url=endpoint_url,
+                params=kwargs.get("params"),
+                body=kwargs.get("json"),
+            )
+            with self.concurrency_slot():
+                sent = time.monotonic()
+                try:
+                    response = self.session.request(
+                        method=method,
+                        url=endpoint_url,
+                        **self.get_body_kwargs(method, endpoint_url, kwargs),
+                    )
+                except requests.exceptions.RequestException as E:
+                    error = E
+                    response = None
+            status_code = getattr(response, "status_code", None)
+            self.record_response(
+                method, endpoint, response, time.monotonic() - sent, error
+            )
 
-            # return response if not 429
-            if response.status_code != 429:
+            # return response if it didn't fail
+            if error is None and response.status_code < 400:
                 return response
 
-            # exponential backoff
-            delay = random.randint(0, (2 ** (attempt + 1)) - 1)
-            logger.warning(
-                f"MailChimp rate limit hit (HTTP 429) for HTTP {method} for endpoint: {endpoint_url}. "
-                f"Attempt: {attempt}"
-            )
+            fails += 1
+            if not retry_policy.should_retry(fails, status_code, error, started):
+                break
 
-            # delay!
+            if status_code == 429:
+                logger.warning(
+                    f"MailChimp rate limit hit (HTTP 429) for HTTP {method} for endpoint: {endpoint_url}. "
+                    f"Attempt: {fails}"
+                )
+
+            # delay! unless the retry can't be sent, or can't be sent in time
+            self.check_circuit(endpoint_url, endpoint, probe=False)
+            delay = retry_policy.get_delay(fails)
+            check_deadline(delay, f"retry {method} {endpoint_url}")
             time.sleep(delay)
+            self.metrics.increment("retries", method, endpoint)
 
-        # exhausted retries (returned 429 every time)
-        logger.error(
-            f"All {self.max_retries} retries for HTTP {method} for endpoint {endpoint_url} failed "
-        )
+        # exhausted retries
+        if fails > 1:
+            logger.error(
+                f"All {fails} attempts for HTTP {method} for endpoint {endpoint_url} failed "
+            )
 
         # specific handling if response is still None
         if response is None:
             raise requests.exceptions.RequestException(
-                f"All {self.max_retries} retries for HTTP {method} for endpoint {endpoint_url} failed"
+                f"All {fails} attempts for HTTP {method} for endpoint {endpoint_url} failed"
             )
 
         return response
 
-    def paginate_endpoint(
+    def iter_endpoint(
         self,
         base_endpoint: str,
         data_key: str,
         count: int = 1000,
         max_pages: int = None,
+        by_page: bool = False,
+        prefetch: int = 1,
+        parallel: bool = False,
+        ordered: bool = True,
         **kwargs,
-    ) -> list[dict]:
+    ) -> Iterator[Union[dict, list[dict]]]:
         """
-        Generic pagination helper for MailChimp endpoints that return
-        collections (i.e., lists, members, campaigns, etc.).
+        Lazily yields the items of a MailChimp collection as pages arrive, so memory
+        stays flat however big the collection is (i.e. a 2M member audience).
+
+        Upcoming pages are fetched in the background while the current one is processed.
+        In parallel mode every remaining offset is worked out from the first page's
+        total_items and fetched on max_connections (10) workers at once.
 
         :param base_endpoint: the endpoint to paginate (i.e "lists" or "lists/{list_id}/members").
         :param data_key: the expected key in the response dict (i.e "lists", "members").
         :param count: number of items to fetch per page (default set to 1000, which is MailChimp's max).
         :param max_pages: optional parameter to limit the number of pages (can be used for testing)
-        :return: a list of all collected items from the paginated responses
+        :param by_page: `False` by default, set `True` to yield each page's list of items instead
+        :param prefetch: pages fetched ahead in the background, 0 to fetch one at a time
+        :param parallel: `False` by default, set `True` to fetch all remaining pages concurrently
+        :param ordered: `True` by default, set `False` to yield parallel pages as they complete
+        :return: generator of items, or of lists of items when by_page
         """
-        results = []
-        page = 1
+        url = f"{self.base_url}/{base_endpoint}"
 
         # MailChimp uses offset to skip records for pagination
         # see: https://mailchimp.com/developer/marketing/docs/methods-parameters/#pagination
-        offset = 0
-
-        while True:
-            params = {"count": count, "offset": offset, **kwargs}
-            url = f"{self.base_url}/{base_endpoint}"
-
-            # use request_with_retry
+        def fetch(offset: int) -> dict:
             response = self.request_with_retry(
                 method="GET",
                 endpoint_url=url,
-                params=params,
+                params={"count": count, "offset": offset, **kwargs},
             )
-            data = self.transform_response(response)
+            return self.transform_response(response)
+
+        def get_items(data: dict) -> list[dict]:
+            return data.get(data_key, [])
 
-            items = data.get(data_key, [])
-            if not items:
-                logger.debug(f"No items found at offset {offset} for key '{data_key}'")
+        if parallel:
+            paginator = self.iter_offsets_parallel(
+                fetch, get_items, count, max_pages=max_pages, ordered=ordered
+            )
+        else:
+            paginator = OffsetPaginator(
+                fetch,
+                get_items,
+                count=count,
+                # stop once everything is fetched
+                get_total=lambda data: data.get("total_items", 0),
+                max_pages=max_pages,
+                prefetch=prefetch,
+            ).pages()
+
+        fetched = 0
+        pages = 0
+        for page in paginator:
+            pages = page.number
+            if not page.items:
+                logger.debug(
+                    f"No items found at offset {page.request} for key '{data_key}'"
+                )
+                # every parallel offset was already within total_items
+                if parallel and page.number > 1:
+                    continue
                 break
 
-            results.extend(items)
+            fetched += len(page.items)
+            if by_page:
+                yield page.items
+            else:
+                yield from page.items
 
-            total = data.get("total_items", 0)
+        # include logging flagging completion of pagination and how many total records were fetched
+        logger.info(
+            f"Pagination complete for endpoint {base_endpoint}, spanning {pages} pages. "
+            f"Fetched a total of {fetched} total {data_key} records"
+        )
 
-            # stop if max_pages is set and the page is max_pages
-            if max_pages is not None and page >= max_pages:
-                break
+    def iter_offsets_parallel(
+        self,
+        fetch: Callable[[int], dict],
+        get_items: Callable[[dict], list[dict]],
+        count: int,
+        max_pages: int = None,
+        ordered: bool = True,
+    ) -> Iterator[Page]:
+        """
+        Fetch the first page, then every remaining offset up to its total_items at once
+
+        :param fetch: function taking an offset and returning the page data
+        :param get_items: function taking the page data and returning its items
+        :param count: number of items per page
+        :param max_pages: optional parameter to limit the number of pages
+        :param ordered: `True` by default, set `False` to yield pages as they complete
+        :return: generator of Page
+        """
+        first = fetch(0)
+        yield Page(1, 0, first, get_items(first) or [])
 
-            # increment pagination and offset
-            offset += count
-            page += 1
+        offsets = range(count, first.get("total_items", 0), count)
+        if max_pages is not None:
+            offsets = offsets[: max(max_pages - 1, 0)]
 
-            # if everything is fetched, stop!
-            if offset >= total:
-                break
+        fetched = self.map_concurrent(
+            lambda offset: (offset, fetch(offset)), offsets, ordered=ordered
+        )
+        for number, (offset, data) in enumerate(fetched, 2):
+            yield Page(number, offset, data, get_items(data) or [])
+
+    def paginate_endpoint(
+        self,
+        base_endpoint: str,
+        data_key: str,
+        count: int = 1000,
+        max_pages: int = None,
+        prefetch: int = 1,
+        parallel: bool = False,
+        ordered: bool = True,
+        **kwargs,
+    ) -> list[dict]:
+        """
+        Generic pagination helper for MailChimp endpoints that return
+        collections (i.e., lists, members, campaigns, etc.).
+
+        Set parallel to fetch every page after the first concurrently, i.e. for full audience pulls.
+
+        Use iter_endpoint for collections too big to hold in memory.
+
+        :param base_endpoint: the endpoint to paginate (i.e "lists" or "lists/{list_id}/members").
+        :param data_key: the expected key in the response dict (i.e "lists", "members").
+        :param count: number of items to fetch per page (default set to 1000, which is MailChimp's max).
+        :param max_pages: optional parameter to limit the number of pages (can be used for testing)
+        :param prefetch: pages fetched ahead in the background, 0 to fetch one at a time
+        :param parallel: `False` by default, set `True` to fetch all remaining pages concurrently
+        :param ordered: `True` by default, set `False` to collect parallel pages as they complete
+        :return: a list of all collected items from the paginated responses
+        """
+        return list(
+            self.iter_endpoint(
+                base_endpoint,
+                data_key,
+                count=count,
+                max_pages=max_pages,
+                prefetch=prefetch,
+                parallel=parallel,
+                ordered=ordered,
+                **kwargs,
+            )
+        )
+
+    @staticmethod
+    def build_fields_param(
+        fields: Iterable[str], data_key: str, required: Iterable[str] = ()
+    ) -> str:
+        """
+        Build a fields / exclude_fields projection for a collection, prefixing bare
+        item fields with the collection key, i.e. "email_address" -> "members.email_address"
+
+        :param fields: item fields, or already prefixed / top level fields, as a list or comma separated
+        :param data_key: the collection key in the response dict (i.e "members")
+        :param required: fields always included, i.e. total_items for pagination
+        :return: comma separated fields
+        """
+        if isinstance(fields, str):
+            fields = fields.split(",")
+        top_level = {"total_items", "_links", data_key}
+        projection = []
+        for field in list(fields) + list(required):
+            if field.split(".", 1)[0] not in top_level:
+                field = f"{data_key}.{field}"
+            if field not in projection:
+                projection.append(field)
+        return ",".join(projection)
+
+    def iter_changed_members(
+        self,
+        list_id: str,
+        fields: Iterable[str] = None,
+        exclude_fields: Iterable[str] = None,
+        since_last_changed: str = None,
+        store: FingerprintStore = None,
+        **kwargs,
+    ) -> Iterator[dict]:
+        """
+        Incrementally export an audience, yielding only members changed since the last run
+
+        The latest last_changed seen is kept in the store (the client's sync_state_store
+        by default) once every member has been yielded, and sent as since_last_changed on
+        the next run. A run that stops early leaves the mark where it was. Without a store
+        or a previous mark every member is exported. To export everything again, call
+        reset_changed_members, or pass since_last_changed for a one-off run from that time.
+
+        Example usage:
+        for member in mc.iter_changed_members(list_id, fields=["email_address", "merge_fields"], store=store):
+
+        see: https://mailchimp.com/developer/marketing/api/list-members/list-members-info/
+
+        :param list_id: MailChimp audience (list) id
+        :param fields: member fields to return, i.e. ["email_address", "merge_fields.FNAME"]
+        :param exclude_fields: member fields to leave out, when not using fields
+        :param since_last_changed: ISO 8601 time overriding the stored mark
+        :param store: FingerprintStore to keep the mark in, defaults to sync_state_store
+        :param kwargs: passed on to iter_endpoint, i.e. status, parallel or count
+        :return: generator of members
+        """
+        store = store or self.sync_state_store
+        mark_key = self.get_changed_members_key(list_id)
+        if since_last_changed is None and store is not None:
+            since_last_changed = store.get(mark_key)
+
+        params = {}
+        if since_last_changed:
+            params["since_last_changed"] = since_last_changed
+        if fields:
+            # pagination needs total_items and the mark needs last_changed
+            params["fields"] = self.build_fields_param(
+                fields, "members", ["total_items", "last_changed"]
+            )
+        elif exclude_fields:
+            params["exclude_fields"] = self.build_fields_param(
+                (f for f in exclude_fields if f not in ("last_changed", "total_items")),
+                "members",
+            )
 
-        # include logging flagging completion of pagination and how many total records were fetched
         logger.info(
-            f"Pagination complete for endpoint {base_endpoint}, spanning {page} pages. "
-            f"Fetched a total of {len(results)} total {data_key} records"
+            f"Exporting members of {list_id} changed since "
+            f"{since_last_changed or 'the beginning'}"
         )
+        latest, latest_mark = None, None
+        for member in self.iter_endpoint(
+            f"lists/{list_id}/members", "members", **params, **kwargs
+        ):
+            last_changed = member.get("last_changed")
+            if last_changed:
+                changed = datetime.fromisoformat(last_changed)
+                if latest is None or changed > latest:
+                    latest, latest_mark = changed, last_changed
+            yield member
+
+        if store is not None and latest_mark is not None:
+            store.set(mark_key, latest_mark)
+            store.save()
+            logger.info(f"Members of {list_id} exported up to {latest_mark}")
 
-        return results
+    @staticmethod
+    def get_changed_members_key(list_id: str) -> str:
+        """
+        Key iter_changed_members keeps an audience's since_last_changed mark under
+
+        :param list_id: MailChimp audience (list) id
+        :return: store key
+        """
+        return f"changed_members:{list_id}:since_last_changed"
+
+    def reset_changed_members(self, list_id: str, store: FingerprintStore = None):
+        """
+        Clear an audience's since_last_changed mark, so the next iter_changed_members
+        run exports every member
+
+        :param list_id: MailChimp audience (list) id
+        :param store: FingerprintStore the mark is kept in, defaults to sync_state_store
+        """
+        store = store or self.sync_state_store
+        if store is None:
+            return
+        store.set(self.get_changed_members_key(list_id), "")
+        store.save()
 
     @staticmethod
     def get_subscriber_hash(email: str) -> str:
@@ -191,6 +506,53 @@ class MailChimpClient(HTTPClient):
         # borrowed from: https://endgrate.com/blog/using-the-mailchimp-api-to-create-members-%28with-python-examples%29
         return hashlib.md5(email.lower().encode()).hexdigest()
 
+    @staticmethod
+    def get_subscriber_hashes(
+        emails: Union[Iterable[str], "pandas.Series"],
+    ) -> Union[list[str], "pandas.Series"]:
+        """
+        Subscriber hashes for many emails at once, hashing each distinct email once
+
+        :param emails: list or pandas Series of emails
+        :return: hashes in the same order, a Series with the same index when given a Series
+        """
+        md5 = hashlib.md5
+        hashes = {}
+        result = []
+        for email in emails:
+            subscriber_hash = hashes.get(email)
+            if subscriber_hash is None:
+                subscriber_hash = md5(email.lower().encode()).hexdigest()
+                hashes[email] = subscriber_hash
+            result.append(subscriber_hash)
+
+        if hasattr(emails, "index") and hasattr(emails, "to_list"):
+            return type(emails)(result, index=emails.index, name=emails.name)
+        return result
+
+    @staticmethod
+    def build_tags_payload(tags: list[str], active: bool) -> Union[dict, None]:
+        """
+        Build the body to add or remove member tags
+
+        :param tags: list of exact names of tags to add or remove.
+        :param active: flags whether to add or remove the tags. True adds the tags, and False removes the tags.
+        :return: tags payload, or None if there are no valid tags
+        """
+        # clean & dedupe tags + skip blanks
+        cleaned = [
+            tag.strip() for tag in (tags or []) if isinstance(tag, str) and tag.strip()
+        ]
+        if not cleaned:
+            return None
+
+        return {
+            "tags": [
+                {"name": tag, "status": "active" if active else "inactive"}
+                for tag in cleaned
+            ]
+        }
+
     def update_member_tags(
         self,
         list_id: str,
@@ -209,32 +571,68 @@ class MailChimpClient(HTTPClient):
         :param active: flags whether to add or remove the tags. True adds the tags, and False removes the tags.
         :return: dict with the API response. Always includes status_code, and on an empty tag list will include info
         """
-        # clean & dedupe tags + skip blanks
-        cleaned = [
-            tag.strip() for tag in (tags or []) if isinstance(tag, str) and tag.strip()
-        ]
+        payload = self.build_tags_payload(tags, active)
 
         # return for empty tag list (MailChimp returns 204 even with an empty tag payload, so this mimics that)
-        if not cleaned:
+        if payload is None:
             logger.info(f"No valid tags provided for email: {email_address}")
             return {"status_code": 204, "info": "No valid tags provided"}
 
         subscriber_hash = self.get_subscriber_hash(email_address)
         url = f"{self.base_url}/lists/{list_id}/members/{subscriber_hash}/tags"
+        key = f"{list_id}:{subscriber_hash}:tags"
+        if self.is_unchanged(key, payload):
+            return {"status_code": 304, "info": "Tags unchanged since last update"}
 
-        payload = {
-            "tags": [
-                {"name": tag, "status": "active" if active else "inactive"}
-                for tag in cleaned
-            ]
-        }
         # use request_with_retry
         response = self.request_with_retry(
             method="POST",
             endpoint_url=url,
             json=payload,
         )
-        return self.transform_response(response)
+        data = self.transform_response(response)
+        self.record_fingerprint(key, payload, data["status_code"])
+        return data
+
+    def build_member_payload(
+        self,
+        list_id: str,
+        email_address: str,
+        status_if_new: str = "subscribed",
+        merge_fields: dict = None,
+        **kwargs,
+    ) -> dict:
+        """
+        Build the body to add or update a member, see upsert_member
+
+        :param list_id: MailChimp audience (list) id
+        :param email_address: member email address.
+        :param status_if_new: subscriber's status that is used only when creating a new record
+        :param merge_fields: PII fields unique to a MailChimp audience
+        :return: member payload
+        """
+        payload: dict = {
+            "email_address": email_address,
+            "status_if_new": status_if_new,
+        }
+        if merge_fields:
+            # format merge fields
+            formatted = self.format_merge_fields_for_list(list_id, merge_fields)
+            # add non-empty merge_fields to payload
+            if formatted:
+                payload["merge_fields"] = formatted
+
+        # in case you want to add other parameters to the payload, not covered in the existing parameters
+        # see: https://mailchimp.com/developer/marketing/api/list-members/add-or-update-list-member/
+        other_params = {
+            key: value
+            for key, value in kwargs.items()
+            if value is not None
+            and key not in {"email_address", "status_if_new", "merge_fields"}
+        }
+        payload.update(other_params)
+
+        return payload
 
     def upsert_member(
         self,
@@ -261,6 +659,9 @@ class MailChimpClient(HTTPClient):
         Additional parameters you would like to add to the payload to pass to MailChimp API using **kwargs can be found here:
         https://mailchimp.com/developer/marketing/api/list-members/add-or-update-list-member/
 
+        With a fingerprint_store set on the client, a payload identical to the last one
+        successfully sent for the member is skipped and returns a status_code of 304.
+
         :param list_id: MailChimp audience (list) id
         :param email_address: member email address.
         :param merge_fields: PII fields unique to a MailChimp audience. Make sure to check the front end of MailChimp to get these fields
@@ -270,27 +671,12 @@ class MailChimpClient(HTTPClient):
 
         subscriber_hash = self.get_subscriber_hash(email_address)
         url = f"{self.base_url}/lists/{list_id}/members/{subscriber_hash}"
-
-        payload: dict = {
-            "email_address": email_address,
-            "status_if_new": status_if_new,
-        }
-        if merge_fields:
-            # format merge fields
-            formatted = self.format_merge_fields_for_list(list_id, merge_fields)
-            # add non-empty merge_fields to payload
-            if formatted:
-                payload["merge_fields"] = formatted
-
-        # in case you want to add other parameters to the payload, not covered in the existing parameters
-        # see: https://mailchimp.com/developer/marketing/api/list-members/add-or-update-list-member/
-        other_params = {
-            key: value
-            for key, value in kwargs.items()
-            if value is not None
-            and key not in {"email_address", "status_if_new", "merge_fields"}
-        }
-        payload.update(other_params)
+        payload = self.build_member_payload(
+            list_id, email_address, status_if_new, merge_fields, **kwargs
+        )
+        key = f"{list_id}:{subscriber_hash}"
+        if self.is_unchanged(key, payload):
+            return {"status_code": 304, "info": "Member unchanged since last upsert"}
 
         # use request_with_retry
         response = self.request_with_retry(
@@ -298,7 +684,494 @@ class MailChimpClient(HTTPClient):
             endpoint_url=url,
             json=payload,
         )
-        return self.transform_response(response)
+        data = self.transform_response(response)
+        self.record_fingerprint(key, payload, data["status_code"])
+        return data
+
+    def is_unchanged(self, key: str, payload: dict) -> bool:
+        """
+        Check a payload against the fingerprint store, if there is one
+
+        :param key: record key, the list id and subscriber hash
+        :param payload: payload about to be sent
+        :return: `True` if the same payload was already sent successfully
+        """
+        if self.fingerprint_store is None:
+            return False
+        return self.fingerprint_store.is_unchanged(key, fingerprint(payload))
+
+    def record_fingerprint(self, key: str, payload: dict, status_code: int):
+        """
+        Remember a payload in the fingerprint store, if there is one, when it was accepted
+
+        :param key: record key, the list id and subscriber hash
+        :param payload: payload sent
+        :param status_code: status MailChimp answered with
+        """
+        if self.fingerprint_store is not None and status_code < 400:
+            self.fingerprint_store.record(key, fingerprint(payload))
+
+    def start_batch(self, operations: list[dict]) -> dict:
+        """
+        Submit operations to MailChimp's batch endpoint, which runs them in the background
+
+        see: https://mailchimp.com/developer/marketing/api/batch-operations/start-batch-operation/
+
+        :param operations: dicts with method, path, operation_id and an optional JSON string body
+        :return: batch dict, including its id and status
+        """
+        response = self.request_with_retry(
+            method="POST",
+            endpoint_url=f"{self.base_url}/batches",
+            json={"operations": operations},
+        )
+        response.raise_for_status()
+        batch = self.transform_response(response)
+        logger.info(
+            f"Started MailChimp batch {batch.get('id')} of {len(operations)} operations"
+        )
+        return batch
+
+    def wait_for_batch(
+        self,
+        batch_id: str,
+        poll_interval: float = 5,
+        max_poll_interval: float = 60,
+        timeout: float = 3600,
+    ) -> dict:
+        """
+        Poll a batch until it's finished, backing off exponentially between polls
+
+        :param batch_id: MailChimp batch id
+        :param poll_interval: seconds before the first poll
+        :param max_poll_interval: most seconds between polls
+        :param timeout: most seconds to wait for the batch
+        :return: the finished batch dict, including response_body_url
+        """
+        backoff = RetryPolicy(
+            backoff="exponential",
+            base_delay=poll_interval,
+            max_delay=max_poll_interval,
+            jitter=False,
+        )
+        started = time.monotonic()
+        polls = 0
+
+        while True:
+            response = self.request_with_retry(
+                method="GET", endpoint_url=f"{self.base_url}/batches/{batch_id}"
+            )
+            response.raise_for_status()
+            batch = self.transform_response(response)
+            if batch.get("status") == "finished":
+                logger.info(
+                    f"MailChimp batch {batch_id} finished, "
+                    f"{batch.get('errored_operations', 0)} of "
+                    f"{batch.get('total_operations', 0)} operations errored"
+                )
+                return batch
+
+            polls += 1
+            delay = backoff.get_delay(polls)
+            if time.monotonic() - started + delay > timeout:
+                raise TimeoutError(
+                    f"MailChimp batch {batch_id} not finished after {timeout}s"
+                )
+            logger.debug(
+                f"MailChimp batch {batch_id} is {batch.get('status')}, "
+                f"{batch.get('finished_operations', 0)} of "
+                f"{batch.get('total_operations', 0)} done"
+            )
+            check_deadline(delay, f"poll MailChimp batch {batch_id}")
+            time.sleep(delay)
+
+    def iter_batch_results(self, response_body_url: str) -> Iterator[dict]:
+        """
+        Stream the gzipped tar archive of batch results, yielding each operation's
+        outcome without holding the archive in memory
+
+        :param response_body_url: response_body_url of a finished batch
+        :return: generator of dicts with operation_id, status_code and the parsed response
+        """
+        # the archive is on a presigned URL, which won't take the MailChimp auth
+        with requests.get(response_body_url, stream=True, timeout=300) as response:
+            response.raise_for_status()
+            with tarfile.open(fileobj=response.raw, mode="r|gz") as archive:
+                for member in archive:
+                    if not member.isfile() or not member.size:
+                        continue
+
+                    for operation in json.load(archive.extractfile(member)):
+                        body = operation.get("response")
+                        try:
+                            body = json.loads(body) if body else {}
+                        except ValueError:
+                            pass
+                        yield {
+                            "operation_id": operation.get("operation_id"),
+                            "status_code": operation.get("status_code"),
+                            "response": body,
+                        }
+
+    def run_batches(
+        self,
+        operations: Iterable[dict],
+        batch_size: int = 5000,
+        **wait_kwargs,
+    ) -> dict[str, dict]:
+        """
+        Submit operations in batches of batch_size, wait for them all and collect the outcomes
+
+        :param operations: dicts with method, path, operation_id and an optional JSON string body
+        :param batch_size: most operations per batch
+        :param wait_kwargs: passed on to wait_for_batch (poll_interval, max_poll_interval, timeout)
+        :return: {operation_id: {"status_code": ..., "response": ...}}
+        """
+        batch_ids = []
+        chunk = []
+        for operation in operations:
+            chunk.append(operation)
+            if len(chunk) >= batch_size:
+                batch_ids.append(self.start_batch(chunk)["id"])
+                chunk = []
+        if chunk:
+            batch_ids.append(self.start_batch(chunk)["id"])
+
+        outcomes = {}
+        for batch_id in batch_ids:
+            batch = self.wait_for_batch(batch_id, **wait_kwargs)
+            for result in self.iter_batch_results(batch["response_body_url"]):
+                outcomes[result.pop("operation_id")] = result
+
+        return outcomes
+
+    def bulk_upsert_members(
+        self,
+        list_id: str,
+        members: Iterable[dict],
+        batch_size: int = 5000,
+        **wait_kwargs,
+    ) -> dict[str, dict]:
+        """
+        Add or update many members with MailChimp batch operations, see upsert_member
+
+        Example usage:
+        outcomes = mc.bulk_upsert_members(list_id, ({"email_address": row["email"], "merge_fields": {...}} for row in rows))
+
+        :param list_id: MailChimp audience (list) id
+        :param members: dicts of upsert_member arguments, each with an email_address
+        :param batch_size: most operations per batch
+        :param wait_kwargs: passed on to wait_for_batch (poll_interval, max_poll_interval, timeout)
+        :return: {subscriber hash: {"status_code": ..., "response": ...}}
+        """
+        skipped = {}
+        payloads = {}
+
+        def operations() -> Iterator[dict]:
+            for member in members:
+                member = dict(member)
+                email_address = member.pop("email_address")
+                subscriber_hash = self.get_subscriber_hash(email_address)
+                payload = self.build_member_payload(list_id, email_address, **member)
+                if self.is_unchanged(f"{list_id}:{subscriber_hash}", payload):
+                    skipped[subscriber_hash] = {
+                        "status_code": 304,
+                        "response": {"info": "Member unchanged since last upsert"},
+                    }
+                    continue
+
+                if self.fingerprint_store is not None:
+                    payloads[subscriber_hash] = payload
+                yield {
+                    "method": "PUT",
+                    "path": f"/lists/{list_id}/members/{subscriber_hash}",
+                    "operation_id": subscriber_hash,
+                    "body": json.dumps(payload),
+                }
+
+        outcomes = self.run_batches(operations(), batch_size, **wait_kwargs)
+        for subscriber_hash, payload in payloads.items():
+            outcome = outcomes.get(subscriber_hash)
+            if outcome is not None:
+                self.record_fingerprint(
+                    f"{list_id}:{subscriber_hash}", payload, outcome["status_code"]
+                )
+        return {**skipped, **outcomes}
+
+    def bulk_update_member_tags(
+        self,
+        list_id: str,
+        member_tags: Iterable[dict],
+        batch_size: int = 5000,
+        **wait_kwargs,
+    ) -> dict[str, dict]:
+        """
+        Add or remove tags for many members with MailChimp batch operations, see update_member_tags
+
+        Members without valid tags, or whose tags are unchanged according to the
+        fingerprint store, get the same outcome update_member_tags gives them
+        without being sent.
+
+        :param list_id: MailChimp audience (list) id
+        :param member_tags: dicts with email_address, tags and active
+        :param batch_size: most operations per batch
+        :param wait_kwargs: passed on to wait_for_batch (poll_interval, max_poll_interval, timeout)
+        :return: {subscriber hash: {"status_code": ..., "response": ...}}
+        """
+        skipped = {}
+        payloads = {}
+
+        def operations() -> Iterator[dict]:
+            for member in member_tags:
+                subscriber_hash = self.get_subscriber_hash(member["email_address"])
+                payload = self.build_tags_payload(member.get("tags"), member["active"])
+                if payload is None:
+                    skipped[subscriber_hash] = {
+                        "status_code": 204,
+                        "response": {"info": "No valid tags provided"},
+                    }
+                    continue
+                if self.is_unchanged(f"{list_id}:{subscriber_hash}:tags", payload):
+                    skipped[subscriber_hash] = {
+                        "status_code": 304,
+                        "response": {"info": "Tags unchanged since last update"},
+                    }
+                    continue
+
+                if self.fingerprint_store is not None:
+                    payloads[subscriber_hash] = payload
+                yield {
+                    "method": "POST",
+                    "path": f"/lists/{list_id}/members/{subscriber_hash}/tags",
+                    "operation_id": subscriber_hash,
+                    "body": json.dumps(payload),
+                }
+
+        outcomes = self.run_batches(operations(), batch_size, **wait_kwargs)
+        for subscriber_hash, payload in payloads.items():
+            outcome = outcomes.get(subscriber_hash)
+            if outcome is not None:
+                self.record_fingerprint(
+                    f"{list_id}:{subscriber_hash}:tags",
+                    payload,
+                    outcome["status_code"],
+                )
+        return {**skipped, **outcomes}
+
+    def get_tag_segments(self, list_id: str) -> dict[str, int]:
+        """
+        Map tag names to their static segment ids, tags being static segments in MailChimp
+
+        :param list_id: MailChimp audience (list) id
+        :return: {tag name: segment id}
+        """
+        return {
+            segment["name"]: segment["id"]
+            for segment in self.iter_endpoint(
+                f"lists/{list_id}/segments",
+                "segments",
+                type="static",
+                fields="segments.id,segments.name,total_items",
+            )
+        }
+
+    def create_tag_segment(self, list_id: str, tag: str) -> int:
+        """
+        Create an empty tag (static segment)
+
+        :param list_id: MailChimp audience (list) id
+        :param tag: tag name
+        :return: segment id
+        """
+        response = self.request_with_retry(
+            method="POST",
+            endpoint_url=f"{self.base_url}/lists/{list_id}/segments",
+            json={"name": tag, "static_segment": []},
+        )
+        response.raise_for_status()
+        return self.transform_response(response)["id"]
+
+    def update_segment_members(
+        self, list_id: str, segment_id: int, emails: list[str], active: bool
+    ) -> list[dict]:
+        """
+        Add or remove up to segment_batch_size members of a static segment in one call
+
+        see: https://mailchimp.com/developer/marketing/api/list-segments/batch-add-or-remove-members/
+
+        :param list_id: MailChimp audience (list) id
+        :param segment_id: static segment id
+        :param emails: member email addresses
+        :param active: True adds the members, and False removes them
+        :return: [{"email_address": ..., "error": ...}] for members MailChimp didn't update
+        """
+        response = self.request_with_retry(
+            method="POST",
+            endpoint_url=f"{self.base_url}/lists/{list_id}/segments/{segment_id}",
+            json={"members_to_add" if active else "members_to_remove": emails},
+        )
+        response.raise_for_status()
+        return [
+            {"email_address": email_address, "error": error.get("error")}
+            for error in self.transform_response(response).get("errors") or []
+            for email_address in error.get("email_addresses") or []
+        ]
+
+    def update_tags(
+        self,
+        list_id: str,
+        tag_emails: Union[dict[str, Iterable[str]], "pandas.DataFrame"],
+        active: bool = True,
+        method: str = "auto",
+        email_column: str = "email_address",
+        tag_column: str = "tag",
+        **wait_kwargs,
+    ) -> dict[str, dict]:
+        """
+        Add or remove tags for many members at once, choosing the cheapest way for each tag
+
+        - "segments": the static segment bulk endpoint, segment_batch_size (500) emails per call
+        - "batch": batch operations, for tags with tag_batch_threshold or more emails
+        - "members": concurrent update_member_tags style calls, one per member with all of
+          their tags, for small tags that don't exist yet (MailChimp creates them on use)
+
+        With method "auto" tags that exist go through segments, or batch operations when
+        they're big enough. Emails are normalized and deduplicated up front. With "auto" or
+        "segments", removing a tag the audience doesn't have is skipped (method "skipped"),
+        rather than creating a segment only to remove members from it.
+
+        Example usage:
+        mc.update_tags(list_id, {"Volunteer": volunteer_emails, "Donor": donor_emails})
+
+        :param list_id: MailChimp audience (list) id
+        :param tag_emails: {tag: emails}, or a DataFrame with email_column and tag_column
+        :param active: True adds the tags, and False removes the tags
+        :param method: "auto", "segments", "batch" or "members" for every tag
+        :param email_column: DataFrame column of email addresses
+        :param tag_column: DataFrame column of tag names
+        :param wait_kwargs: passed on to wait_for_batch (poll_interval, max_poll_interval, timeout)
+        :return: {tag: {"method": ..., "members": count, "errors": [{"email_address": ..., "error": ...}]}}
+        """
+        if method not in ("auto", "segments", "batch", "members"):
+            raise ValueError(f"Unknown tag update method {method}")
+
+        if hasattr(tag_emails, "groupby"):
+            tag_emails = {
+                tag: group[email_column]
+                for tag, group in tag_emails.groupby(tag_column)
+            }
+
+        tag_members = {}
+        for tag, emails in tag_emails.items():
+            tag = tag.strip() if isinstance(tag, str) else None
+            if not tag:
+                continue
+            cleaned = (
+                email.strip().lower()
+                for email in emails
+                if isinstance(email, str) and email.strip()
+            )
+            tag_members.setdefault(tag, {}).update(dict.fromkeys(cleaned))
+
+        segments = {}
+        if method in ("auto", "segments"):
+            segments = self.get_tag_segments(list_id)
+
+        methods = {}
+        for tag, emails in tag_members.items():
+            if not active and method in ("auto", "segments") and tag not in segments:
+                # no member has the tag, so there's nothing to remove
+                methods[tag] = "skipped"
+            elif method != "auto":
+                methods[tag] = method
+            elif len(emails) >= self.tag_batch_threshold:
+                methods[tag] = "batch"
+            elif tag in segments or len(emails) > self.max_connections:
+                methods[tag] = "segments"
+            else:
+                methods[tag] = "members"
+
+        results = {
+            tag: {
+                "method": methods[tag],
+                "members": 0 if methods[tag] == "skipped" else len(emails),
+                "errors": [],
+            }
+            for tag, emails in tag_members.items()
+        }
+
+        # segments: chunks of every tag share the connection pool
+        chunks = []
+        for tag, emails in tag_members.items():
+            if methods[tag] != "segments":
+                continue
+            if tag not in segments:
+                segments[tag] = self.create_tag_segment(list_id, tag)
+            emails = list(emails)
+            for start in range(0, len(emails), self.segment_batch_size):
+                chunks.append((tag, emails[start : start + self.segment_batch_size]))
+
+        for tag, errors in self.map_concurrent(
+            lambda chunk: (
+                chunk[0],
+                self.update_segment_members(
+                    list_id, segments[chunk[0]], chunk[1], active
+                ),
+            ),
+            chunks,
+        ):
+            results[tag]["errors"].extend(errors)
+
+        # batch and members: one operation per member with all of their tags
+        for path in ("batch", "members"):
+            member_tags = {}
+            for tag, emails in tag_members.items():
+                if methods[tag] == path:
+                    for email in emails:
+                        member_tags.setdefault(email, []).append(tag)
+            if not member_tags:
+                continue
+
+            hashes = dict(zip(member_tags, self.get_subscriber_hashes(member_tags)))
+            if path == "batch":
+                outcomes = self.bulk_update_member_tags(
+                    list_id,
+                    (
+                        {"email_address": email, "tags": tags, "active": active}
+                        for email, tags in member_tags.items()
+                    ),
+                    **wait_kwargs,
+                )
+            else:
+                outcomes = dict(
+                    self.map_concurrent(
+                        lambda email: (
+                            hashes[email],
+                            self.update_member_tags(
+                                list_id, email, member_tags[email], active
+                            ),
+                        ),
+                        member_tags,
+                    )
+                )
+
+            for email, tags in member_tags.items():
+                outcome = outcomes.get(hashes[email]) or {}
+                if outcome.get("status_code", 0) < 400:
+                    continue
+                response = outcome.get("response", outcome)
+                error = response.get("detail") or response.get("title")
+                for tag in tags:
+                    results[tag]["errors"].append(
+                        {"email_address": email, "error": error}
+                    )
+
+        for tag, result in results.items():
+            logger.info(
+                f"{'Added' if active else 'Removed'} tag {tag} for {result['members']} "
+                f"members via {result['method']}, {len(result['errors'])} errors"
+            )
+        return results
 
     def get_merge_fields_data_type_map(self, list_id: str, **kwargs) -> dict[str, str]:
         """
@@ -317,6 +1190,98 @@ class MailChimpClient(HTTPClient):
         )
         return {field["tag"]: field.get("type") for field in fields if field.get("tag")}
 
+    def get_merge_fields(self, list_id: str) -> dict[str, str]:
+        """
+        Cached get_merge_fields_data_type_map, refetched after merge_fields_ttl seconds
+
+        :param list_id: MailChimp audience (list) id
+        :return: dict mapping {"Merge Tag": "Data Type"}
+        """
+        return self._get_merge_fields_entry(list_id)[1]
+
+    def get_merge_field_formatters(self, list_id: str) -> dict[str, Callable]:
+        """
+        Formatter for every merge field of a list, built once per cached schema
+
+        :param list_id: MailChimp audience (list) id
+        :return: dict mapping {"Merge Tag": formatter}
+        """
+        return self._get_merge_fields_entry(list_id)[2]
+
+    def invalidate_merge_fields(self, list_id: str = None):
+        """
+        Drop the cached merge fields for a list, or for every list, i.e. after changing them
+
+        :param list_id: MailChimp audience (list) id, None for all lists
+        """
+        with self._merge_fields_lock:
+            if list_id is None:
+                self._merge_fields.clear()
+            else:
+                self._merge_fields.pop(list_id, None)
+
+            if self.merge_fields_cache_path:
+                cached = self._load_merge_fields_file()
+                if list_id is None:
+                    cached.clear()
+                else:
+                    cached.pop(list_id, None)
+                self._save_merge_fields_file(cached)
+
+    def _get_merge_fields_entry(self, list_id: str) -> tuple:
+        with self._merge_fields_lock:
+            entry = self._merge_fields.get(list_id)
+            if entry is not None and entry[0] > time.time():
+                return entry
+
+            cached = {}
+            if self.merge_fields_cache_path:
+                cached = self._load_merge_fields_file()
+                stored = cached.get(list_id)
+                if stored and stored["expires"] > time.time():
+                    entry = self._build_merge_fields_entry(
+                        stored["expires"], stored["types"]
+                    )
+                    self._merge_fields[list_id] = entry
+                    return entry
+
+            types = self.get_merge_fields_data_type_map(list_id)
+            entry = self._build_merge_fields_entry(
+                time.time() + self.merge_fields_ttl, types
+            )
+            self._merge_fields[list_id] = entry
+
+            if self.merge_fields_cache_path:
+                cached[list_id] = {"expires": entry[0], "types": types}
+                self._save_merge_fields_file(cached)
+
+            return entry
+
+    def _build_merge_fields_entry(self, expires: float, types: dict[str, str]) -> tuple:
+        formatters = {
+            tag: getattr(
+                self, self.merge_field_formatters.get(data_type, "format_text")
+            )
+            for tag, data_type in types.items()
+        }
+        return expires, types, formatters
+
+    def _load_merge_fields_file(self) -> dict:
+        try:
+            with open(self.merge_fields_cache_path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_merge_fields_file(self, cached: dict):
+        temp_path = f"{self.merge_fields_cache_path}.tmp"
+        try:
+            with open(temp_path, "w") as file:
+                json.dump(cached, file)
+            os.replace(temp_path, self.merge_fields_cache_path)
+        except OSError as E:
+            logger.warning(f"Unable to save merge fields cache: {E}")
+
     def format_merge_fields_for_list(
         self,
         list_id: str,
@@ -325,13 +1290,15 @@ class MailChimpClient(HTTPClient):
         """
         This method formats MailChimp merge fields for a given audience (list_id).
 
+        The audience's merge field types are cached, see get_merge_fields
+
         see: https://mailchimp.com/developer/marketing/docs/merge-fields/#add-merge-data-to-contacts
 
         :param list_id: MailChimp audience (list) id
         :param merge_fields: MailChimp merge fields dict
         :return: formatted MailChimp merge fields dict
         """
-        merge_fields_data_type_map = self.get_merge_fields_data_type_map(list_id)
+        formatters = self.get_merge_field_formatters(list_id)
         merge_fields_cleaned = {}
 
         for tag, value in (merge_fields or {}).items():
@@ -343,34 +1310,40 @@ class MailChimpClient(HTTPClient):
                 if value == "":
                     continue
 
-            data_type = merge_fields_data_type_map.get(tag)
+            formatter = formatters.get(tag)
 
             # raise error if unknown merge tags (all merge tags should be valid)
-            if data_type is None:
+            if formatter is None:
                 raise KeyError(f"Unknown merge tag for this audience: {list_id}: {tag}")
 
-            if data_type == "date":
-                merge_fields_cleaned[tag] = self.format_date(value)
-            elif data_type == "birthday":
-                merge_fields_cleaned[tag] = self.format_birthday(value)
-            elif data_type == "address":
-                merge_fields_cleaned[tag] = self.format_address(value)
-            elif data_type == "number":
-                merge_fields_cleaned[tag] = self.format_number(value)
-            elif data_type == "zip":
-                if len(str(value)) > 5:
-                    raise ValueError("Zip codes must be 5 digits")
-                merge_fields_cleaned[tag] = str(value)
-            else:
-                # text, radio, dropdown, phone, url, imageurl -- all string
-                merge_fields_cleaned[tag] = (
-                    str(value)
-                    if not isinstance(value, (int, float, bool, dict, list, tuple))
-                    else value
-                )
+            merge_fields_cleaned[tag] = formatter(value)
 
         return merge_fields_cleaned
 
+    @staticmethod
+    def format_text(val: Any) -> Any:
+        """
+        Helper method for text, radio, dropdown, phone, url and imageurl fields -- all string
+
+        :param val: value to format
+        :return: string, or the value as is for numbers, bools and containers
+        """
+        if isinstance(val, (int, float, bool, dict, list, tuple)):
+            return val
+        return str(val)
+
+    @staticmethod
+    def format_zip(val: Any) -> str:
+        """
+        Helper method to ensure MailChimp zip format is met
+
+        :param val: zip value
+        :return: zip as a string
+        """
+        if len(str(val)) > 5:
+            raise ValueError("Zip codes must be 5 digits")
+        return str(val)
+
     @staticmethod
     def format_date(val: Any) -> str:
         """
@@ -388,7 +1361,7 @@ class MailChimpClient(HTTPClient):
         if isinstance(val, str):
             val = val.strip()
             # covers most common cases
-            for format in ("%Y-%m-%d", "%Y/%m/%d", "%m/%d/%Y", "%d-%m-%Y", "%m-%d-%Y"):
+            for format in DATE_FORMATS:
                 try:
                     return datetime.strptime(val, format).strftime("%Y-%m-%d")
                 except ValueError:
@@ -412,15 +1385,7 @@ class MailChimpClient(HTTPClient):
         if isinstance(val, str):
             val = val.strip()
             # covers most cases
-            for format in (
-                "%m/%d",
-                "%m-%d",
-                "%Y-%m-%d",
-                "%Y/%m/%d",
-                "%m/%d/%Y",
-                "%d-%m-%Y",
-                "%m-%d-%Y",
-            ):
+            for format in BIRTHDAY_FORMATS:
                 try:
                     bday = datetime.strptime(val, format)
                     return f"{bday.month:02d}/{bday.day:02d}"
@@ -505,3 +1470,348 @@ class MailChimpClient(HTTPClient):
             except ValueError:
                 pass
         raise ValueError(f"Not a valid number: {val}")
+
+    @staticmethod
+    def infer_date_format(
+        values: Iterable[Any], formats: Iterable[str]
+    ) -> Union[str, None]:
+        """
+        Pick the first format that parses a sample of the column's strings,
+        or the one parsing most of them
+
+        :param values: column values
+        :param formats: formats to try, in order of preference
+        :return: format, or None without strings to go on
+        """
+        sample = []
+        for val in values:
+            if isinstance(val, str) and val.strip():
+                sample.append(val.strip())
+                if len(sample) >= FORMAT_SAMPLE_SIZE:
+                    break
+        if not sample:
+            return None
+
+        best, best_parsed = None, 0
+        for format in formats:
+            parsed = 0
+            for val in sample:
+                try:
+                    datetime.strptime(val, format)
+                    parsed += 1
+                except ValueError:
+                    pass
+            if parsed == len(sample):
+                return format
+            if parsed > best_parsed:
+                best, best_parsed = format, parsed
+        return best
+
+    @staticmethod
+    def format_column(
+        values: Union[Iterable[Any], "pandas.Series"],
+        formatter: Callable[[Any], Any],
+        errors: str = "raise",
+    ) -> Union[list, "pandas.Series"]:
+        """
+        Apply a scalar formatter to a column, formatting each distinct value once
+
+        Blank values (None, NaN, empty strings) stay None, as format_merge_fields_for_list skips them.
+
+        :param values: list or pandas Series of values
+        :param formatter: function formatting one value
+        :param errors: "raise" to raise on values that can't be formatted, "coerce" to make them None
+        :return: formatted values, a Series with the same index when given a Series
+        """
+        if errors not in ("raise", "coerce"):
+            raise ValueError(f"Unknown errors option {errors}")
+
+        def is_blank(val: Any) -> bool:
+            if val is None:
+                return True
+            if isinstance(val, str):
+                return not val.strip()
+            try:
+                # NaN and NaT aren't equal to themselves
+                return bool(val != val)
+            except (TypeError, ValueError):
+                # pandas NA can't be used as a bool
+                return True
+
+        formatted = {}
+        result = []
+        for val in values:
+            if is_blank(val):
+                result.append(None)
+                continue
+            # dicts (addresses) can't be dict keys
+            try:
+                key = (type(val), val)
+                hash(key)
+            except TypeError:
+                key = None
+
+            if key is not None and key in formatted:
+                result.append(formatted[key])
+                continue
+            try:
+                out = formatter(val)
+            except ValueError:
+                if errors == "raise":
+                    raise
+                out = None
+            if key is not None:
+                formatted[key] = out
+            result.append(out)
+
+        if hasattr(values, "index") and hasattr(values, "to_list"):
+            return type(values)(
+                result, index=values.index, name=values.name, dtype=object
+            )
+        return result
+
+    @classmethod
+    def format_date_series(
+        cls,
+        values: Union[Iterable[Any], "pandas.Series"],
+        format: Union[str, None],
+        out_format: str,
+        formatter: Callable[[Any], Any],
+        errors: str = "raise",
+    ) -> Union[list, "pandas.Series"]:
+        """
+        Format a column of dates in one go, strings in format are parsed by pandas and
+        only the values that aren't (blanks, date objects, outliers) go to formatter
+
+        :param values: list or pandas Series of dates
+        :param format: format of the column's strings, from infer_date_format
+        :param out_format: strftime format of the output
+        :param formatter: scalar formatter for the values pandas couldn't parse
+        :param errors: "raise" to raise on values that can't be parsed, "coerce" to make them None
+        :return: formatted values, a Series with the same index when given a Series
+        """
+        import pandas as pd
+
+        if errors not in ("raise", "coerce"):
+            raise ValueError(f"Unknown errors option {errors}")
+
+        is_series = isinstance(values, pd.Series)
+        series = values if is_series else pd.Series(list(values), dtype=object)
+        if series.dtype.kind == "M":
+            parsed = series
+        elif format is not None and series.dtype.kind == "O":
+            try:
+                strings = series.str.strip()
+            except AttributeError:
+                # no strings to parse
+                strings = pd.Series(None, index=series.index, dtype=object)
+            parsed = pd.to_datetime(strings, format=format, errors="coerce")
+        else:
+            parsed = pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns]")
+
+        result = parsed.dt.strftime(out_format).astype(object)
+        result.name = series.name
+        outliers = parsed.isna().to_numpy()
+        if outliers.any():
+            result[outliers] = cls.format_column(
+                series[outliers].to_list(), formatter, errors
+            )
+        return result if is_series else result.to_list()
+
+    @classmethod
+    def format_date_column(
+        cls, values: Union[Iterable[Any], "pandas.Series"], errors: str = "raise"
+    ) -> Union[list, "pandas.Series"]:
+        """
+        Column version of format_date, for preparing many rows at once
+
+        The date format is inferred once for the column and pandas parses every string
+        in it with that format, so "01-02-2020" and "01-13-2020" in the same column are
+        both read month first. Strings that don't match it fall back to format_date.
+
+        :param values: list or pandas Series of dates
+        :param errors: "raise" to raise on values that can't be parsed, "coerce" to make them None
+        :return: YYYY-MM-DD strings, a Series with the same index when given a Series
+        """
+        values = values if hasattr(values, "__len__") else list(values)
+        format = cls.infer_date_format(values, DATE_FORMATS)
+        return cls.format_date_series(
+            values, format, "%Y-%m-%d", cls.format_date, errors
+        )
+
+    @classmethod
+    def format_birthday_column(
+        cls, values: Union[Iterable[Any], "pandas.Series"], errors: str = "raise"
+    ) -> Union[list, "pandas.Series"]:
+        """
+        Column version of format_birthday, see format_date_column
+
+        :param values: list or pandas Series of birthdays or dates
+        :param errors: "raise" to raise on values that can't be parsed, "coerce" to make them None
+        :return: MM/DD strings, a Series with the same index when given a Series
+        """
+        values = values if hasattr(values, "__len__") else list(values)
+        format = cls.infer_date_format(values, BIRTHDAY_FORMATS)
+        return cls.format_date_series(
+            values, format, "%m/%d", cls.format_birthday, errors
+        )
+
+    @classmethod
+    def format_number_column(
+        cls, values: Union[Iterable[Any], "pandas.Series"], errors: str = "raise"
+    ) -> Union[list, "pandas.Series"]:
+        """
+        Column version of format_number
+
+        Numeric Series are converted in one go, anything else is formatted per distinct value.
+
+        :param values: list or pandas Series of numbers or numeric strings
+        :param errors: "raise" to raise on values that aren't numbers, "coerce" to make them None
+        :return: ints and floats, a Series with the same index when given a Series
+        """
+        dtype = getattr(values, "dtype", None)
+        if dtype is not None and dtype.kind in "iuf":
+            return values.astype(object).where(values.notna(), None)
+        return cls.format_column(values, cls.format_number, errors)
+
+
+class SubscriberHashIndex:
+    """
+    In-memory subscriber hash -> source row index, built once per sync to join
+    MailChimp results (member ids, batch operation ids) back to the source data
+
+    Example usage:
+    index = SubscriberHashIndex.from_records(rows, email_key="email")
+    for member in mc.iter_changed_members(list_id):
+        row = index.get(member["id"])
+
+    :param emails: emails to index
+    :param values: what each email maps to, i.e. rows or row numbers, defaults to the emails
+    """
+
+    def __init__(
+        self,
+        emails: Union[Iterable[str], "pandas.Series"] = (),
+        values: Iterable[Any] = None,
+    ):
+        self._values: dict[str, Any] = {}
+        self._emails: dict[str, str] = {}
+        emails = list(emails)
+        values = emails if values is None else list(values)
+        if len(values) != len(emails):
+            raise ValueError("emails and values must be the same length")
+
+        hashes = MailChimpClient.get_subscriber_hashes(emails)
+        for subscriber_hash, email, value in zip(hashes, emails, values):
+            self._emails[subscriber_hash] = email
+            self._values[subscriber_hash] = value
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[dict], email_key: str = "email_address"
+    ) -> "SubscriberHashIndex":
+        """
+        Index records by the subscriber hash of their email, records without one are left out
+
+        :param records: dicts, i.e. source rows
+        :param email_key: key of the email in each record
+        :return: index of subscriber hash to record
+        """
+        records = [record for record in records if record.get(email_key)]
+        return cls((record[email_key] for record in records), records)
+
+    @classmethod
+    def from_dataframe(
+        cls, frame: "pandas.DataFrame", email_column: str = "email_address"
+    ) -> "SubscriberHashIndex":
+        """
+        Index a DataFrame's row labels by the subscriber hash of their email
+
+        :param frame: source DataFrame
+        :param email_column: column of emails
+        :return: index of subscriber hash to row label, for frame.loc
+        """
+        emails = frame[email_column].dropna()
+        return cls(emails, emails.index)
+
+    def add(self, email: str, value: Any = None) -> str:
+        """
+        Add an email to the index
+
+        :param email: email address
+        :param value: what it maps to, defaults to the email
+        :return: its subscriber hash
+        """
+        subscriber_hash = MailChimpClient.get_subscriber_hash(email)
+        self._emails[subscriber_hash] = email
+        self._values[subscriber_hash] = email if value is None else value
+        return subscriber_hash
+
+    def get(self, subscriber_hash: str, default: Any = None) -> Any:
+        """
+        Value for a subscriber hash
+
+        :param subscriber_hash: MailChimp member id
+        :param default: returned when the hash isn't indexed
+        :return: value, or default
+        """
+        return self._values.get(subscriber_hash, default)
+
+    def get_email(self, subscriber_hash: str) -> Union[str, None]:
+        """
+        Source email for a subscriber hash
+
+        :param subscriber_hash: MailChimp member id
+        :return: email as given, or None
+        """
+        return self._emails.get(subscriber_hash)
+
+    def __getitem__(self, subscriber_hash: str) -> Any:
+        return self._values[subscriber_hash]
+
+    def __contains__(self, subscriber_hash: str) -> bool:
+        return subscriber_hash in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+
+class AsyncMailChimpClient(AsyncHTTPClient, MailChimpClient):
+    """
+    Asyncio MailChimp Client for the get/post/put/patch/delete request methods
+
+    The helpers built on request_with_retry (pagination, members, batches,
+    tags and merge fields) are only on MailChimpClient and raise TypeError here.
+    """
+
+    request_with_retry = sync_only("request_with_retry")
+    iter_endpoint = sync_only("iter_endpoint")
+    iter_offsets_parallel = sync_only("iter_offsets_parallel")
+    paginate_endpoint = sync_only("paginate_endpoint")
+    iter_changed_members = sync_only("iter_changed_members")
+    update_member_tags = sync_only("update_member_tags")
+    build_member_payload = sync_only("build_member_payload")
+    upsert_member = sync_only("upsert_member")
+    start_batch = sync_only("start_batch")
+    wait_for_batch = sync_only("wait_for_batch")
+    run_batches = sync_only("run_batches")
+    bulk_upsert_members = sync_only("bulk_upsert_members")
+    bulk_update_member_tags = sync_only("bulk_update_member_tags")
+    get_tag_segments = sync_only("get_tag_segments")
+    create_tag_segment = sync_only("create_tag_segment")
+    update_segment_members = sync_only("update_segment_members")
+    update_tags = sync_only("update_tags")
+    get_merge_fields_data_type_map = sync_only("get_merge_fields_data_type_map")
+    get_merge_fields = sync_only("get_merge_fields")
+    get_merge_field_formatters = sync_only("get_merge_field_formatters")
+    format_merge_fields_for_list = sync_only("format_merge_fields_for_list")
+
+    def create_session(self) -> "httpx.AsyncClient":
+        """Creates async MailChimp session"""
+        session = super().create_session()
+        session.auth = ("anystring", self.api_key)
+        session.headers.update({"Content-Type": "application/json"})
+        return session
@@ -0,0 +1,220 @@
+import logging
+import math
+import random
+import re
+import threading
+from collections import defaultdict
+from typing import Union
+
+logger = logging.getLogger(__name__)
+
+# path segments that are record ids rather than part of the endpoint template:
+# numbers, UUIDs, hex ids/hashes (MailChimp list ids, subscriber hashes) and Jira keys
+ID_SEGMENT_PATTERN = re.compile(
+    r"^(\d+"
+    r"|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+    r"|(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,}"
+    r"|[A-Z][A-Z0-9]+-\d+)$"
+)
+
+
+def normalize_endpoint(endpoint: str) -> str:
+    """
+    Turn an endpoint into its template, so metrics for
+    "people/123?$expand=phones" and "people/456" are grouped as "people/{id}"
+
+    :param endpoint: Specified API endpoint
+    :return: endpoint template
+    """
+    path = endpoint.split("?", 1)[0].strip("/")
+    return "/".join(
+        "{id}" if ID_SEGMENT_PATTERN.match(segment) else segment
+        for segment in path.split("/")
+    )
+
+
+class LatencyHistogram:
+    """
+    Latency samples for one endpoint, kept to a fixed size with reservoir
+    sampling so long runs don't grow without bound
+
+    :param max_samples: most samples kept
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        self.max_samples = max_samples
+        self.samples: list[float] = []
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if len(self.samples) < self.max_samples:
+            self.samples.append(seconds)
+        else:
+            index = random.randrange(self.count)
+            if index < self.max_samples:
+                self.samples[index] = seconds
+
+    def percentile(self, percent: float) -> Union[float, None]:
+        """
+        Latency at a percentile, nearest rank
+
+        :param percent: percentile between 0 and 100
+        :return: seconds, or None without samples
+        """
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = math.ceil(percent / 100 * len(ordered))
+        return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+class MetricsCollector:
+    """
+    Thread-safe in-memory request metrics, keyed by method and endpoint template
+
+    Tracks requests, errors, retries, 429s, 401 refreshes, bytes in/out (both
+    uncompressed and on the wire) and latency percentiles. Every HTTPClient
+    has one on client.metrics, assign the same collector to several clients
+    to aggregate them.
+
+    Usage:
+    van.metrics.log_summary()
+    van.metrics.send_to_ticker(ticker, "FL", "AWS Lambda", "event-sync")
+    """
+
+    COUNTERS = ["requests", "errors", "retries", "rate_limited", "auth_refreshes"]
+    BYTE_COUNTERS = ["bytes_out", "bytes_in", "wire_bytes_out", "wire_bytes_in"]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear every metric"""
+        with self._lock:
+            self.counters: dict[str, dict[str, int]] = defaultdict(
+                lambda: dict.fromkeys(self.COUNTERS + self.BYTE_COUNTERS, 0)
+            )
+            self.latencies: dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+
+    @staticmethod
+    def get_key(method: str, endpoint: str) -> str:
+        return f"{method.upper()} {normalize_endpoint(endpoint)}"
+
+    def record_request(
+        self,
+        method: str,
+        endpoint: str,
+        status_code: int = None,
+        elapsed: float = None,
+        bytes_out: int = 0,
+        bytes_in: int = 0,
+        wire_bytes_out: int = None,
+        wire_bytes_in: int = None,
+    ):
+        """
+        Record one request, failed requests have no status or a status of 400+
+
+        :param method: Specified API method
+        :param endpoint: Specified API endpoint
+        :param status_code: response status, None if the request never got one
+        :param elapsed: seconds the request took
+        :param bytes_out: bytes sent
+        :param bytes_in: bytes received
+        :param wire_bytes_out: bytes sent after compression, defaults to bytes_out
+        :param wire_bytes_in: bytes received before decompression, defaults to bytes_in
+        """
+        key = self.get_key(method, endpoint)
+        with self._lock:
+            counters = self.counters[key]
+            counters["requests"] += 1
+            if not isinstance(status_code, int) or status_code >= 400:
+                counters["errors"] += 1
+            counters["bytes_out"] += bytes_out or 0
+            counters["bytes_in"] += bytes_in or 0
+            counters["wire_bytes_out"] += (
+                bytes_out if wire_bytes_out is None else wire_bytes_out
+            ) or 0
+            counters["wire_bytes_in"] += (
+                bytes_in if wire_bytes_in is None else wire_bytes_in
+            ) or 0
+            if elapsed is not None:
+                self.latencies[key].add(elapsed)
+
+    def increment(self, counter: str, method: str, endpoint: str, amount: int = 1):
+        """
+        Bump one of the counters, i.e. retries, rate_limited or auth_refreshes
+
+        :param counter: counter name
+        :param method: Specified API method
+        :param endpoint: Specified API endpoint
+        :param amount: amount to add
+        """
+        key = self.get_key(method, endpoint)
+        with self._lock:
+            self.counters[key][counter] += amount
+
+    def summary(self) -> dict[str, dict[str, Union[int, float, None]]]:
+        """
+        Summarize the metrics for each method and endpoint template
+
+        :return: {"GET people/{id}": {"requests": ..., "p50": ..., "p95": ..., "p99": ...}}
+        """
+        with self._lock:
+            summary = {}
+            for key, counters in self.counters.items():
+                histogram = self.latencies.get(key)
+                summary[key] = {
+                    **counters,
+                    "p50": histogram.percentile(50) if histogram else None,
+                    "p95": histogram.percentile(95) if histogram else None,
+                    "p99": histogram.percentile(99) if histogram else None,
+                }
+        return summary
+
+    def log_summary(self, level: int = logging.INFO):
+        """
+        Log one line per method and endpoint template, i.e. at the end of a run
+
+        :param level: logging level, info by default
+        """
+        for key, metrics in sorted(self.summary().items()):
+            wire = ""
+            if (metrics["wire_bytes_out"], metrics["wire_bytes_in"]) != (
+                metrics["bytes_out"],
+                metrics["bytes_in"],
+            ):
+                wire = (
+                    f" (wire out={metrics['wire_bytes_out']}B "
+                    f"in={metrics['wire_bytes_in']}B)"
+                )
+            latency = " ".join(
+                f"{p}={metrics[p] * 1000:.0f}ms"
+                for p in ["p50", "p95", "p99"]
+                if metrics[p] is not None
+            )
+            logger.log(
+                level,
+                f"{key}: {metrics['requests']} requests, {metrics['errors']} errors, "
+                f"{metrics['retries']} retries, {metrics['rate_limited']} 429s, "
+                f"{metrics['auth_refreshes']} auth refreshes, "
+                f"out={metrics['bytes_out']}B in={metrics['bytes_in']}B{wire} "
+                f"{latency}",
+            )
+
+    def send_to_ticker(self, ticker, state: str, source: str, task: str):
+        """
+        Add the metrics to a TickerRequest, to be sent with its send_to_ticker
+
+        :param ticker: TickerRequest to add the data to
+        :param state: Relevant state
+        :param source: Data source
+        :param task: Ticker task
+        """
+        for key, metrics in sorted(self.summary().items()):
+            for name, amount in metrics.items():
+                if amount is not None:
+                    ticker.add_data(state, source, task, f"{key} {name}", amount)
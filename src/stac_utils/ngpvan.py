@@ -2,12 +2,18 @@ import json
 import logging
 import os
 import requests
+from typing import TYPE_CHECKING, AsyncIterator, Iterator, Union
 
 from .listify import listify
 from .address import parse_address
 
 from .convert import convert_to_snake_case, strip_dict, get_first_value, get_all_values
-from .http import HTTPClient
+from .async_http import AsyncHTTPClient
+from .fingerprint import FingerprintStore, fingerprint
+from .http import CursorPaginator, HTTPClient, Page
+
+if TYPE_CHECKING:
+    import httpx
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +47,8 @@ class NGPVANClient(HTTPClient):
         assert int(mode) in (0, 1)
         api_key = api_key or os.environ.get("NGPVAN_API_KEY")
         self.api_key = f"{api_key}|{mode}"
+        # optional FingerprintStore, person upserts identical to the last one sent are skipped
+        self.fingerprint_store: FingerprintStore = None
 
         super().__init__(*args, **kwargs)
 
@@ -49,17 +57,20 @@ class NGPVANClient(HTTPClient):
         Creates and returns session
         """
         headers = {"content-type": "application/json"}
-        session = requests.Session()
+        session = super().create_session()
         session.headers.update(headers)
         session.auth = (self.app_name, self.api_key)
 
         return session
 
-    def check_response_for_rate_limit(self, response: requests.Response) -> int:
+    def check_response_for_rate_limit(
+        self, response: requests.Response
+    ) -> [int, float]:
         """
-        Checks response for rate limits and returns
+        Checks response for rate limit headers, falling back to 2 seconds
         """
-        return 2
+        rate_wait = super().check_response_for_rate_limit(response)
+        return 2 if rate_wait is None else rate_wait
 
     def transform_response(
         self,
@@ -76,7 +87,7 @@ class NGPVANClient(HTTPClient):
         :return: Data
         """
         try:
-            data = response.json() or {}
+            data = self.decode_json(response) or {}
 
             if type(data) is not dict:
                 data = {str(response.url).split("/")[-1].lower(): data}
@@ -135,25 +146,80 @@ class NGPVANClient(HTTPClient):
                 logger.error(response.content)
                 raise NGPVANException(errors)
 
-    def get_paginated_items(self, url, **kwargs):
+    def iter_paginated_items(
+        self, url, by_page: bool = False, prefetch: int = 1, **kwargs
+    ) -> Iterator[Union[dict, list[dict]]]:
+        """
+        Given a URL, lazily yields paginated items as pages arrive, so memory stays
+        flat however big the collection is (i.e. large saved lists).
+
+        The next page is fetched in the background while the current one is processed.
+
+        :param url: Given URL where paginated items exist
+        :param by_page: `False` by default, set `True` to yield each page's list of items instead
+        :param prefetch: pages fetched ahead in the background, 0 to fetch one at a time
+        :return: generator of items, or of lists of items when by_page
+        """
+
+        paginator = self.create_paginator(url, prefetch=prefetch, **kwargs)
+        for page in paginator.pages():
+            if not page.items:
+                return
+
+            yield from self.page_items(page, by_page)
+
+    def create_paginator(
+        self, url: str, prefetch: int = 1, **kwargs
+    ) -> CursorPaginator:
+        """
+        Paginator following VAN's next page links, fetching pages with get
+
+        On AsyncNGPVANClient the fetches return coroutines, for iter_pages.
+
+        :param url: Given URL where paginated items exist
+        :param prefetch: pages fetched ahead in the background, 0 to fetch one at a time
+        :return: paginator
+        """
+
+        def fetch(next_url: str) -> dict:
+            logger.debug(f"Getting {next_url}")
+            return self.get(next_url, **kwargs)
+
+        def get_next(data: dict):
+            next_full_url = data.get("next_page_link")
+            return next_full_url.split("/")[-1] if next_full_url else None
+
+        return CursorPaginator(
+            fetch,
+            lambda data: data.get("items"),
+            first_request=url,
+            get_next=get_next,
+            prefetch=prefetch,
+        )
+
+    @staticmethod
+    def page_items(page: Page, by_page: bool) -> list:
+        """
+        What iter_paginated_items yields for a page
+
+        :param page: fetched page
+        :param by_page: `True` to yield the page's list of items as one
+        :return: list of what to yield
+        """
+        return [page.items] if by_page else page.items
+
+    def get_paginated_items(self, url, prefetch: int = 1, **kwargs):
         """
         Given a URL, gets paginated items. For example with NGP, most likely to be used for pulling saved lists.
 
+        Use iter_paginated_items for collections too big to hold in memory.
+
         :param url: Given URL where paginated items exist
+        :param prefetch: pages fetched ahead in the background, 0 to fetch one at a time
         :return: All items as list
         """
-        all_items = []
-        next_url = url
-        while next_url:
-            print(f"Getting {next_url}")
-            data = self.get(next_url, **kwargs)
-            if "items" not in data or len(data.get("items")) == 0:
-                return all_items
-            all_items.extend(data["items"])
 
-            next_full_url = data.get("next_page_link")
-            next_url = next_full_url.split("/")[-1] if next_full_url else None
-        return all_items
+        return list(self.iter_paginated_items(url, prefetch=prefetch, **kwargs))
 
     @staticmethod
     def format_person_json(row: dict, id_key: str, has_identifier: bool) -> dict:
@@ -298,3 +364,156 @@ class NGPVANClient(HTTPClient):
             phone = ""
 
         return phone
+
+    def find_or_create_person(
+        self, person: dict, fingerprint_key: Union[str, int] = None, **kwargs
+    ) -> Union[dict, None]:
+        """
+        Match a person in VAN, creating them if there's no match, and update them with the payload
+
+        With a fingerprint_store set on the client, a payload identical to the last one
+        successfully sent for the same key is skipped without a request.
+
+        See: https://docs.ngpvan.com/reference/peoplefindorcreate
+
+        :param person: person payload, i.e. from format_person_json
+        :param fingerprint_key: key for the fingerprint store, defaults to the person's vanId
+        :return: the response data (including van_id), or None if the person was skipped
+        """
+        entry = self.get_person_fingerprint(person, fingerprint_key)
+        if self.is_unchanged_person(entry):
+            return None
+
+        data = self.post("people/findOrCreate", body=person, **kwargs)
+        self.record_person_fingerprint(entry)
+        return data
+
+    def get_person_fingerprint(
+        self, person: dict, fingerprint_key: Union[str, int] = None
+    ) -> Union[tuple[str, str], None]:
+        """
+        Fingerprint store key and fingerprint of a person payload
+
+        :param person: person payload
+        :param fingerprint_key: key for the fingerprint store, defaults to the person's vanId
+        :return: (key, fingerprint), or None without a fingerprint store or key
+        """
+        key = fingerprint_key if fingerprint_key is not None else person.get("vanId")
+        if self.fingerprint_store is None or key is None:
+            return None
+
+        return str(key), fingerprint(person)
+
+    def is_unchanged_person(self, entry: Union[tuple[str, str], None]) -> bool:
+        """
+        Check a person's fingerprint against the last one sent
+
+        :param entry: (key, fingerprint) from get_person_fingerprint
+        :return: `True` if the person can be skipped
+        """
+        if entry is None or not self.fingerprint_store.is_unchanged(*entry):
+            return False
+
+        logger.debug(f"Skipping unchanged person {entry[0]}")
+        return True
+
+    def record_person_fingerprint(self, entry: Union[tuple[str, str], None]):
+        """
+        Remember a person's fingerprint once they were sent successfully
+
+        :param entry: (key, fingerprint) from get_person_fingerprint
+        """
+        if entry is not None:
+            self.fingerprint_store.record(*entry)
+
+
+class AsyncNGPVANClient(AsyncHTTPClient, NGPVANClient):
+    """
+    Asyncio NGPVAN Client, same parameters as NGPVANClient, with async
+    versions of the request helpers
+    """
+
+    def create_session(self) -> "httpx.AsyncClient":
+        """
+        Creates and returns async session
+        """
+        session = super().create_session()
+        session.headers.update({"content-type": "application/json"})
+        session.auth = (self.app_name, self.api_key)
+
+        return session
+
+    async def iter_paginated_items(
+        self, url: str, by_page: bool = False, prefetch: int = 1, **kwargs
+    ) -> AsyncIterator[Union[dict, list[dict]]]:
+        """
+        Async version of NGPVANClient.iter_paginated_items
+
+        Usage:
+        async for person in van.iter_paginated_items("people"):
+            ...
+
+        :param url: Given URL where paginated items exist
+        :param by_page: `False` by default, set `True` to yield each page's list of items instead
+        :param prefetch: 1 by default to request the next page while the current one is processed, 0 to fetch one at a time
+        :return: async generator of items, or of lists of items when by_page
+        """
+
+        paginator = self.create_paginator(url, prefetch=prefetch, **kwargs)
+        async for page in self.iter_pages(paginator):
+            if not page.items:
+                return
+
+            for item in self.page_items(page, by_page):
+                yield item
+
+    async def get_paginated_items(self, url: str, prefetch: int = 1, **kwargs):
+        """
+        Async version of NGPVANClient.get_paginated_items
+
+        :param url: Given URL where paginated items exist
+        :param prefetch: 1 by default to request the next page while the current one is processed, 0 to fetch one at a time
+        :return: All items as list
+        """
+
+        return [
+            item
+            async for item in self.iter_paginated_items(
+                url, prefetch=prefetch, **kwargs
+            )
+        ]
+
+    async def validate_phone(self, phone: str) -> str:
+        """
+        Async version of NGPVANClient.validate_phone
+
+        :param phone: str, phone number from ActionKit
+        :return: str, empty string if phone number was not valid, or returns the valid phone number
+        """
+        payload = {"phoneNumber": f"{phone}"}
+        try:
+            response = await self.post("people/findByPhone", body=payload)
+            phone = response["findbyphone"]
+        except NGPVANException:
+            phone = ""
+
+        return phone
+
+    async def find_or_create_person(
+        self, person: dict, fingerprint_key: Union[str, int] = None, **kwargs
+    ) -> Union[dict, None]:
+        """
+        Async version of NGPVANClient.find_or_create_person, the fingerprint
+        is only recorded once the request succeeds
+
+        :param person: person payload, i.e. from format_person_json
+        :param fingerprint_key: key for the fingerprint store, defaults to the person's vanId
+        :return: the response data (including van_id), or None if the person was skipped
+        """
+        entry = self.get_person_fingerprint(person, fingerprint_key)
+        if self.is_unchanged_person(entry):
+            return None
+
+        data = await self.post("people/findOrCreate", body=person, **kwargs)
+        self.record_person_fingerprint(entry)
+        return data
@@ -0,0 +1,312 @@
+import asyncio
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Union
+
+from .deadline import DeadlineExceededException, check_deadline
+
+logger = logging.getLogger(__name__)
+
+# the de facto and draft standard names vendors use for rate limit headers
+RATE_LIMIT_HEADER_PREFIXES = ["X-RateLimit-", "RateLimit-", "X-Rate-Limit-"]
+
+
+def _header_number(headers: Mapping, name: str) -> Union[float, None]:
+    value = headers.get(name)
+    if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_retry_after(value: Union[str, None]) -> Union[float, None]:
+    """
+    Parse a Retry-After header value in either the seconds or HTTP-date form
+
+    :param value: Retry-After header value
+    :return: seconds to wait from now, or None if it can't be parsed
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def parse_rate_limit_headers(headers: Mapping) -> dict[str, float]:
+    """
+    Pull rate limit information out of response headers
+
+    Understands Retry-After and the X-RateLimit-*, RateLimit-* and
+    X-Rate-Limit-* Limit/Remaining/Reset families. Reset values that look
+    like epoch timestamps (seconds or milliseconds) are turned into seconds
+    from now, everything else is taken as seconds already.
+
+    :param headers: response headers
+    :return: dict with any of retry_after, limit, remaining and reset (seconds from now)
+    """
+    info = {}
+    if headers is None or not hasattr(headers, "get"):
+        return info
+
+    retry_after = parse_retry_after(headers.get("Retry-After"))
+    if retry_after is not None:
+        info["retry_after"] = retry_after
+
+    for prefix in RATE_LIMIT_HEADER_PREFIXES:
+        for key in ["limit", "remaining", "reset"]:
+            if key in info:
+                continue
+            value = _header_number(headers, f"{prefix}{key.title()}")
+            if value is not None:
+                info[key] = value
+
+    reset = info.get("reset")
+    if reset is not None:
+        if reset > 1e12:
+            reset = reset / 1000 - time.time()
+        elif reset > 1e9:
+            reset = reset - time.time()
+        info["reset"] = max(reset, 0.0)
+
+    return info
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that paces requests before they are sent
+
+    Callers reserve a token and are told how long to wait for it, so the lock
+    is only held for the bookkeeping and never while sleeping. That makes one
+    bucket safe to share between threads and asyncio tasks alike.
+
+    :param rate: tokens added per second (the sustained request rate)
+    :param capacity: most tokens that can build up, i.e. the allowed burst
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Take tokens from the bucket, going into debt if needed
+
+        :param tokens: number of tokens to take
+        :return: seconds the caller must wait before sending
+        """
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._blocked_until)
+            self._refill(start)
+            self._tokens -= tokens
+            wait = start - now
+            if self._tokens < 0:
+                wait += -self._tokens / self.rate
+            return wait
+
+    def pause(self, seconds: float):
+        """
+        Hold every reservation until seconds from now, i.e. when the
+        vendor says the budget is spent. The bucket is full again after.
+
+        :param seconds: how long to hold reservations
+        """
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._blocked_until:
+                self._blocked_until = until
+                self._tokens = self.capacity
+                self._updated = until
+
+    def _reserve_within_deadline(self, tokens: float) -> float:
+        """
+        Reserve tokens, handing them back if the wait would overrun the deadline
+
+        :param tokens: number of tokens to take
+        :return: seconds the caller must wait before sending
+        """
+        wait = self.reserve(tokens)
+        try:
+            check_deadline(wait, "wait for the rate limit")
+        except DeadlineExceededException:
+            with self._lock:
+                self._tokens = min(self.capacity, self._tokens + tokens)
+            raise
+        return wait
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Block until tokens are available
+
+        :return: seconds waited
+        """
+        wait = self._reserve_within_deadline(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1) -> float:
+        """
+        Wait without blocking the event loop until tokens are available
+
+        :return: seconds waited
+        """
+        wait = self._reserve_within_deadline(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """
+    Per-endpoint token buckets built from HTTPClient.update_rate_limits
+
+    Rate limits map an endpoint to a tuple of the number of requests allowed
+    over a window of minutes, matching HTTPClient.wait_for_rate. An endpoint
+    uses the bucket of the longest rate limit key it starts with, so a limit
+    on "people" also paces "people/123".
+
+    :param rate_limits: {endpoint: (requests allowed, window in minutes)}
+    :param burst: requests allowed back to back before pacing kicks in
+    """
+
+    def __init__(
+        self,
+        rate_limits: dict[str, tuple[Union[int, float], Union[int, float]]] = None,
+        burst: int = 1,
+    ):
+        self.burst = burst
+        self.buckets: dict[str, TokenBucket] = {}
+        # pauses for endpoints that don't have a bucket of their own
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        for endpoint, (requests_allowed, window) in (rate_limits or {}).items():
+            self.set_limit(endpoint, requests_allowed, window)
+
+    @staticmethod
+    def _normalize_endpoint(endpoint: str) -> str:
+        return endpoint.split("?", 1)[0].strip("/")
+
+    def set_limit(
+        self,
+        endpoint: str,
+        requests_allowed: Union[int, float],
+        window: Union[int, float],
+    ):
+        """
+        Add or replace the bucket for an endpoint
+
+        :param endpoint: endpoint (or endpoint prefix) the limit applies to
+        :param requests_allowed: number of requests allowed in the window
+        :param window: window length in minutes
+        """
+        self.buckets[self._normalize_endpoint(endpoint)] = TokenBucket(
+            requests_allowed / (window * 60), self.burst
+        )
+
+    def bucket_for(self, endpoint: str) -> Union[TokenBucket, None]:
+        """
+        Find the bucket that paces an endpoint, if any
+
+        :param endpoint: Specified API endpoint
+        :return: matching TokenBucket or None
+        """
+        if not self.buckets:
+            return None
+
+        endpoint = self._normalize_endpoint(endpoint)
+        best = None
+        for key in self.buckets:
+            if endpoint == key or endpoint.startswith(f"{key}/") or key == "":
+                if best is None or len(key) > len(best):
+                    best = key
+
+        return self.buckets.get(best) if best is not None else None
+
+    def pause(self, endpoint: str, seconds: float):
+        """
+        Hold requests to an endpoint for a number of seconds
+
+        Endpoints without a bucket of their own pause the whole limiter,
+        since vendors usually count those against one shared budget
+
+        :param endpoint: Specified API endpoint
+        :param seconds: how long to hold requests
+        """
+        if seconds is None or seconds <= 0:
+            return
+
+        bucket = self.bucket_for(endpoint)
+        if bucket is not None:
+            bucket.pause(seconds)
+            return
+
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def _pause_delay(self) -> float:
+        return max(self._blocked_until - time.monotonic(), 0.0)
+
+    def wait(self, endpoint: str) -> float:
+        """
+        Block until the endpoint's budget allows another request
+
+        Raises DeadlineExceededException instead of waiting past the deadline.
+
+        :param endpoint: Specified API endpoint
+        :return: seconds waited
+        """
+        waited = self._pause_delay()
+        if waited > 0:
+            check_deadline(waited, f"wait for the {endpoint} rate limit")
+            time.sleep(waited)
+
+        bucket = self.bucket_for(endpoint)
+        if bucket is not None:
+            waited += bucket.acquire()
+        return waited
+
+    async def wait_async(self, endpoint: str) -> float:
+        """
+        Async version of wait
+
+        :param endpoint: Specified API endpoint
+        :return: seconds waited
+        """
+        waited = self._pause_delay()
+        if waited > 0:
+            check_deadline(waited, f"wait for the {endpoint} rate limit")
+            await asyncio.sleep(waited)
+
+        bucket = self.bucket_for(endpoint)
+        if bucket is not None:
+            waited += await bucket.acquire_async()
+        return waited
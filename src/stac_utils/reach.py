@@ -1,11 +1,16 @@
 import json
 import logging
 import os
+from typing import TYPE_CHECKING
 
 import requests
 
+from .async_http import AsyncHTTPClient
 from .http import HTTPClient
 
+if TYPE_CHECKING:
+    import httpx
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,7 +41,11 @@ class ReachClient(HTTPClient):
         }
         endpoint = "/oauth/token"
         session = requests.Session()
-        response = session.post(self.actual_base_url + endpoint, data=body)
+        response = session.post(
+            self.actual_base_url + endpoint,
+            data=body,
+            timeout=(self.connect_timeout, self.read_timeout),
+        )
         self.access_token = json.loads(response.text)["access_token"]
 
     def create_session(self) -> requests.Session:
@@ -44,7 +53,22 @@ class ReachClient(HTTPClient):
         if not self.access_token:
             self.refresh_auth(None)
 
-        session = requests.Session()
+        session = super().create_session()
         headers = {"Authorization": "Bearer " + self.access_token}
         session.headers.update(headers)
         return session
+
+
+class AsyncReachClient(AsyncHTTPClient, ReachClient):
+    """
+    Asyncio Reach Client, same parameters as ReachClient
+    """
+
+    def create_session(self) -> "httpx.AsyncClient":
+        """Create an async session, set headers & auth"""
+        if not self.access_token:
+            self.refresh_auth(None)
+
+        session = super().create_session()
+        session.headers.update({"Authorization": "Bearer " + self.access_token})
+        return session
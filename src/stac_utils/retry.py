@@ -0,0 +1,147 @@
+import logging
+import random
+import time
+from typing import Iterable, Union
+
+import requests
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+# statuses that are worth another try, i.e. throttling and transient server errors
+DEFAULT_RETRY_STATUSES = frozenset([408, 429, 500, 502, 503, 504])
+
+# transport and HTTP errors from requests, and from httpx for the async clients
+DEFAULT_RETRY_EXCEPTIONS = (requests.exceptions.RequestException,) + (
+    (httpx.HTTPError,) if httpx else ()
+)
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request is retried and how long to back off
+
+    Shared by HTTPClient.call_api, MailChimpClient.request_with_retry and
+    google.upload_file_to_drive so every retry loop backs off the same way.
+
+    Usage:
+    client.retry_policy = RetryPolicy(max_retries=5, deadline=600)
+
+    :param max_retries: retries allowed after the first attempt
+    :param backoff: "exponential" (base * 2^(n-1)), "linear" (base * n) or "constant" (base)
+    :param base_delay: seconds the backoff is built from
+    :param max_delay: most seconds to wait between attempts, None for no cap
+    :param jitter: `True` by default, waits a random time between 0 and the backoff (full jitter)
+    :param deadline: most seconds to spend on one request including retries, None for no limit
+    :param retry_statuses: HTTP statuses that are retried, None to retry any failing status
+    :param status_rules: per-status retry limits overriding max_retries, i.e. {404: 0} never retries a 404
+    :param retry_exceptions: exceptions that are retried when there's no status to go on
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff: str = "exponential",
+        base_delay: float = 1.0,
+        max_delay: Union[float, None] = 60.0,
+        jitter: bool = True,
+        deadline: Union[float, None] = None,
+        retry_statuses: Union[Iterable[int], None] = DEFAULT_RETRY_STATUSES,
+        status_rules: dict[int, int] = None,
+        retry_exceptions: tuple[type[Exception], ...] = DEFAULT_RETRY_EXCEPTIONS,
+    ):
+        if backoff not in {"exponential", "linear", "constant"}:
+            raise ValueError(f"Unknown backoff: {backoff}")
+
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_statuses = (
+            None if retry_statuses is None else frozenset(retry_statuses)
+        )
+        self.status_rules = status_rules or {}
+        self.retry_exceptions = tuple(retry_exceptions)
+
+    def get_max_delay(self, attempt: int) -> float:
+        """
+        Backoff before the next attempt, without jitter
+
+        :param attempt: number of failed attempts so far
+        :return: seconds
+        """
+        if attempt <= 0:
+            return 0.0
+
+        if self.backoff == "exponential":
+            delay = self.base_delay * 2 ** (attempt - 1)
+        elif self.backoff == "linear":
+            delay = self.base_delay * attempt
+        else:
+            delay = self.base_delay
+
+        if self.max_delay is not None:
+            delay = min(delay, self.max_delay)
+
+        return float(delay)
+
+    def get_delay(self, attempt: int) -> float:
+        """
+        Backoff before the next attempt
+
+        :param attempt: number of failed attempts so far
+        :return: seconds
+        """
+        delay = self.get_max_delay(attempt)
+        if self.jitter and delay > 0:
+            delay = random.uniform(0, delay)
+
+        return delay
+
+    def should_retry(
+        self,
+        attempt: int,
+        status_code: int = None,
+        exception: Exception = None,
+        started: float = None,
+    ) -> bool:
+        """
+        Decide whether to try again after a failure
+
+        :param attempt: number of failed attempts so far, including this one
+        :param status_code: HTTP status of the failed response, if there was one
+        :param exception: exception raised by the failed attempt, if any
+        :param started: time.monotonic() when the first attempt started, for the deadline
+        :return: `True` if the request should be retried
+        """
+        if attempt > self.max_retries:
+            return False
+
+        if isinstance(status_code, int):
+            limit = self.status_rules.get(status_code)
+            if limit is not None:
+                if attempt > limit:
+                    return False
+            elif (
+                self.retry_statuses is not None
+                and status_code not in self.retry_statuses
+            ):
+                return False
+        elif exception is not None and not isinstance(exception, self.retry_exceptions):
+            return False
+
+        if self.deadline is not None and started is not None:
+            elapsed = time.monotonic() - started
+            if elapsed + self.get_max_delay(attempt) > self.deadline:
+                logger.warning(
+                    f"Not retrying, next attempt would pass the {self.deadline}s deadline"
+                )
+                return False
+
+        return True
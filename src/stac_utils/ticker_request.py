@@ -50,7 +50,7 @@ class TickerRequest(HTTPClient):
         """
         Creates session for ticker
         """
-        session = requests.Session()
+        session = super().create_session()
         session.auth = (os.environ["AUTH_USER"], os.environ["AUTH_PASS"])
 
         return session
@@ -44,6 +44,13 @@ class TestActionNetworkClient(unittest.TestCase):
         test_client = ActionNetworkClient("foo")
         self.assertEqual(1, test_client.check_response_for_rate_limit(None))
 
+    def test_check_response_for_rate_limit_header(self):
+        """Test that Retry-After wins over the default"""
+        test_client = ActionNetworkClient("foo")
+        mock_response = MagicMock()
+        mock_response.headers = {"Retry-After": "4"}
+        self.assertEqual(4.0, test_client.check_response_for_rate_limit(mock_response))
+
     def test_extract_action_network_id_valid(self):
         """Test that the correct Action Network ID is extracted"""
         identifiers = ["not_an:123aabb", "action_network:foo12bar", "random_id:120930a"]
@@ -133,6 +140,27 @@ class TestActionNetworkClient(unittest.TestCase):
         self.test_client.paginate_endpoint("forms", embedded_key="osdi:forms")
         mock_debug.assert_called_with("No items found at page 3 for key 'osdi:forms'")
 
+    @patch.object(ActionNetworkClient, "get")
+    def test_iter_endpoint(self, mock_get):
+        """Test iter_endpoint yields items lazily, or pages with by_page"""
+        pages = [
+            {"_embedded": {"osdi:forms": [{"val": 1}, {"val": 2}]}},
+            {"_embedded": {"osdi:forms": [{"val": 3}]}},
+            {"_embedded": {"osdi:forms": []}},
+        ]
+        mock_get.side_effect = pages
+
+        items = self.test_client.iter_endpoint("forms", "osdi:forms", prefetch=0)
+        self.assertEqual({"val": 1}, next(items))
+        mock_get.assert_called_once_with("forms?page=1")
+        self.assertEqual([{"val": 2}, {"val": 3}], list(items))
+
+        mock_get.side_effect = pages
+        self.assertEqual(
+            [[{"val": 1}, {"val": 2}], [{"val": 3}]],
+            list(self.test_client.iter_endpoint("forms", "osdi:forms", by_page=True)),
+        )
+
     @patch.object(ActionNetworkClient, "get")
     def test_fetch_related_people_valid(self, mock_get):
         """
@@ -0,0 +1,441 @@
+import asyncio
+import gzip
+import json
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+
+from src.stac_utils.action_network import AsyncActionNetworkClient
+from src.stac_utils.async_http import AsyncHTTPClient
+from src.stac_utils.concurrency import AdaptiveConcurrencyLimiter
+from src.stac_utils.fingerprint import SQLiteFingerprintStore
+from src.stac_utils.http import PageNumberPaginator
+from src.stac_utils.mailchimp import AsyncMailChimpClient
+from src.stac_utils.ngpvan import AsyncNGPVANClient, NGPVANException
+from src.stac_utils.retry import RetryPolicy
+
+
+class MockAsyncHTTPClient(AsyncHTTPClient):
+    """Async client that answers requests with a handler instead of the network"""
+
+    base_url = "https://foo.org"
+
+    def __init__(self, handler, *args, **kwargs):
+        self.handler = handler
+        super().__init__(*args, **kwargs)
+
+    def create_transport(self):
+        return httpx.MockTransport(self.handler)
+
+    def transform_response(self, response, **kwargs):
+        return response.json() if response.content else {}
+
+
+class TestAsyncHTTPClient(unittest.IsolatedAsyncioTestCase):
+    def test_create_session(self):
+        """Test create session returns an httpx async client"""
+        test_client = AsyncHTTPClient()
+        self.assertIsInstance(test_client.create_session(), httpx.AsyncClient)
+
+    def test_stream_sync_only(self):
+        """Test streamed downloads raise a clear TypeError on the async client"""
+        test_client = AsyncHTTPClient()
+        with self.assertRaisesRegex(TypeError, "use HTTPClient instead"):
+            test_client.download("foo", "/tmp/foo")
+        with self.assertRaisesRegex(TypeError, "stream is not supported"):
+            test_client.stream("GET", "foo")
+
+    async def test_semaphore_sized_from_max_connections(self):
+        """Test the semaphore allows max_connections requests at once"""
+        test_client = AsyncHTTPClient()
+        test_client.max_connections = 3
+        self.assertEqual(3, test_client.semaphore._value)
+
+    def test_requires_httpx(self):
+        """Test building the client without httpx names the extra to install"""
+        with patch("src.stac_utils.async_http.httpx", None):
+            with self.assertRaisesRegex(ImportError, r"stac-utils-python\[async\]"):
+                AsyncHTTPClient()
+
+    async def test_aclose(self):
+        """Test aclose drops the session and semaphore so they're made again"""
+        test_client = MockAsyncHTTPClient(lambda request: httpx.Response(200))
+        session = test_client.session
+        semaphore = test_client.semaphore
+        await test_client.aclose()
+        self.assertTrue(session.is_closed)
+        self.assertIsNot(semaphore, test_client.semaphore)
+        self.assertIsNot(session, test_client.session)
+
+    async def test_call_api(self):
+        """Test call api sends the request and transforms the response"""
+        requests_seen = []
+
+        def handler(request: httpx.Request):
+            requests_seen.append(request)
+            return httpx.Response(200, json={"foo": "bar"})
+
+        async with MockAsyncHTTPClient(handler) as test_client:
+            data = await test_client.get("spam", params={"eggs": 1})
+
+        self.assertEqual({"foo": "bar"}, data)
+        self.assertEqual("https://foo.org/spam?eggs=1", str(requests_seen[0].url))
+        self.assertIsNone(test_client._session)
+
+    async def test_call_api_sends_body(self):
+        """Test call api sends the body as json"""
+        bodies = []
+
+        def handler(request: httpx.Request):
+            bodies.append(json.loads(request.content))
+            return httpx.Response(201, json={})
+
+        test_client = MockAsyncHTTPClient(handler)
+        await test_client.post("spam", body={"foo": "bar"})
+        self.assertEqual([{"foo": "bar"}], bodies)
+
+    async def test_call_api_compressed_body(self):
+        """Test bodies are compressed when the client has a request encoding"""
+        seen = []
+
+        def handler(request: httpx.Request):
+            seen.append(request.headers)
+            body = request.content
+            if request.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            return httpx.Response(200, json={"received": len(json.loads(body))})
+
+        test_client = MockAsyncHTTPClient(handler)
+        test_client.request_encoding = "gzip"
+        body = [{"email_address": f"foo{i}@bar.com"} for i in range(1000)]
+        data = await test_client.post("members", body=body)
+
+        self.assertEqual({"received": 1000}, data)
+        self.assertEqual("gzip", seen[0]["Content-Encoding"])
+        self.assertEqual("gzip, deflate", seen[0]["Accept-Encoding"])
+        posted = test_client.metrics.summary()["POST members"]
+        self.assertLess(posted["wire_bytes_out"], posted["bytes_out"] / 5)
+
+    async def test_call_api_deadline_timeout(self):
+        """Test requests get the client's timeouts, cut down to the deadline"""
+        timeouts = []
+
+        def handler(request: httpx.Request):
+            timeouts.append(request.extensions["timeout"])
+            return httpx.Response(200, json={})
+
+        test_client = MockAsyncHTTPClient(handler)
+        await test_client.get("spam")
+        with test_client.deadline(seconds=5):
+            await test_client.get("eggs")
+
+        self.assertEqual(60, timeouts[0]["read"])
+        self.assertEqual(10, timeouts[0]["connect"])
+        self.assertLessEqual(timeouts[1]["read"], 5)
+        self.assertLessEqual(timeouts[1]["connect"], 5)
+
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    async def test_call_api_with_429(self, mock_sleep: AsyncMock):
+        """Test call api waits for the rate limit then retries"""
+        responses = [httpx.Response(429), httpx.Response(200, json={"foo": 1})]
+
+        test_client = MockAsyncHTTPClient(lambda request: responses.pop(0))
+        test_client.check_response_for_rate_limit = MagicMock(return_value=0.42)
+
+        self.assertEqual({"foo": 1}, await test_client.get("spam"))
+        mock_sleep.assert_any_await(0.42)
+
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    async def test_call_api_with_401(self, mock_sleep: AsyncMock):
+        """Test call api refreshes auth, awaiting async refresh hooks"""
+        responses = [httpx.Response(401), httpx.Response(200, json={})]
+
+        test_client = MockAsyncHTTPClient(lambda request: responses.pop(0))
+        test_client.refresh_auth = AsyncMock()
+
+        await test_client.get("spam")
+        test_client.refresh_auth.assert_awaited_once()
+
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    async def test_call_api_with_404(self, mock_sleep: AsyncMock):
+        """Test call api doesn't retry 404s"""
+        handler = MagicMock(return_value=httpx.Response(404))
+        test_client = MockAsyncHTTPClient(handler)
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            await test_client.get("spam")
+        handler.assert_called_once()
+
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    async def test_call_api_retry_limit(self, mock_sleep: AsyncMock):
+        """Test call api gives up after the retry limit"""
+        handler = MagicMock(side_effect=httpx.ConnectError("nope"))
+        test_client = MockAsyncHTTPClient(handler)
+        test_client.retry_limit = 2
+
+        with self.assertRaises(httpx.ConnectError):
+            await test_client.get("spam")
+        self.assertEqual(3, handler.call_count)
+
+    async def test_concurrency_capped(self):
+        """Test no more than max_connections requests are in flight"""
+        in_flight = []
+        peak = []
+
+        async def handler(request):
+            in_flight.append(request)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(request)
+            return httpx.Response(200, json={})
+
+        class AsyncTransportClient(MockAsyncHTTPClient):
+            def create_transport(self):
+                return httpx.MockTransport(handler)
+
+        test_client = AsyncTransportClient(None)
+        test_client.max_connections = 2
+        await asyncio.gather(*(test_client.get(str(i)) for i in range(10)))
+        self.assertLessEqual(max(peak), 2)
+
+    async def test_adaptive_concurrency(self):
+        """Test the adaptive limiter caps requests in flight below the semaphore"""
+        in_flight = []
+        peak = []
+
+        async def handler(request):
+            in_flight.append(request)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(request)
+            if request.url.path == "/0":
+                return httpx.Response(429)
+            return httpx.Response(200, json={})
+
+        class AsyncTransportClient(MockAsyncHTTPClient):
+            def create_transport(self):
+                return httpx.MockTransport(handler)
+
+        test_client = AsyncTransportClient(None)
+        test_client.max_connections = 10
+        test_client.retry_policy = RetryPolicy(max_retries=0)
+        limiter = test_client.concurrency_limiter = AdaptiveConcurrencyLimiter(
+            max_limit=10, initial=3
+        )
+        await asyncio.gather(
+            *(test_client.get(str(i)) for i in range(10)), return_exceptions=True
+        )
+        self.assertLessEqual(max(peak), 3)
+        self.assertEqual(0, limiter.in_flight)
+        self.assertEqual(1, limiter.stats["decreases"])
+
+    async def test_call_many(self):
+        """Test async call many yields results in order with errors attached"""
+
+        def handler(request: httpx.Request):
+            if request.url.path == "/bad":
+                return httpx.Response(404)
+            return httpx.Response(200, json={"path": request.url.path})
+
+        test_client = MockAsyncHTTPClient(handler)
+        results = [
+            result
+            async for result in test_client.call_many(
+                [("GET", "foo"), ("GET", "bad"), ("GET", "bar")]
+            )
+        ]
+        self.assertEqual([0, 1, 2], [result.index for result in results])
+        self.assertEqual({"path": "/foo"}, results[0].data)
+        self.assertIsInstance(results[1].error, httpx.HTTPStatusError)
+        self.assertEqual({"path": "/bar"}, results[2].data)
+
+    async def test_iter_pages(self):
+        """Test pages are fetched in order and stop after an empty page or max_pages"""
+        requested = []
+
+        def handler(request: httpx.Request):
+            page = int(request.url.params["page"])
+            requested.append(page)
+            return httpx.Response(200, json={"items": [page] if page < 4 else []})
+
+        test_client = MockAsyncHTTPClient(handler)
+        for prefetch in [0, 1]:
+            with self.subTest(prefetch=prefetch):
+                requested.clear()
+                paginator = PageNumberPaginator(
+                    lambda page: test_client.get("foo", params={"page": page}),
+                    lambda data: data["items"],
+                    prefetch=prefetch,
+                )
+                pages = [page async for page in test_client.iter_pages(paginator)]
+                self.assertEqual([[1], [2], [3], []], [page.items for page in pages])
+                self.assertEqual([1, 2, 3, 4], requested)
+
+        paginator = PageNumberPaginator(
+            lambda page: test_client.get("foo", params={"page": page}),
+            lambda data: data["items"],
+            max_pages=2,
+        )
+        pages = [page async for page in test_client.iter_pages(paginator)]
+        self.assertEqual([1, 2], [page.request for page in pages])
+
+
+class TestAsyncNGPVANClient(unittest.IsolatedAsyncioTestCase):
+    def test_create_session(self):
+        """Test async session has api keys and inherits the VAN hooks"""
+        test_client = AsyncNGPVANClient(mode=1, app_name="foo", api_key="bar")
+        session = test_client.create_session()
+        self.assertEqual("application/json", session.headers["content-type"])
+        self.assertIsInstance(session.auth, httpx.BasicAuth)
+        self.assertEqual(2, test_client.check_response_for_rate_limit(None))
+
+    async def test_call_api_uses_van_errors(self):
+        """Test async VAN client raises NGPVANException via check_for_error"""
+
+        def handler(request: httpx.Request):
+            return httpx.Response(400, json={"errors": [{"text": "bad"}]})
+
+        class MockAsyncNGPVANClient(AsyncNGPVANClient):
+            def create_transport(self):
+                return httpx.MockTransport(handler)
+
+        test_client = MockAsyncNGPVANClient(mode=1, app_name="foo", api_key="bar")
+        with self.assertRaises(NGPVANException):
+            await test_client.get("people/1")
+
+    async def test_get_paginated_items(self):
+        """Test the async VAN client follows next page links"""
+
+        def handler(request: httpx.Request):
+            if request.url.params.get("$skip") == "2":
+                return httpx.Response(200, json={"items": [{"vanId": 3}]})
+            return httpx.Response(
+                200,
+                json={
+                    "items": [{"vanId": 1}, {"vanId": 2}],
+                    "nextPageLink": "https://api.securevan.com/v4/people?$skip=2",
+                },
+            )
+
+        class MockAsyncNGPVANClient(AsyncNGPVANClient):
+            def create_transport(self):
+                return httpx.MockTransport(handler)
+
+        test_client = MockAsyncNGPVANClient(mode=1, app_name="foo", api_key="bar")
+        self.assertEqual(
+            [{"van_id": 1}, {"van_id": 2}, {"van_id": 3}],
+            await test_client.get_paginated_items("people"),
+        )
+
+    async def test_validate_phone(self):
+        """Test the async VAN client validates phones, blanking invalid ones"""
+
+        def handler(request: httpx.Request):
+            phone = json.loads(request.content)["phoneNumber"]
+            if phone == "bad":
+                return httpx.Response(400, json={"errors": [{"text": "bad"}]})
+            return httpx.Response(200, json={"findbyphone": phone})
+
+        class MockAsyncNGPVANClient(AsyncNGPVANClient):
+            def create_transport(self):
+                return httpx.MockTransport(handler)
+
+        test_client = MockAsyncNGPVANClient(mode=1, app_name="foo", api_key="bar")
+        self.assertEqual("5555555555", await test_client.validate_phone("5555555555"))
+        self.assertEqual("", await test_client.validate_phone("bad"))
+
+    async def test_find_or_create_person(self):
+        """Test the async VAN client records a fingerprint only after the person is sent"""
+        statuses = [500, 201]
+
+        def handler(request: httpx.Request):
+            status_code = statuses.pop(0)
+            if status_code >= 400:
+                return httpx.Response(status_code, json={"errors": [{"text": "bad"}]})
+            return httpx.Response(status_code, json={"vanId": 1})
+
+        class MockAsyncNGPVANClient(AsyncNGPVANClient):
+            def create_transport(self):
+                return httpx.MockTransport(handler)
+
+        store = SQLiteFingerprintStore(":memory:")
+        test_client = MockAsyncNGPVANClient(mode=1, app_name="foo", api_key="bar")
+        test_client.fingerprint_store = store
+        test_client.retry_policy = RetryPolicy(max_retries=1)
+        person = {"vanId": 1, "firstName": "Jane"}
+
+        with self.assertRaises(NGPVANException):
+            await test_client.find_or_create_person(person)
+        self.assertEqual(0, store.stats["sent"])
+
+        self.assertEqual(
+            {"van_id": 1, "http_status_code": 201},
+            await test_client.find_or_create_person(person),
+        )
+        self.assertEqual(1, store.stats["sent"])
+        self.assertIsNone(await test_client.find_or_create_person(person))
+        self.assertEqual(1, store.stats["skipped"])
+
+
+class TestAsyncActionNetworkClient(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        def handler(request: httpx.Request):
+            if request.url.path.endswith("/forms"):
+                page = int(request.url.params["page"])
+                forms = [{"page": page}] if page < 3 else []
+                return httpx.Response(200, json={"_embedded": {"osdi:forms": forms}})
+            return httpx.Response(200, json={"path": request.url.path})
+
+        class MockAsyncActionNetworkClient(AsyncActionNetworkClient):
+            def create_transport(self):
+                return httpx.MockTransport(handler)
+
+        self.test_client = MockAsyncActionNetworkClient(api_token="foo")
+
+    async def test_paginate_endpoint(self):
+        """Test the async Action Network client pages until an empty page"""
+        self.assertEqual(
+            [{"page": 1}, {"page": 2}],
+            await self.test_client.paginate_endpoint("forms", "osdi:forms"),
+        )
+        self.assertEqual(
+            [[{"page": 1}]],
+            [
+                page
+                async for page in self.test_client.iter_endpoint(
+                    "forms", "osdi:forms", max_pages=1, by_page=True
+                )
+            ],
+        )
+
+    async def test_fetch_related_people(self):
+        """Test the async Action Network client fetches each linked person"""
+        resource = {
+            "_links": {
+                "osdi:person": {"href": "https://actionnetwork.org/api/v2/people/abc"},
+                "osdi:creator": {"href": "https://actionnetwork.org/api/v2/people/def"},
+                "osdi:form": {"href": "https://actionnetwork.org/api/v2/forms/ghi"},
+            }
+        }
+        people = await self.test_client.fetch_related_people(
+            resource, ["osdi:person", "osdi:creator", "osdi:form"]
+        )
+        self.assertEqual(
+            ["/api/v2/people/abc", "/api/v2/people/def"],
+            [person["path"] for person in people],
+        )
+
+
+class TestAsyncMailChimpClient(unittest.IsolatedAsyncioTestCase):
+    async def test_sync_only_helpers(self):
+        """Test helpers built on request_with_retry raise a clear TypeError"""
+        test_client = AsyncMailChimpClient(api_key="foo-us1")
+        with self.assertRaisesRegex(TypeError, "use MailChimpClient instead"):
+            test_client.upsert_member("list", "foo@bar.com")
+        with self.assertRaisesRegex(TypeError, "paginate_endpoint"):
+            test_client.paginate_endpoint("lists", "lists")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,227 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from src.stac_utils.cache import CacheEntry, ResponseCache, SingleFlight
+from src.stac_utils.deadline import DeadlineExceededException, deadline
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_get_ttl(self):
+        """Test the longest matching endpoint prefix sets the TTL"""
+        cache = ResponseCache(ttl=10, ttls={"events": 60, "events/types": 3600})
+
+        self.assertEqual(10, cache.get_ttl("people/1"))
+        self.assertEqual(60, cache.get_ttl("events/123"))
+        self.assertEqual(3600, cache.get_ttl("/events/types?x=1"))
+
+    def test_make_key(self):
+        """Test keys don't depend on param order"""
+        self.assertEqual(
+            ResponseCache.make_key("foo", {"a": 1, "b": 2}, use_snake_case=True),
+            ResponseCache.make_key("foo", {"b": 2, "a": 1}, use_snake_case=True),
+        )
+        self.assertNotEqual(
+            ResponseCache.make_key("foo", None, use_snake_case=True),
+            ResponseCache.make_key("foo", None, use_snake_case=False),
+        )
+
+    def test_set_and_get(self):
+        """Test hits, misses and that callers get their own copy"""
+        cache = ResponseCache()
+
+        self.assertIsNone(cache.get("foo"))
+        cache.set("foo", "foo", {"items": [1]})
+        entry = cache.get("foo")
+        self.assertTrue(entry.fresh)
+        entry.data["items"].append(2)
+
+        self.assertEqual({"items": [1]}, cache.get("foo").data)
+        self.assertEqual(
+            {"hits": 2, "misses": 1, "revalidated": 0, "evictions": 0}, cache.stats
+        )
+
+    def test_set_zero_ttl(self):
+        """Test nothing is kept without a TTL or validators"""
+        cache = ResponseCache(ttl=0)
+
+        cache.set("foo", "foo", {})
+        self.assertIsNone(cache.get("foo"))
+
+        cache.set("bar", "bar", {}, {"ETag": '"abc"'})
+        entry = cache.get("bar")
+        self.assertFalse(entry.fresh)
+        self.assertEqual({"If-None-Match": '"abc"'}, entry.validators)
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is dropped"""
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", "a", 1)
+        cache.set("b", "b", 2)
+        cache.get("a")
+        cache.set("c", "c", 3)
+
+        self.assertEqual(["a", "c"], list(cache.entries))
+        self.assertEqual(1, cache.stats["evictions"])
+
+    def test_revalidated(self):
+        """Test a 304 extends the entry and picks up a new ETag"""
+        cache = ResponseCache(ttl=60)
+        entry = CacheEntry({"a": 1}, "foo", 0, '"old"', "Mon, 01 Jan 2024 00:00:00 GMT")
+
+        with patch("time.time", return_value=100):
+            data = cache.revalidated("foo", entry, {"ETag": '"new"'})
+
+        self.assertEqual({"a": 1}, data)
+        self.assertEqual(160, cache.entries["foo"].expires)
+        self.assertEqual(
+            {
+                "If-None-Match": '"new"',
+                "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+            },
+            cache.entries["foo"].validators,
+        )
+        self.assertEqual(1, cache.stats["revalidated"])
+
+    def test_invalidate(self):
+        """Test invalidating an endpoint drops it and anything under it"""
+        cache = ResponseCache()
+        cache.set("1", "events", 1)
+        cache.set("2", "events/1", 2)
+        cache.set("3", "eventsTypes", 3)
+
+        cache.invalidate("/events")
+        self.assertEqual(["3"], list(cache.entries))
+
+        cache.clear()
+        self.assertEqual([], list(cache.entries))
+        self.assertEqual(0, cache.stats["misses"])
+
+    def test_sqlite_backing(self):
+        """Test entries survive into a new cache on the same file"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.db")
+            cache = ResponseCache(path=path)
+            cache.set("foo", "foo", {"a": [1, 2]}, {"ETag": '"abc"'})
+            cache.set("bar", "bar", object())
+            cache.close()
+
+            cache = ResponseCache(path=path)
+            entry = cache.get("foo")
+            self.assertEqual({"a": [1, 2]}, entry.data)
+            self.assertEqual('"abc"', entry.etag)
+            # not JSON, so only kept in memory
+            self.assertIsNone(cache.get("bar"))
+
+            cache.invalidate("foo")
+            cache.entries.clear()
+            self.assertIsNone(cache.get("foo"))
+            cache.close()
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_do_coalesces(self):
+        """Test identical calls in flight share one call and get their own copy"""
+        flight = SingleFlight()
+        release = threading.Event()
+        call = MagicMock(side_effect=lambda: release.wait() and {"a": [1]})
+
+        with ThreadPoolExecutor(4) as executor:
+            futures = [executor.submit(flight.do, "foo", call) for _ in range(4)]
+            while flight.stats["coalesced"] < 3:
+                time.sleep(0.01)
+            release.set()
+            results = [future.result() for future in futures]
+
+        call.assert_called_once()
+        self.assertEqual([{"a": [1]}] * 4, results)
+        self.assertEqual(4, len({id(result) for result in results}))
+        self.assertEqual({"calls": 1, "coalesced": 3}, flight.stats)
+        self.assertEqual({}, flight._calls)
+
+    def test_do_sequential(self):
+        """Test calls that don't overlap aren't coalesced"""
+        flight = SingleFlight()
+        call = MagicMock(return_value=1)
+
+        flight.do("foo", call)
+        flight.do("foo", call)
+        self.assertEqual(2, call.call_count)
+
+    def test_do_error(self):
+        """Test waiters get the leader's exception"""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def fail():
+            release.wait()
+            raise ValueError("nope")
+
+        with ThreadPoolExecutor(2) as executor:
+            futures = [executor.submit(flight.do, "foo", fail) for _ in range(2)]
+            while flight.stats["coalesced"] < 1:
+                time.sleep(0.01)
+            release.set()
+            for future in futures:
+                self.assertRaises(ValueError, future.result)
+
+        self.assertEqual({}, flight._calls)
+
+    def test_do_async(self):
+        """Test identical tasks share one call"""
+        flight = SingleFlight()
+        call_count = 0
+
+        async def call():
+            nonlocal call_count
+            call_count += 1
+            await asyncio.sleep(0.01)
+            return {"a": 1}
+
+        async def run():
+            return await asyncio.gather(
+                *(flight.do_async("foo", call) for _ in range(3))
+            )
+
+        self.assertEqual([{"a": 1}] * 3, asyncio.run(run()))
+        self.assertEqual(1, call_count)
+        self.assertEqual({}, flight._tasks)
+
+    def test_do_deadline(self):
+        """Test waiters give up on the call in flight when their deadline passes"""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        with ThreadPoolExecutor(1) as executor:
+            leader = executor.submit(flight.do, "foo", lambda: release.wait() and 1)
+            while not flight._calls:
+                time.sleep(0.01)
+            with deadline(seconds=0.05):
+                self.assertRaises(
+                    DeadlineExceededException, flight.do, "foo", MagicMock()
+                )
+            release.set()
+            self.assertEqual(1, leader.result())
+
+        async def run():
+            async def call():
+                await asyncio.sleep(1)
+                return 1
+
+            leader = asyncio.ensure_future(flight.do_async("bar", call))
+            await asyncio.sleep(0)
+            with deadline(seconds=0.05):
+                with self.assertRaises(DeadlineExceededException):
+                    await flight.do_async("bar", call)
+            return await leader
+
+        self.assertEqual(1, asyncio.run(run()))
+
+
+if __name__ == "__main__":
+    unittest.main()
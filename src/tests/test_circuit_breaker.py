@@ -0,0 +1,77 @@
+import unittest
+from unittest.mock import patch
+
+from src.stac_utils.circuit_breaker import CircuitBreaker, CircuitOpenException
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 1000.0
+        patcher = patch("time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(min_calls=4, open_seconds=30)
+        self.url = "https://api.securevan.com/v4/people/123"
+
+    def test_opens_on_failure_rate(self):
+        """Test the circuit opens once enough of the window failed, and fails fast"""
+        for status_code in [200, 500, None]:
+            self.breaker.record(self.url, status_code=status_code)
+        self.assertEqual("closed", self.breaker.get_state(self.url))
+        self.breaker.before_call(self.url)
+
+        self.breaker.record(self.url, status_code=503)
+        self.assertEqual("open", self.breaker.get_state("api.securevan.com"))
+        self.assertTrue(self.breaker.any_open())
+        with self.assertRaises(CircuitOpenException) as context:
+            self.breaker.before_call("https://api.securevan.com/v4/events")
+        self.assertEqual(30, context.exception.retry_after)
+        # other hosts are unaffected
+        self.breaker.before_call("https://us9.api.mailchimp.com/3.0/lists")
+
+    def test_old_outcomes_leave_the_window(self):
+        """Test failures older than the window don't count"""
+        for _ in range(3):
+            self.breaker.record(self.url, status_code=500)
+        self.now += 61
+        for status_code in [200, 200, 200, 500]:
+            self.breaker.record(self.url, status_code=status_code)
+        self.assertEqual("closed", self.breaker.get_state(self.url))
+
+    def test_half_open_probe(self):
+        """Test one probe goes through after open_seconds, closing or reopening the circuit"""
+        for _ in range(4):
+            self.breaker.record(self.url, status_code=500)
+
+        self.now += 30
+        self.breaker.before_call(self.url, probe=False)
+        self.assertEqual("open", self.breaker.get_state(self.url))
+        self.breaker.before_call(self.url)
+        self.assertEqual("half_open", self.breaker.get_state(self.url))
+        self.assertRaises(CircuitOpenException, self.breaker.before_call, self.url)
+
+        self.breaker.record(self.url, status_code=502)
+        self.assertEqual("open", self.breaker.get_state(self.url))
+
+        self.now += 30
+        self.breaker.before_call(self.url)
+        self.breaker.record(self.url, status_code=200)
+        self.assertEqual({"api.securevan.com": "closed"}, self.breaker.states())
+        self.assertFalse(self.breaker.any_open())
+
+    def test_slow_calls_and_per_endpoint(self):
+        """Test slow calls open a per-endpoint circuit when a slow rate is set"""
+        breaker = CircuitBreaker(
+            min_calls=2, slow_call_rate=0.5, slow_call_seconds=5, per_endpoint=True
+        )
+        breaker.record(self.url, "people/123", 200, elapsed=6)
+        breaker.record(self.url, "people/456", 200, elapsed=7)
+
+        self.assertEqual({"api.securevan.com/people/{id}": "open"}, breaker.states())
+        breaker.before_call("https://api.securevan.com/v4/events", "events")
+        breaker.reset()
+        self.assertEqual({}, breaker.states())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import gzip
+import unittest
+import zlib
+
+from src.stac_utils.compression import CompressedBody, compress
+
+
+class TestCompression(unittest.TestCase):
+    def test_compress(self):
+        """Test bodies compress with their encoding and keep their raw size"""
+        data = b'{"email_address": "foo@bar.com"}' * 100
+
+        body = compress(data, "gzip")
+        self.assertIsInstance(body, CompressedBody)
+        self.assertEqual("gzip", body.encoding)
+        self.assertEqual(len(data), body.raw_size)
+        self.assertLess(len(body), len(data))
+        self.assertEqual(data, gzip.decompress(body))
+        # the same body always compresses the same
+        self.assertEqual(body, compress(data, "gzip"))
+
+        body = compress(data, "deflate")
+        self.assertEqual("deflate", body.encoding)
+        self.assertEqual(data, zlib.decompress(body))
+
+    def test_compress_unknown_encoding(self):
+        """Test an unknown encoding raises"""
+        self.assertRaises(ValueError, compress, b"foo", "br")
+
+
+if __name__ == "__main__":
+    unittest.main()
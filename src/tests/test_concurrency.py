@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+from src.stac_utils.concurrency import AdaptiveConcurrencyLimiter
+
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 1000.0
+        patcher = patch(
+            "src.stac_utils.concurrency.time.monotonic", side_effect=lambda: self.now
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_initial_limit(self):
+        """Test the limit starts at half of max_limit, within min_limit"""
+        self.assertEqual(5, AdaptiveConcurrencyLimiter(max_limit=10).slots)
+        self.assertEqual(1, AdaptiveConcurrencyLimiter(max_limit=1).slots)
+        self.assertEqual(3, AdaptiveConcurrencyLimiter(max_limit=10, initial=3).slots)
+        self.assertEqual(
+            4, AdaptiveConcurrencyLimiter(max_limit=10, min_limit=4, initial=1).slots
+        )
+
+    def test_additive_increase(self):
+        """Test a round of healthy responses adds about one slot, up to max_limit"""
+        limiter = AdaptiveConcurrencyLimiter(max_limit=6, initial=4)
+        for _ in range(5):
+            limiter.record(200, 0.1)
+        self.assertEqual(5, limiter.slots)
+        self.assertEqual(1, limiter.stats["increases"])
+
+        for _ in range(100):
+            limiter.record(200, 0.1)
+        self.assertEqual(6, limiter.slots)
+        self.assertEqual(6, limiter.limit)
+
+    def test_client_errors_do_not_change_limit(self):
+        """Test 4xx responses other than 429 neither raise nor cut the limit"""
+        limiter = AdaptiveConcurrencyLimiter(max_limit=10)
+        for _ in range(20):
+            limiter.record(404, 0.1)
+        self.assertEqual(5, limiter.limit)
+
+    def test_multiplicative_decrease(self):
+        """Test 429s and 503s halve the limit once per cooldown, down to min_limit"""
+        limiter = AdaptiveConcurrencyLimiter(max_limit=16, initial=16, min_limit=2)
+        limiter.record(429)
+        limiter.record(503)
+        self.assertEqual(8, limiter.slots)
+        self.assertEqual(1, limiter.stats["decreases"])
+
+        for _ in range(5):
+            self.now += 1
+            limiter.record(429)
+        self.assertEqual(2, limiter.slots)
+
+    def test_latency_decrease(self):
+        """Test latency well above the best seen counts as overload"""
+        limiter = AdaptiveConcurrencyLimiter(max_limit=10, initial=8)
+        for _ in range(5):
+            limiter.record(200, 0.1)
+        self.assertEqual(8, limiter.slots)
+
+        limiter.record(200, 5)
+        self.assertEqual(4, limiter.slots)
+
+    def test_acquire_blocks_at_limit(self):
+        """Test acquire waits for a release once the slots are taken"""
+        limiter = AdaptiveConcurrencyLimiter(max_limit=2, initial=2)
+        self.assertTrue(limiter.try_acquire())
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.try_acquire())
+        self.assertFalse(limiter.acquire(timeout=0.01))
+
+        acquired = []
+        thread = threading.Thread(target=lambda: acquired.append(limiter.acquire(5)))
+        thread.start()
+        limiter.release()
+        thread.join(5)
+        self.assertEqual([True], acquired)
+        self.assertEqual(2, limiter.in_flight)
+
+    def test_throughput_under_throttling(self):
+        """Test the limit settles below a vendor's throttling threshold"""
+        limiter = AdaptiveConcurrencyLimiter(max_limit=20, initial=20, cooldown=0)
+        throttled = 0
+        for _ in range(200):
+            # the vendor answers 429 whenever more than 6 requests are in flight
+            status_code = 429 if limiter.slots > 6 else 200
+            throttled += status_code == 429
+            limiter.record(status_code, 0.1)
+        self.assertLessEqual(limiter.slots, 7)
+        self.assertLess(throttled, 20)
+
+
+class TestAdaptiveConcurrencyLimiterAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_acquire_async(self):
+        """Test tasks wait for a slot without running more than the limit at once"""
+        limiter = AdaptiveConcurrencyLimiter(max_limit=2, initial=2)
+        in_flight = []
+        peak = []
+
+        async def task():
+            await limiter.acquire_async()
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.pop()
+            limiter.release()
+
+        await asyncio.gather(*(task() for _ in range(6)))
+        self.assertEqual(6, len(peak))
+        self.assertEqual(2, max(peak))
+        self.assertEqual(0, limiter.in_flight)
+
+
+if __name__ == "__main__":
+    unittest.main()
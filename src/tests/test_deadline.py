@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import patch
+
+from src.stac_utils.deadline import (
+    DeadlineExceededException,
+    cap_timeout,
+    check_deadline,
+    deadline,
+    get_remaining,
+)
+
+
+class TestDeadline(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 100.0
+        patcher = patch("time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_no_deadline(self):
+        """Test nothing is capped or raised outside a deadline"""
+        self.assertIsNone(get_remaining())
+        self.assertIsNone(cap_timeout(10, 60))
+        check_deadline(1000)
+
+    def test_nested_deadlines(self):
+        """Test an inner deadline can shorten but not extend the outer one"""
+        with deadline(30):
+            with deadline(60):
+                self.assertEqual(30, get_remaining())
+            with deadline(5):
+                self.assertEqual(5, get_remaining())
+            self.now += 20
+            self.assertEqual(10, get_remaining())
+        self.assertIsNone(get_remaining())
+
+    def test_check_and_cap(self):
+        """Test waits that would pass the deadline raise, and timeouts are capped"""
+        with deadline(30):
+            check_deadline(30)
+            self.assertRaises(DeadlineExceededException, check_deadline, 31)
+            self.assertEqual((10, 30), cap_timeout(10, 60))
+            self.assertEqual((30, 30), cap_timeout(None, None))
+
+            self.now += 30
+            self.assertRaises(DeadlineExceededException, check_deadline)
+            self.assertRaises(DeadlineExceededException, cap_timeout, 10, 60)
+
+    def test_not_a_request_exception(self):
+        """Test retry loops catching RequestException don't swallow it"""
+        import requests
+
+        self.assertFalse(
+            issubclass(DeadlineExceededException, requests.exceptions.RequestException)
+        )
+        self.assertTrue(issubclass(DeadlineExceededException, TimeoutError))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.stac_utils.fingerprint import (
+    S3FingerprintStore,
+    SQLiteFingerprintStore,
+    fingerprint,
+)
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_fingerprint_ignores_key_order(self):
+        """Test equal payloads get the same fingerprint whatever their key order"""
+        self.assertEqual(
+            fingerprint({"a": 1, "b": {"c": [1, 2], "d": None}}),
+            fingerprint({"b": {"d": None, "c": [1, 2]}, "a": 1}),
+        )
+        self.assertNotEqual(fingerprint({"a": 1}), fingerprint({"a": "1"}))
+
+
+class TestSQLiteFingerprintStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "fingerprints.db")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_skip_and_record(self):
+        """Test only the fingerprint last recorded for a key counts as unchanged"""
+        store = SQLiteFingerprintStore(self.path)
+        self.assertFalse(store.is_unchanged("list1:abc", "one"))
+        store.record("list1:abc", "one")
+        self.assertTrue(store.is_unchanged("list1:abc", "one"))
+        self.assertFalse(store.is_unchanged("list1:abc", "two"))
+        self.assertFalse(store.is_unchanged("list1:def", "one"))
+        self.assertEqual({"skipped": 1, "sent": 1}, store.stats)
+        store.close()
+
+    def test_persists_between_runs(self):
+        """Test saved fingerprints are there for the next run"""
+        with SQLiteFingerprintStore(self.path) as store:
+            store.record("123", "one")
+        store.close()
+
+        store = SQLiteFingerprintStore(self.path)
+        self.assertEqual("one", store.get("123"))
+        store.close()
+
+
+class TestS3FingerprintStore(unittest.TestCase):
+    @patch("src.stac_utils.fingerprint.save_to_s3")
+    @patch("src.stac_utils.fingerprint.load_from_s3")
+    def test_load_once_and_save_changes(self, mock_load, mock_save):
+        """Test the file is loaded on first use and only written back when changed"""
+        mock_load.return_value = {"123": "one"}
+        store = S3FingerprintStore("bucket", "fingerprints", "van.json")
+
+        self.assertTrue(store.is_unchanged("123", "one"))
+        self.assertFalse(store.is_unchanged("456", "two"))
+        mock_load.assert_called_once_with("bucket", "fingerprints", "van.json")
+
+        store.save()
+        mock_save.assert_not_called()
+
+        store.record("456", "two")
+        store.save()
+        mock_save.assert_called_once_with(
+            {"123": "one", "456": "two"}, "bucket", "fingerprints", "van.json"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
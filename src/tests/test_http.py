@@ -1,10 +1,59 @@
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from itertools import product
 from unittest.mock import MagicMock, patch, call
 
 import requests
 
-from src.stac_utils.http import Client, HTTPClient
+from src.stac_utils.cache import ResponseCache
+from src.stac_utils.circuit_breaker import CircuitBreaker, CircuitOpenException
+from src.stac_utils.compression import CompressedBody
+from src.stac_utils.concurrency import AdaptiveConcurrencyLimiter
+from src.stac_utils.deadline import DeadlineExceededException, get_remaining
+from src.stac_utils.http import (
+    CallResult,
+    Client,
+    CursorPaginator,
+    HTTPClient,
+    OffsetPaginator,
+    PageNumberPaginator,
+    logger as http_logger,
+)
+from src.stac_utils.retry import RetryPolicy
+
+
+class GzipServerHandler(BaseHTTPRequestHandler):
+    """Answers with gzipped bodies and echoes the sizes of gzipped request bodies"""
+
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, body: bytes):
+        compressed = gzip.compress(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(compressed)))
+        self.end_headers()
+        self.wfile.write(compressed)
+
+    def do_GET(self):
+        self.server.accept_encodings.append(self.headers["Accept-Encoding"])
+        items = [{"id": i, "name": "foo"} for i in range(5000)]
+        self.send_body(json.dumps(items).encode())
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers["Content-Encoding"] == "gzip":
+            body = gzip.decompress(body)
+        self.send_body(json.dumps({"received": len(json.loads(body))}).encode())
 
 
 class MockClient(Client):
@@ -118,6 +167,27 @@ class TestHTTPClient(unittest.TestCase):
         # should return with value from retry_wait
         mock_sleep.assert_called_once_with(test_client.retry_wait)
 
+    def test_rate_limiter(self):
+        """Test rate limiter is built once from the rate limits"""
+        test_client = HTTPClient()
+        test_client.update_rate_limits = MagicMock(return_value={"foo": (60, 1)})
+
+        test_limiter = test_client.rate_limiter
+        self.assertIs(test_limiter, test_client.rate_limiter)
+        self.assertEqual(1.0, test_limiter.buckets["foo"].rate)
+
+    @patch("time.sleep")
+    def test_call_api_waits_on_rate_limiter(self, mock_sleep: MagicMock):
+        """Test call api paces each request through the rate limiter"""
+        test_client = HTTPClient()
+        test_client.rate_limiter = MagicMock()
+        test_response = MagicMock()
+        test_response.status_code = 200
+        test_client.session.request = MagicMock(return_value=test_response)
+
+        test_client.call_api("GET", "/foo")
+        test_client.rate_limiter.wait.assert_called_once_with("/foo")
+
     def test_check_response_for_rate_limit(self):
         """Test check response for rate limit"""
 
@@ -126,6 +196,80 @@ class TestHTTPClient(unittest.TestCase):
         result_rate_limit = test_client.check_response_for_rate_limit(mock_response)
         self.assertIsNone(result_rate_limit)
 
+    def test_check_response_for_rate_limit_retry_after(self):
+        """Test check response for rate limit reads Retry-After"""
+
+        mock_response = MagicMock()
+        mock_response.headers = {"Retry-After": "3"}
+        test_client = HTTPClient()
+        self.assertEqual(3.0, test_client.check_response_for_rate_limit(mock_response))
+
+    def test_check_response_for_rate_limit_reset(self):
+        """Test check response for rate limit uses the reset once spent"""
+
+        mock_response = MagicMock()
+        mock_response.headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "5"}
+        test_client = HTTPClient()
+        self.assertEqual(5.0, test_client.check_response_for_rate_limit(mock_response))
+
+        mock_response.headers = {"X-RateLimit-Remaining": "3", "X-RateLimit-Reset": "5"}
+        self.assertIsNone(test_client.check_response_for_rate_limit(mock_response))
+
+    def test_update_rate_limit_state(self):
+        """Test a spent budget pauses the rate limiter until it resets"""
+
+        test_client = HTTPClient()
+        test_client.rate_limiter = MagicMock()
+        mock_response = MagicMock()
+
+        mock_response.headers = {"X-RateLimit-Remaining": "1", "X-RateLimit-Reset": "5"}
+        test_client.update_rate_limit_state("foo", mock_response)
+        test_client.rate_limiter.pause.assert_not_called()
+
+        mock_response.headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "5"}
+        test_client.update_rate_limit_state("foo", mock_response)
+        test_client.rate_limiter.pause.assert_called_once_with("foo", 5.0)
+
+    @patch("time.sleep")
+    def test_wait_for_rate_pauses_limiter(self, mock_sleep: MagicMock):
+        """Test wait for rate also holds other workers sharing the limiter"""
+
+        test_client = HTTPClient()
+        test_client.rate_limiter = MagicMock()
+        test_client.check_response_for_rate_limit = MagicMock(return_value=0.42)
+
+        test_client.wait_for_rate("FOO", MagicMock())
+        test_client.rate_limiter.pause.assert_called_once_with("FOO", 0.42)
+        mock_sleep.assert_called_once_with(0.42)
+
+    @patch("time.monotonic")
+    @patch("time.sleep")
+    def test_call_api_429_sleeps_only_retry_after(
+        self, mock_sleep: MagicMock, mock_monotonic: MagicMock
+    ):
+        """Test a 429 waits for Retry-After without a backoff on top"""
+
+        clock = [100.0]
+        mock_monotonic.side_effect = lambda: clock[0]
+        mock_sleep.side_effect = lambda seconds: clock.__setitem__(
+            0, clock[0] + seconds
+        )
+
+        test_client = HTTPClient()
+        test_session = test_client.session
+        rate_limited_response = requests.Response()
+        rate_limited_response.status_code = 429
+        rate_limited_response.headers["Retry-After"] = "2"
+        ok_response = requests.Response()
+        ok_response.status_code = 200
+        test_session.request = MagicMock(
+            side_effect=[rate_limited_response, ok_response]
+        )
+
+        test_client.call_api("GET", "/foo")
+        self.assertEqual(2, test_session.request.call_count)
+        self.assertEqual([call(0.0), call(2.0)], mock_sleep.call_args_list)
+
     def test_format_url(self):
         """Test format url"""
 
@@ -249,6 +393,536 @@ class TestHTTPClient(unittest.TestCase):
         )
         mock_sleep.assert_has_calls([call(0.0), call(1.0), call(2.0), call(3.0)])
 
+    def test_call_many(self):
+        """Test call many runs every spec through call api, in order"""
+        test_client = HTTPClient()
+        test_client.call_api = MagicMock(
+            side_effect=lambda method, endpoint, **kwargs: {"endpoint": endpoint}
+        )
+
+        test_specs = [
+            ("GET", "foo"),
+            ("GET", "bar", {"spam": 1}),
+            ("POST", "spam", None, {"eggs": 2}),
+            {"method": "PUT", "endpoint": "eggs", "return_headers": True},
+        ]
+        results = list(test_client.call_many(test_specs, concurrency=2))
+
+        self.assertEqual([0, 1, 2, 3], [result.index for result in results])
+        self.assertEqual(
+            ["foo", "bar", "spam", "eggs"],
+            [result.data["endpoint"] for result in results],
+        )
+        self.assertTrue(all(result.ok for result in results))
+        test_client.call_api.assert_has_calls(
+            [
+                call("GET", "foo", params=None, body=None),
+                call("GET", "bar", params={"spam": 1}, body=None),
+                call("POST", "spam", params=None, body={"eggs": 2}),
+                call("PUT", "eggs", params=None, body=None, return_headers=True),
+            ],
+            any_order=True,
+        )
+
+    def test_call_many_attaches_errors(self):
+        """Test call many attaches errors to results instead of raising"""
+        test_client = HTTPClient()
+        test_error = requests.exceptions.HTTPError("404")
+
+        def mock_call_api(method, endpoint, **kwargs):
+            if endpoint == "bad":
+                raise test_error
+            return {}
+
+        test_client.call_api = MagicMock(side_effect=mock_call_api)
+
+        results = list(
+            test_client.call_many([("GET", "good"), ("GET", "bad"), ("GET", "good")])
+        )
+        self.assertEqual([True, False, True], [result.ok for result in results])
+        self.assertIs(test_error, results[1].error)
+        self.assertIsInstance(results[1], CallResult)
+
+    def test_call_many_unordered(self):
+        """Test call many yields every result when unordered"""
+        test_client = HTTPClient()
+        test_client.call_api = MagicMock(return_value={})
+
+        results = list(
+            test_client.call_many(
+                (("GET", f"foo/{i}") for i in range(50)), ordered=False
+            )
+        )
+        self.assertEqual(list(range(50)), sorted(result.index for result in results))
+
+    def test_call_many_caps_concurrency(self):
+        """Test call many never runs more than max_connections at once"""
+        test_client = HTTPClient()
+        test_client.max_connections = 3
+        lock = threading.Lock()
+        in_flight = []
+        peak = []
+
+        def mock_call_api(method, endpoint, **kwargs):
+            with lock:
+                in_flight.append(endpoint)
+                peak.append(len(in_flight))
+            time.sleep(0.01)
+            with lock:
+                in_flight.remove(endpoint)
+            return {}
+
+        test_client.call_api = MagicMock(side_effect=mock_call_api)
+        list(test_client.call_many([("GET", str(i)) for i in range(20)], 10))
+        self.assertLessEqual(max(peak), 3)
+
+    def test_normalize_call_spec_too_long(self):
+        """Test call spec with too many values raises"""
+        self.assertRaises(
+            ValueError,
+            HTTPClient._normalize_call_spec,
+            ("GET", "foo", None, None, "spam"),
+        )
+
+    def test_create_retry_policy(self):
+        """Test the default policy is the linear retry_wait ladder"""
+        test_client = HTTPClient()
+        test_client.retry_wait = 7
+        test_policy = test_client.retry_policy
+
+        self.assertEqual(test_client.retry_limit, test_policy.max_retries)
+        self.assertEqual(
+            [0.0, 7.0, 14.0, 21.0], [test_policy.get_delay(i) for i in range(4)]
+        )
+        self.assertFalse(test_policy.should_retry(1, 404))
+        self.assertTrue(test_policy.should_retry(1, 400))
+
+    @patch("time.sleep")
+    def test_call_api_with_retry_policy(self, mock_sleep: MagicMock):
+        """Test call api backs off and gives up as the retry policy says"""
+
+        test_client = HTTPClient()
+        test_client.retry_policy = RetryPolicy(
+            max_retries=2, base_delay=1, jitter=False
+        )
+
+        test_session = test_client.session
+        test_response = MagicMock()
+        test_response.status_code = 503
+        test_response.raise_for_status = MagicMock(
+            side_effect=requests.exceptions.HTTPError
+        )
+        test_session.request = MagicMock(return_value=test_response)
+
+        self.assertRaises(
+            requests.exceptions.HTTPError, test_client.call_api, "GET", "/foo"
+        )
+        self.assertEqual(3, test_session.request.call_count)
+        mock_sleep.assert_has_calls([call(0.0), call(1.0), call(2.0)])
+
+    def test_log_request_lazy(self):
+        """Test payloads aren't formatted unless debug logging is on"""
+        test_client = HTTPClient()
+        test_body = MagicMock()
+
+        with patch.object(http_logger, "isEnabledFor", return_value=False):
+            test_client.log_request("POST", "foo", None, test_body)
+        test_body.__str__.assert_not_called()
+
+    def test_log_request_truncates(self):
+        """Test debug payload logging is truncated"""
+        test_client = HTTPClient()
+        test_client.log_payload_limit = 10
+
+        with self.assertLogs(http_logger, level="DEBUG") as logs:
+            test_client.log_request("POST", "foo", {"a": 1}, "x" * 50)
+
+        self.assertEqual(
+            [
+                "DEBUG:src.stac_utils.http:POST foo params={'a': 1} "
+                "body=xxxxxxxxxx... (50 chars)"
+            ],
+            logs.output,
+        )
+
+    def test_log_response(self):
+        """Test the info summary has method, endpoint, status, latency and bytes"""
+        test_client = HTTPClient()
+        test_response = requests.Response()
+        test_response.status_code = 201
+        test_response._content = b"12345"
+        test_response.request = requests.Request(
+            "POST", "https://foo.org/bar", data="abc"
+        ).prepare()
+
+        with self.assertLogs(http_logger, level="INFO") as logs:
+            test_client.log_response("POST", "bar", test_response, 0.25)
+
+        self.assertEqual(
+            ["INFO:src.stac_utils.http:POST bar 201 250ms out=3B in=5B"],
+            logs.output,
+        )
+
+    def test_log_requests_switch(self):
+        """Test the client level switch turns request logging off"""
+        test_client = HTTPClient()
+        test_client.log_requests = False
+
+        with (
+            patch.object(http_logger, "info") as mock_info,
+            patch.object(http_logger, "debug") as mock_debug,
+        ):
+            test_client.log_request("GET", "foo", None, None)
+            test_client.log_response("GET", "foo", MagicMock(), 0.1)
+            test_client.log_data("GET", "foo", {})
+
+        mock_info.assert_not_called()
+        mock_debug.assert_not_called()
+
+    @patch("time.sleep")
+    def test_call_api_metrics(self, mock_sleep: MagicMock):
+        """Test call api records requests, 429s, 401s and retries"""
+        test_client = HTTPClient()
+        test_client.retry_limit = 5
+        test_client.wait_for_rate = MagicMock()
+        test_client.refresh_auth = MagicMock()
+        responses = []
+        for status_code in [429, 401, 200]:
+            test_response = MagicMock()
+            test_response.status_code = status_code
+            if status_code >= 400:
+                test_response.raise_for_status.side_effect = requests.HTTPError()
+            responses.append(test_response)
+        test_client.session.request = MagicMock(side_effect=responses)
+
+        test_client.call_api("GET", "people/123")
+
+        summary = test_client.metrics.summary()["GET people/{id}"]
+        self.assertEqual(3, summary["requests"])
+        self.assertEqual(2, summary["errors"])
+        self.assertEqual(1, summary["rate_limited"])
+        self.assertEqual(1, summary["auth_refreshes"])
+        self.assertEqual(2, summary["retries"])
+
+    @patch("time.sleep")
+    def test_call_api_metrics_connection_error(self, mock_sleep: MagicMock):
+        """Test requests that never get a response are recorded as errors"""
+        test_client = HTTPClient()
+        test_client.retry_limit = 1
+        error = requests.exceptions.ConnectionError("nope")
+        test_client.session.request = MagicMock(side_effect=error)
+        post_hook = MagicMock()
+        test_client.add_hook("post_request", post_hook)
+
+        self.assertRaises(
+            requests.exceptions.ConnectionError, test_client.call_api, "GET", "foo"
+        )
+
+        summary = test_client.metrics.summary()["GET foo"]
+        self.assertEqual(2, summary["requests"])
+        self.assertEqual(2, summary["errors"])
+        self.assertIsNone(post_hook.call_args.kwargs["response"])
+        self.assertIs(error, post_hook.call_args.kwargs["error"])
+
+    @patch("time.sleep")
+    def test_call_api_hooks(self, mock_sleep: MagicMock):
+        """Test pre and post request hooks get the request details"""
+        test_client = HTTPClient()
+        test_response = MagicMock()
+        test_response.status_code = 200
+        test_client.session.request = MagicMock(return_value=test_response)
+        pre_hook = MagicMock()
+        post_hook = MagicMock()
+        test_client.add_hook("pre_request", pre_hook)
+        test_client.add_hook("post_request", post_hook)
+
+        test_client.call_api("POST", "foo", params={"a": 1}, body={"b": 2})
+
+        pre_hook.assert_called_once_with(
+            method="POST",
+            endpoint="foo",
+            url="ERROR/foo",
+            params={"a": 1},
+            body={"b": 2},
+        )
+        post_hook.assert_called_once()
+        self.assertIs(test_response, post_hook.call_args.kwargs["response"])
+        self.assertIsNone(post_hook.call_args.kwargs["error"])
+
+    @patch("time.sleep")
+    def test_call_api_response_cache(self, mock_sleep: MagicMock):
+        """Test fresh GETs come from the cache and writes invalidate it"""
+        test_client = HTTPClient()
+        test_client.response_cache = ResponseCache()
+        test_response = MagicMock()
+        test_response.status_code = 200
+        test_response.headers = {}
+        test_client.transform_response = MagicMock(side_effect=[{"a": 1}, {}, {"a": 2}])
+        test_client.session.request = MagicMock(return_value=test_response)
+
+        self.assertEqual({"a": 1}, test_client.call_api("GET", "foo"))
+        self.assertEqual({"a": 1}, test_client.call_api("GET", "foo"))
+        self.assertEqual(1, test_client.session.request.call_count)
+
+        test_client.call_api("POST", "foo")
+        self.assertEqual({"a": 2}, test_client.call_api("GET", "foo"))
+        self.assertEqual(3, test_client.session.request.call_count)
+        self.assertEqual(1, test_client.response_cache.stats["hits"])
+
+    @patch("time.sleep")
+    def test_call_api_response_cache_bypass(self, mock_sleep: MagicMock):
+        """Test use_cache=False always makes the request"""
+        test_client = HTTPClient()
+        test_client.response_cache = ResponseCache()
+        test_response = MagicMock()
+        test_response.status_code = 200
+        test_client.session.request = MagicMock(return_value=test_response)
+
+        test_client.call_api("GET", "foo")
+        test_client.call_api("GET", "foo", use_cache=False)
+        self.assertEqual(2, test_client.session.request.call_count)
+        test_client.session.request.assert_called_with(
+            "GET", "ERROR/foo", params=None, json=None
+        )
+
+    @patch("time.sleep")
+    def test_call_api_response_cache_revalidate(self, mock_sleep: MagicMock):
+        """Test stale entries are revalidated and a 304 reuses the data"""
+        test_client = HTTPClient()
+        test_client.response_cache = ResponseCache(ttl=0)
+        first_response = MagicMock()
+        first_response.status_code = 200
+        first_response.headers = {"ETag": '"abc"'}
+        not_modified = MagicMock()
+        not_modified.status_code = 304
+        not_modified.headers = {}
+        test_client.transform_response = MagicMock(return_value={"a": 1})
+        test_client.session.request = MagicMock(
+            side_effect=[first_response, not_modified]
+        )
+
+        test_client.call_api("GET", "foo", params={"b": 2})
+        self.assertEqual({"a": 1}, test_client.call_api("GET", "foo", params={"b": 2}))
+
+        test_client.session.request.assert_called_with(
+            "GET",
+            "ERROR/foo",
+            params={"b": 2},
+            json=None,
+            headers={"If-None-Match": '"abc"'},
+        )
+        test_client.transform_response.assert_called_once()
+        self.assertEqual(1, test_client.response_cache.stats["revalidated"])
+
+    @patch("time.sleep")
+    def test_call_api_coalesces_gets(self, mock_sleep: MagicMock):
+        """Test identical GETs in flight at once share one request"""
+        test_client = HTTPClient()
+        release = threading.Event()
+        test_response = MagicMock()
+        test_response.status_code = 200
+
+        def request(*args, **kwargs):
+            release.wait()
+            return test_response
+
+        test_client.session.request = MagicMock(side_effect=request)
+        test_client.transform_response = MagicMock(return_value={"a": 1})
+
+        with ThreadPoolExecutor(3) as executor:
+            futures = [
+                executor.submit(test_client.call_api, "GET", "foo") for _ in range(3)
+            ]
+            while test_client.single_flight.stats["coalesced"] < 2:
+                time.sleep(0.01)
+            release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual([{"a": 1}] * 3, results)
+        test_client.session.request.assert_called_once()
+
+    @patch("time.sleep")
+    def test_call_api_coalesce_off(self, mock_sleep: MagicMock):
+        """Test writes and clients with coalescing off skip single flight"""
+        test_client = HTTPClient()
+        test_client.single_flight = MagicMock()
+        test_response = MagicMock()
+        test_response.status_code = 200
+        test_client.session.request = MagicMock(return_value=test_response)
+
+        test_client.call_api("POST", "foo")
+        test_client.coalesce_gets = False
+        test_client.call_api("GET", "foo")
+
+        test_client.single_flight.do.assert_not_called()
+        self.assertEqual(2, test_client.session.request.call_count)
+
+    @patch("time.sleep")
+    def test_call_api_circuit_breaker(self, mock_sleep: MagicMock):
+        """Test an open circuit stops the retry ladder and fails later calls fast"""
+        test_client = HTTPClient()
+        test_client.base_url = "https://api.example.com"
+        test_client.circuit_breaker = CircuitBreaker(min_calls=2, open_seconds=60)
+        test_response = MagicMock()
+        test_response.status_code = 503
+        test_response.raise_for_status.side_effect = requests.HTTPError()
+        test_client.session.request = MagicMock(return_value=test_response)
+
+        self.assertRaises(CircuitOpenException, test_client.call_api, "GET", "foo")
+        self.assertEqual(2, test_client.session.request.call_count)
+        # the retry wasn't backed off for
+        self.assertEqual(2, mock_sleep.call_count)
+
+        self.assertRaises(CircuitOpenException, test_client.call_api, "POST", "bar")
+        self.assertEqual(2, test_client.session.request.call_count)
+        self.assertTrue(test_client.circuit_breaker.any_open())
+
+    def test_create_concurrency_limiter(self):
+        """Test the adaptive limiter is opt-in and capped at max_connections"""
+        self.assertIsNone(HTTPClient().concurrency_limiter)
+
+        class AdaptiveClient(HTTPClient):
+            adaptive_concurrency = True
+            max_connections = 8
+
+        limiter = AdaptiveClient().concurrency_limiter
+        self.assertIsInstance(limiter, AdaptiveConcurrencyLimiter)
+        self.assertEqual(8, limiter.max_limit)
+
+    @patch("time.sleep")
+    def test_call_api_concurrency_limiter(self, mock_sleep: MagicMock):
+        """Test requests hold a slot while in flight and 429s cut the limit"""
+        test_client = HTTPClient()
+        limiter = test_client.concurrency_limiter = AdaptiveConcurrencyLimiter(
+            max_limit=8, initial=8
+        )
+        test_429 = MagicMock()
+        test_429.status_code = 429
+        test_429.raise_for_status.side_effect = requests.HTTPError()
+        test_ok = MagicMock()
+        test_ok.status_code = 200
+        in_flight = []
+
+        def request(*args, **kwargs):
+            in_flight.append(limiter.in_flight)
+            return test_ok if len(in_flight) > 1 else test_429
+
+        test_client.session.request = MagicMock(side_effect=request)
+        test_client.call_api("GET", "foo")
+
+        self.assertEqual([1, 1], in_flight)
+        self.assertEqual(0, limiter.in_flight)
+        self.assertEqual(4, limiter.slots)
+        self.assertEqual(1, limiter.stats["decreases"])
+
+    def test_concurrency_slot_deadline(self):
+        """Test waiting for a slot gives up when the deadline passes"""
+        test_client = HTTPClient()
+        test_client.concurrency_limiter = AdaptiveConcurrencyLimiter(max_limit=1)
+        test_client.concurrency_limiter.acquire()
+
+        with test_client.deadline(0.01):
+            with self.assertRaises(DeadlineExceededException):
+                with test_client.concurrency_slot():
+                    pass
+        self.assertEqual(1, test_client.concurrency_limiter.in_flight)
+
+    def test_adapter_default_timeout(self):
+        """Test requests without a timeout get the client's connect and read timeouts"""
+        test_client = HTTPClient()
+        test_client.connect_timeout = 3
+        test_client.read_timeout = 20
+        adapter = test_client.create_adapter()
+
+        with patch("requests.adapters.HTTPAdapter.send") as mock_send:
+            adapter.send(MagicMock())
+            self.assertEqual((3, 20), mock_send.call_args.kwargs["timeout"])
+            adapter.send(MagicMock(), timeout=5)
+            self.assertEqual(5, mock_send.call_args.kwargs["timeout"])
+
+    @patch("time.sleep")
+    def test_call_api_deadline(self, mock_sleep: MagicMock):
+        """Test a deadline caps request timeouts and cuts the retry ladder short"""
+        test_client = HTTPClient()
+        test_response = MagicMock()
+        test_response.status_code = 503
+        test_response.raise_for_status.side_effect = requests.HTTPError()
+        test_client.session.request = MagicMock(return_value=test_response)
+
+        with test_client.deadline(seconds=10):
+            self.assertRaises(
+                DeadlineExceededException, test_client.call_api, "GET", "foo"
+            )
+
+        # the first 7 second retry fits, the 14 second one doesn't
+        self.assertEqual(2, test_client.session.request.call_count)
+        connect, read = test_client.session.request.call_args.kwargs["timeout"]
+        self.assertLessEqual(connect, 10)
+        self.assertLessEqual(read, 10)
+        mock_sleep.assert_called_with(7)
+
+    @patch("time.sleep")
+    def test_call_api_deadline_rate_limit_pause(self, mock_sleep: MagicMock):
+        """Test a rate limit pause longer than the deadline raises without sleeping"""
+        test_client = HTTPClient()
+        test_client.session.request = MagicMock()
+        test_client.rate_limiter.pause("foo", 30)
+
+        with test_client.deadline(seconds=1):
+            self.assertRaises(
+                DeadlineExceededException, test_client.call_api, "GET", "foo"
+            )
+        # only the zero first-attempt backoff, never the 30 second pause
+        mock_sleep.assert_called_once_with(0)
+        test_client.session.request.assert_not_called()
+
+    def test_map_concurrent_shares_deadline(self):
+        """Test map_concurrent workers run inside the caller's deadline"""
+        test_client = HTTPClient()
+        self.assertEqual(
+            [None], list(test_client.map_concurrent(lambda _: get_remaining(), [1]))
+        )
+        with test_client.deadline(seconds=60):
+            remaining = list(
+                test_client.map_concurrent(lambda _: get_remaining(), range(3))
+            )
+        self.assertTrue(all(0 < seconds <= 60 for seconds in remaining))
+
+    def test_add_hook_unknown_event(self):
+        """Test unknown hook events are rejected"""
+        test_client = HTTPClient()
+        self.assertRaises(ValueError, test_client.add_hook, "on_foo", MagicMock())
+
+    @patch("time.sleep")
+    def test_call_api_override_data_printing(self, mock_sleep: MagicMock):
+        """Test call api only logs the data when not overridden"""
+        test_client = HTTPClient()
+        test_client.log_data = MagicMock()
+        test_response = MagicMock()
+        test_response.status_code = 200
+        test_client.session.request = MagicMock(return_value=test_response)
+
+        test_client.call_api("GET", "/foo", override_data_printing=True)
+        test_client.log_data.assert_not_called()
+
+        test_client.call_api("GET", "/foo")
+        test_client.log_data.assert_called_once()
+
+    def test_map_concurrent(self):
+        """Test map_concurrent keeps order and raises errors when reached"""
+        test_client = HTTPClient()
+
+        def double(item: int) -> int:
+            if item == 3:
+                raise ValueError("nope")
+            return item * 2
+
+        self.assertEqual([0, 2, 4], list(test_client.map_concurrent(double, range(3))))
+
+        results = test_client.map_concurrent(double, range(5), concurrency=2)
+        self.assertEqual([0, 2, 4], [next(results) for _ in range(3)])
+        self.assertRaises(ValueError, next, results)
+
     def test_get(self):
         """Test GET"""
         test_client = HTTPClient()
@@ -309,6 +983,28 @@ class TestHTTPClient(unittest.TestCase):
         test_session = test_client.create_session()
         self.assertIsInstance(test_session, requests.Session)
 
+    def test_create_session_mounts_pooled_adapter(self):
+        """Test create session mounts an adapter with max_connections per host"""
+        test_client = HTTPClient()
+        test_session = test_client.create_session()
+
+        for prefix in ["https://", "http://"]:
+            adapter = test_session.get_adapter(prefix + "foo.org")
+            self.assertEqual(test_client.max_connections, adapter._pool_maxsize)
+            self.assertEqual(test_client.pool_hosts, adapter._pool_connections)
+            self.assertTrue(adapter._pool_block)
+
+    def test_create_adapter_per_host_limit(self):
+        """Test per-host limit overrides max_connections for the pool size"""
+        test_client = HTTPClient()
+        test_client.max_connections_per_host = 3
+        test_client.pool_block = False
+
+        adapter = test_client.create_adapter()
+        self.assertEqual(3, adapter._pool_maxsize)
+        self.assertEqual(test_client.pool_hosts, adapter._pool_connections)
+        self.assertFalse(adapter._pool_block)
+
     def test_transform_response(self):
         """Test transform_response"""
         test_client = HTTPClient()
@@ -319,5 +1015,173 @@ class TestHTTPClient(unittest.TestCase):
         self.assertEqual(expected_transform, result_transform)
 
 
+class TestPaginator(unittest.TestCase):
+    def test_cursor(self):
+        """Test the cursor is followed until there isn't one"""
+        pages = {
+            "a": {"items": [1, 2], "next": "b"},
+            "b": {"items": [3], "next": "c"},
+            "c": {"items": [4]},
+        }
+        fetch = MagicMock(side_effect=lambda cursor: pages[cursor])
+
+        paginator = CursorPaginator(
+            fetch,
+            lambda data: data["items"],
+            first_request="a",
+            get_next=lambda data: data.get("next"),
+        )
+
+        self.assertEqual([1, 2, 3, 4], list(paginator))
+        fetch.assert_has_calls([call("a"), call("b"), call("c")])
+        self.assertEqual(3, fetch.call_count)
+
+    def test_offset_total(self):
+        """Test offsets stop at the total, even when fetching ahead"""
+        fetch = MagicMock(
+            side_effect=lambda offset: {
+                "items": list(range(offset, min(offset + 2, 5))),
+                "total": 5,
+            }
+        )
+
+        paginator = OffsetPaginator(
+            fetch,
+            lambda data: data["items"],
+            count=2,
+            get_total=lambda data: data["total"],
+            prefetch=4,
+        )
+
+        self.assertEqual([0, 1, 2, 3, 4], list(paginator))
+        self.assertEqual(
+            [call(0), call(2), call(4)], sorted(fetch.call_args_list, key=str)
+        )
+
+    def test_page_number_prefetch(self):
+        """Test pages are fetched ahead and yielded in order, ending on an empty page"""
+        fetch = MagicMock(side_effect=lambda page: [page] if page <= 4 else [])
+
+        paginator = PageNumberPaginator(fetch, lambda data: data, prefetch=3)
+        pages = list(paginator.pages())
+
+        self.assertEqual([1, 2, 3, 4, 5], [page.request for page in pages])
+        self.assertEqual([], pages[-1].items)
+        self.assertGreaterEqual(fetch.call_count, 5)
+
+    def test_max_pages(self):
+        """Test nothing is fetched past max_pages"""
+        fetch = MagicMock(side_effect=lambda page: [page])
+
+        paginator = PageNumberPaginator(
+            fetch, lambda data: data, max_pages=3, prefetch=5
+        )
+
+        self.assertEqual([1, 2, 3], list(paginator))
+        self.assertEqual(3, fetch.call_count)
+
+    def test_no_prefetch(self):
+        """Test prefetch 0 only fetches a page when it's asked for"""
+        fetch = MagicMock(side_effect=lambda page: [page])
+
+        pages = PageNumberPaginator(fetch, lambda data: data, prefetch=0).pages()
+        next(pages)
+        next(pages)
+        pages.close()
+
+        self.assertEqual([call(1), call(2)], fetch.call_args_list)
+
+    def test_speculative_errors_ignored(self):
+        """Test errors on pages past the end are dropped"""
+
+        def fetch(page: int):
+            if page > 3:
+                raise requests.exceptions.HTTPError("past the end")
+            return [page] if page < 3 else []
+
+        paginator = PageNumberPaginator(fetch, lambda data: data, prefetch=4)
+
+        self.assertEqual([1, 2], list(paginator))
+
+    def test_errors_raised(self):
+        """Test errors on needed pages are raised to the caller"""
+        fetch = MagicMock(side_effect=[[1], requests.exceptions.HTTPError("nope")])
+
+        paginator = PageNumberPaginator(fetch, lambda data: data, prefetch=0)
+
+        self.assertRaises(requests.exceptions.HTTPError, list, paginator)
+
+
+class TestHTTPClientCompression(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), GzipServerHandler)
+        self.server.accept_encodings = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.test_client = HTTPClient()
+        self.test_client.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.test_client.retry_wait = 0
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_encode_body(self):
+        """Test bodies are only compressed when there's an encoding and they're big"""
+        body = [{"email_address": f"foo{i}@bar.com"} for i in range(100)]
+        self.assertEqual(
+            {"json": body, "timeout": 1},
+            self.test_client.encode_body("POST", "foo", body, {"timeout": 1}),
+        )
+
+        self.test_client.request_encoding = "gzip"
+        kwargs = self.test_client.encode_body("POST", "foo", body, {"timeout": 1})
+        self.assertIsInstance(kwargs["data"], CompressedBody)
+        self.assertEqual(body, json.loads(gzip.decompress(kwargs["data"])))
+        self.assertEqual("gzip", kwargs["headers"]["Content-Encoding"])
+        self.assertEqual("application/json", kwargs["headers"]["Content-Type"])
+        self.assertEqual(1, kwargs["timeout"])
+
+        kwargs = self.test_client.encode_body("POST", "foo", {"a": 1}, {})
+        self.assertEqual(b'{"a":1}', kwargs["data"].replace(b" ", b""))
+        self.assertNotIn("Content-Encoding", kwargs["headers"])
+
+    def test_call_api_compression_metrics(self):
+        """Test compressed requests and responses report raw and wire sizes"""
+        self.test_client.request_encoding = "gzip"
+        body = [{"email_address": f"foo{i}@bar.com"} for i in range(1000)]
+
+        data = self.test_client.call_api("POST", "members", body=body)
+        self.assertEqual({"received": 1000}, json.loads(data))
+        data = self.test_client.call_api("GET", "items")
+        self.assertEqual(5000, len(json.loads(data)))
+        self.assertEqual(["gzip, deflate"], self.server.accept_encodings)
+
+        summary = self.test_client.metrics.summary()
+        posted = summary["POST members"]
+        self.assertEqual(len(json.dumps(body).replace(" ", "")), posted["bytes_out"])
+        self.assertLess(posted["wire_bytes_out"], posted["bytes_out"] / 5)
+        fetched = summary["GET items"]
+        self.assertLess(fetched["wire_bytes_in"], fetched["bytes_in"] / 5)
+
+    def test_stream_and_download(self):
+        """Test large responses stream decompressed into a file"""
+        chunks = list(self.test_client.stream("GET", "items", chunk_size=1024))
+        self.assertLessEqual(max(len(chunk) for chunk in chunks), 1024)
+        self.assertEqual(5000, len(json.loads(b"".join(chunks))))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "items.json")
+            written = self.test_client.download("items", path)
+            with open(path, "rb") as file:
+                self.assertEqual(b"".join(chunks), file.read())
+        self.assertEqual(len(b"".join(chunks)), written)
+
+        fetched = self.test_client.metrics.summary()["GET items"]
+        self.assertEqual(2, fetched["requests"])
+        self.assertEqual(2 * written, fetched["bytes_in"])
+        self.assertLess(fetched["wire_bytes_in"], fetched["bytes_in"] / 5)
+
+
 if __name__ == "__main__":
     unittest.main()
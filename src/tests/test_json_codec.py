@@ -0,0 +1,189 @@
+import contextlib
+import io
+import json
+import os
+import unittest
+from datetime import date, datetime
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from src.stac_utils.benchmark import Benchmark
+from src.stac_utils.http import HTTPClient, JSONSession
+from src.stac_utils.json_codec import (
+    JSON_CODECS,
+    JSONCodec,
+    get_json_codec,
+    is_available,
+)
+
+AVAILABLE = [name for name in JSON_CODECS if is_available(name)]
+
+# a page of VAN people and of MailChimp members, the shapes the clients decode most
+VAN_PAGE = {
+    "items": [
+        {
+            "vanId": 100000 + i,
+            "firstName": "Jane",
+            "lastName": f"Doe {i}",
+            "emails": [{"email": f"jane{i}@staclabs.com", "isPreferred": True}],
+            "phones": [{"phoneNumber": "5555555555", "phoneType": "Cell"}],
+            "addresses": [{"addressLine1": f"{i} Main St", "zipOrPostalCode": "12345"}],
+            "customFields": [{"customFieldId": 7, "assignedValue": None}],
+        }
+        for i in range(200)
+    ],
+    "count": 5000,
+    "nextPageLink": "https://api.securevan.com/v4/people?$skip=200",
+}
+MAILCHIMP_PAGE = {
+    "members": [
+        {
+            "id": f"{i:032x}",
+            "email_address": f"jane{i}@staclabs.com",
+            "status": "subscribed",
+            "merge_fields": {"FNAME": "Jane", "LNAME": f"Doe ✓ {i}", "BIRTHDAY": ""},
+            "stats": {"avg_open_rate": 0.5, "avg_click_rate": 0.125},
+            "tags": [{"id": 1, "name": "Donor"}],
+            "last_changed": "2024-01-01T00:00:00+00:00",
+        }
+        for i in range(1000)
+    ],
+    "total_items": 50000,
+}
+
+
+class TestJSONCodec(unittest.TestCase):
+    def test_get_json_codec(self):
+        """Test auto picks the fastest installed library and names are checked"""
+        self.assertEqual(AVAILABLE[0], get_json_codec().name)
+        self.assertIsInstance(get_json_codec("json"), JSONCodec)
+        self.assertRaises(ValueError, get_json_codec, "simplejson")
+
+        with (
+            patch("src.stac_utils.json_codec.orjson", None),
+            patch("src.stac_utils.json_codec.ujson", None),
+        ):
+            self.assertEqual("json", get_json_codec().name)
+            self.assertRaises(ImportError, get_json_codec, "orjson")
+
+    def test_round_trip(self):
+        """Test every installed codec decodes what the standard library does"""
+        payload = {"items": [1, 2.5, None, True, "ünïcode"], "nested": {"a": []}}
+        for name in AVAILABLE:
+            with self.subTest(name):
+                codec = get_json_codec(name)
+                encoded = codec.dumps(payload)
+                self.assertIsInstance(encoded, bytes)
+                self.assertEqual(payload, json.loads(encoded))
+                self.assertEqual(payload, codec.loads(encoded))
+                self.assertEqual(payload, codec.loads(encoded.decode()))
+
+    def test_falls_back_to_standard_library(self):
+        """Test payloads the fast libraries reject still encode and decode"""
+        for name in AVAILABLE:
+            with self.subTest(name):
+                codec = get_json_codec(name)
+                big = b'{"big": 18446744073709551616}'
+                encoded = codec.dumps({"big": 2**64})
+                self.assertEqual({"big": 2**64}, json.loads(encoded))
+                self.assertEqual({"big": 2**64}, codec.loads(big))
+                self.assertRaises(json.JSONDecodeError, codec.loads, b"not json")
+                self.assertRaises(json.JSONDecodeError, codec.loads, b"")
+
+    def test_encode_rejects_like_standard_library(self):
+        """Test every installed codec refuses NaN, infinity and dates as json does"""
+        for name in AVAILABLE:
+            with self.subTest(name):
+                codec = get_json_codec(name)
+                for bad in [float("nan"), float("inf"), -float("inf")]:
+                    self.assertRaises(ValueError, codec.dumps, {"a": bad})
+                    self.assertRaises(ValueError, codec.dumps, [None, [bad]])
+                self.assertRaises(TypeError, codec.dumps, {"a": date(2024, 1, 2)})
+                self.assertRaises(TypeError, codec.dumps, [datetime(2024, 1, 2)])
+                self.assertEqual(
+                    {"a": None, "b": "null"},
+                    json.loads(codec.dumps({"a": None, "b": "null"})),
+                )
+                self.assertEqual({"1": 2}, json.loads(codec.dumps({1: 2})))
+
+    def test_decode_pages(self):
+        """Test every installed codec decodes VAN and MailChimp pages like response.json()"""
+        for page in [VAN_PAGE, MAILCHIMP_PAGE]:
+            response = requests.Response()
+            response._content = json.dumps(page).encode()
+            response.encoding = "utf-8"
+            expected = response.json()
+
+            for name in AVAILABLE:
+                with self.subTest(name):
+                    codec = get_json_codec(name)
+                    self.assertEqual(expected, codec.loads(response.content))
+
+    @unittest.skipUnless(
+        os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1 to run benchmarks"
+    )
+    def test_benchmark_decode(self):
+        """Benchmark decoding VAN and MailChimp pages against response.json()"""
+        codec = get_json_codec()
+        for page in [VAN_PAGE, MAILCHIMP_PAGE]:
+            response = requests.Response()
+            response._content = json.dumps(page).encode()
+            response.encoding = "utf-8"
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                with Benchmark("response.json()") as stdlib:
+                    for _ in range(20):
+                        expected = response.json()
+                with Benchmark(f"{codec.name} codec") as fast:
+                    for _ in range(20):
+                        result = codec.loads(response.content)
+
+            self.assertEqual(expected, result)
+            if codec.name != "json":
+                self.assertLess(fast.time, stdlib.time)
+
+
+class TestJSONSession(unittest.TestCase):
+    def test_prepare_request_encodes_json(self):
+        """Test json bodies are encoded with the session's codec"""
+        codec = MagicMock(wraps=JSONCodec())
+        session = JSONSession(codec)
+        prepared = session.prepare_request(
+            requests.Request("POST", "https://foo.org", json={"foo": "bar"})
+        )
+
+        codec.dumps.assert_called_once_with({"foo": "bar"})
+        self.assertEqual({"foo": "bar"}, json.loads(prepared.body))
+        self.assertEqual("application/json", prepared.headers["Content-Type"])
+
+    def test_prepare_request_keeps_content_type(self):
+        """Test a content type set on the session or request isn't replaced"""
+        session = JSONSession()
+        session.headers["Content-Type"] = "application/vnd.api+json"
+        prepared = session.prepare_request(
+            requests.Request("POST", "https://foo.org", json=[1])
+        )
+        self.assertEqual("application/vnd.api+json", prepared.headers["Content-Type"])
+
+        prepared = session.prepare_request(requests.Request("GET", "https://foo.org"))
+        self.assertIsNone(prepared.body)
+
+    def test_client_decode_json(self):
+        """Test the client decodes bodies with its codec, and mocks with json()"""
+        test_client = HTTPClient()
+        self.assertEqual(AVAILABLE[0], test_client.json_codec.name)
+        self.assertIsInstance(test_client.session, JSONSession)
+        self.assertIs(test_client.json_codec, test_client.session.json_codec)
+
+        response = requests.Response()
+        response._content = b'{"foo": [1, 2]}'
+        self.assertEqual({"foo": [1, 2]}, test_client.decode_json(response))
+
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"spam": "eggs"}
+        self.assertEqual({"spam": "eggs"}, test_client.decode_json(mock_response))
+
+
+if __name__ == "__main__":
+    unittest.main()
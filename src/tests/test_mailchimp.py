@@ -1,10 +1,97 @@
+import gzip
+import io
 import os
 import json
+import tarfile
+import tempfile
+import threading
+import time
 import unittest
 import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, MagicMock, PropertyMock
-from src.stac_utils.mailchimp import MailChimpClient, logger
-from datetime import datetime, date
+from src.stac_utils.benchmark import Benchmark
+from src.stac_utils.circuit_breaker import CircuitBreaker, CircuitOpenException
+from src.stac_utils.fingerprint import SQLiteFingerprintStore
+from src.stac_utils.mailchimp import MailChimpClient, SubscriberHashIndex, logger
+from datetime import datetime, date, timedelta
+from json import dumps
+
+
+class BatchServerHandler(BaseHTTPRequestHandler):
+    """Stand-in for the MailChimp /batches endpoints and the results archive"""
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, data: dict, status: int = 200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        operations = json.loads(self.rfile.read(length))["operations"]
+        batches = self.server.batches
+        batch_id = f"batch-{len(batches)}"
+        batches[batch_id] = {"operations": operations, "polls": 0}
+        self.send_json({"id": batch_id, "status": "pending"})
+
+    def do_GET(self):
+        host = f"http://127.0.0.1:{self.server.server_port}"
+        if self.path.startswith("/results/"):
+            batch_id = self.path.split("/")[-1].split(".")[0]
+            return self.send_archive(self.server.batches[batch_id]["operations"])
+
+        batch_id = self.path.split("/")[-1]
+        batch = self.server.batches[batch_id]
+        batch["polls"] += 1
+        if batch["polls"] < 2:
+            return self.send_json({"id": batch_id, "status": "started"})
+        self.send_json(
+            {
+                "id": batch_id,
+                "status": "finished",
+                "total_operations": len(batch["operations"]),
+                "response_body_url": f"{host}/results/{batch_id}.tar.gz",
+            }
+        )
+
+    def send_archive(self, operations: list[dict]):
+        results = []
+        for operation in operations:
+            body = json.loads(operation["body"])
+            if body.get("email_address", "").startswith("bad"):
+                status, response = 400, {"title": "Invalid Resource"}
+            else:
+                status, response = 200, {"id": operation["operation_id"], **body}
+            results.append(
+                {
+                    "status_code": status,
+                    "operation_id": operation["operation_id"],
+                    "response": json.dumps(response),
+                }
+            )
+
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+            directory = tarfile.TarInfo("results")
+            directory.type = tarfile.DIRTYPE
+            archive.addfile(directory)
+            data = json.dumps(results).encode()
+            info = tarfile.TarInfo("results/0.json")
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+        body = buffer.getvalue()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
 
 
 class TestMailChimpClient(unittest.TestCase):
@@ -94,6 +181,24 @@ class TestMailChimpClient(unittest.TestCase):
         # retry not called
         mock_sleep.assert_not_called()
 
+    @patch.object(MailChimpClient, "session", new_callable=PropertyMock)
+    def test_request_with_retry_compressed_body(self, mock_session_property):
+        """Bulk bodies are gzipped when the client has a request encoding"""
+        mock_session = MagicMock()
+        mock_session.headers = {"Content-Type": "application/json"}
+        mock_session.request.return_value = MagicMock(status_code=200)
+        mock_session_property.return_value = mock_session
+        self.test_client.request_encoding = "gzip"
+        operations = {"operations": [{"method": "POST", "path": "lists/1"}] * 100}
+
+        self.test_client.request_with_retry(
+            method="POST", endpoint_url="www.fake_endpoint.com/batches", json=operations
+        )
+        kwargs = mock_session.request.call_args.kwargs
+        self.assertNotIn("json", kwargs)
+        self.assertEqual("gzip", kwargs["headers"]["Content-Encoding"])
+        self.assertEqual(operations, json.loads(gzip.decompress(kwargs["data"])))
+
     @patch("src.stac_utils.mailchimp.time.sleep")
     # note the session is a property in the parent Client class, so can't use MagicMock
     @patch.object(MailChimpClient, "session", new_callable=PropertyMock)
@@ -114,10 +219,8 @@ class TestMailChimpClient(unittest.TestCase):
         # MailChimpClient.session property returns mock session
         mock_session_property.return_value = mock_session
 
-        # patching random.randint to return a set delay
-        with patch(
-            "src.stac_utils.mailchimp.random.randint", return_value=3
-        ) as mock_rand:
+        # patching random.uniform to return a set delay
+        with patch("src.stac_utils.retry.random.uniform", return_value=3) as mock_rand:
             response = self.test_client.request_with_retry(
                 method="GET", endpoint_url="www.fake_endpoint.com/mail"
             )
@@ -148,7 +251,7 @@ class TestMailChimpClient(unittest.TestCase):
         mock_session.request.side_effect = mock_responses
         mock_session_property.return_value = mock_session
 
-        with patch("src.stac_utils.mailchimp.random.randint", return_value=3):
+        with patch("src.stac_utils.retry.random.uniform", return_value=3):
             response = self.test_client.request_with_retry(
                 "GET", "www.fake_endpoint.com/mail"
             )
@@ -156,8 +259,66 @@ class TestMailChimpClient(unittest.TestCase):
         self.assertIs(response, mock_responses[-1])
         # times the mock object has been called should == the max_retries set
         self.assertEqual(mock_session.request.call_count, self.test_client.max_retries)
-        # check to make sure number of delays == max_retries
-        self.assertEqual(mock_sleep.call_count, self.test_client.max_retries)
+        # check to make sure there's a delay between each attempt, but not after the last
+        self.assertEqual(mock_sleep.call_count, self.test_client.max_retries - 1)
+
+    @patch("src.stac_utils.mailchimp.time.sleep")
+    @patch.object(MailChimpClient, "session", new_callable=PropertyMock)
+    def test_request_with_retry_circuit_open(self, mock_session_property, mock_sleep):
+        """Test an open circuit cuts the retries short and fails the next call fast"""
+        mock_session = MagicMock()
+        mock_session.request.return_value = MagicMock(status_code=503)
+        mock_session_property.return_value = mock_session
+        self.test_client.circuit_breaker = CircuitBreaker(min_calls=1)
+
+        url = "https://us9.api.mailchimp.com/3.0/lists"
+        self.assertRaises(
+            CircuitOpenException, self.test_client.request_with_retry, "GET", url
+        )
+        self.assertRaises(
+            CircuitOpenException, self.test_client.request_with_retry, "GET", url
+        )
+        self.assertEqual(1, mock_session.request.call_count)
+        mock_sleep.assert_not_called()
+
+    @patch("src.stac_utils.mailchimp.time.sleep")
+    @patch.object(MailChimpClient, "session", new_callable=PropertyMock)
+    def test_request_with_retry_metrics_and_hooks(
+        self, mock_session_property, mock_sleep
+    ):
+        """Test MailChimp requests, retries included, reach the metrics and hooks"""
+        pages = [
+            {"members": [{"id": "1"}, {"id": "2"}], "total_items": 3},
+            {"members": [{"id": "3"}], "total_items": 3},
+        ]
+        responses = [MagicMock(status_code=429, content=b"")]
+        for page in pages:
+            response = MagicMock(status_code=200, content=json.dumps(page).encode())
+            response.json.return_value = page
+            responses.append(response)
+        mock_session = MagicMock()
+        mock_session.request.side_effect = responses
+        mock_session_property.return_value = mock_session
+
+        pre_hook = MagicMock()
+        post_hook = MagicMock()
+        self.test_client.add_hook("pre_request", pre_hook)
+        self.test_client.add_hook("post_request", post_hook)
+
+        members = self.test_client.paginate_endpoint(
+            "lists/898/members", "members", count=2, prefetch=0
+        )
+        self.assertEqual([{"id": "1"}, {"id": "2"}, {"id": "3"}], members)
+
+        summary = self.test_client.metrics.summary()
+        self.assertEqual(["GET lists/{id}/members"], list(summary))
+        self.assertEqual(3, summary["GET lists/{id}/members"]["requests"])
+        self.assertEqual(1, summary["GET lists/{id}/members"]["errors"])
+        self.assertEqual(1, summary["GET lists/{id}/members"]["retries"])
+        self.assertEqual(3, pre_hook.call_count)
+        self.assertEqual(3, post_hook.call_count)
+        self.assertEqual("lists/898/members", pre_hook.call_args.kwargs["endpoint"])
+        self.assertIs(responses[-1], post_hook.call_args.kwargs["response"])
 
     @patch("src.stac_utils.mailchimp.time.sleep")
     @patch.object(MailChimpClient, "session", new_callable=PropertyMock)
@@ -176,7 +337,7 @@ class TestMailChimpClient(unittest.TestCase):
         ]
         mock_session_property.return_value = mock_session
 
-        with patch("src.stac_utils.mailchimp.random.randint", return_value=3):
+        with patch("src.stac_utils.retry.random.uniform", return_value=3):
             response = self.test_client.request_with_retry(
                 method="GET", endpoint_url="www.fake_endpoint.com/mail"
             )
@@ -185,8 +346,8 @@ class TestMailChimpClient(unittest.TestCase):
         self.assertIs(response, mock_response_200)
         # function retries once after catching RequestException, and another ends in success
         self.assertEqual(mock_session.request.call_count, 2)
-        # delay not called (only called if 429)
-        mock_sleep.assert_not_called()
+        # connection errors back off like 429s
+        mock_sleep.assert_called_once_with(3)
 
     @patch("src.stac_utils.mailchimp.time.sleep")
     @patch.object(MailChimpClient, "session", new_callable=PropertyMock)
@@ -203,7 +364,7 @@ class TestMailChimpClient(unittest.TestCase):
         ]
         mock_session_property.return_value = mock_session
 
-        with patch("src.stac_utils.mailchimp.random.randint", return_value=3):
+        with patch("src.stac_utils.retry.random.uniform", return_value=3):
             # the final call will raise RequestException...
             with self.assertRaises(requests.exceptions.RequestException):
                 self.test_client.request_with_retry(
@@ -212,9 +373,35 @@ class TestMailChimpClient(unittest.TestCase):
 
         # check to make sure number of retry attempts == max_retries
         self.assertEqual(mock_session.request.call_count, self.test_client.max_retries)
-        # delay not called (only called if 429)
+        # delay between each attempt, but not after the last
+        self.assertEqual(mock_sleep.call_count, self.test_client.max_retries - 1)
+
+    @patch("src.stac_utils.mailchimp.time.sleep")
+    @patch.object(MailChimpClient, "session", new_callable=PropertyMock)
+    def test_request_with_retry_client_error_not_retried(
+        self, mock_session_property, mock_sleep
+    ):
+        """Client errors other than 429 are returned without retrying"""
+        mock_response_400 = MagicMock(status_code=400)
+        mock_session = MagicMock()
+        mock_session.request.return_value = mock_response_400
+        mock_session_property.return_value = mock_session
+
+        response = self.test_client.request_with_retry(
+            method="PUT", endpoint_url="www.fake_endpoint.com/mail"
+        )
+
+        self.assertIs(response, mock_response_400)
+        mock_session.request.assert_called_once()
         mock_sleep.assert_not_called()
 
+    def test_create_retry_policy(self):
+        """MailChimp backs off exponentially with jitter over max_retries attempts"""
+        policy = self.test_client.create_retry_policy()
+        self.assertEqual("exponential", policy.backoff)
+        self.assertTrue(policy.jitter)
+        self.assertEqual(self.test_client.max_retries - 1, policy.max_retries)
+
     @patch.object(MailChimpClient, "transform_response")
     @patch.object(logger, "debug")
     @patch.object(MailChimpClient, "request_with_retry")
@@ -246,6 +433,103 @@ class TestMailChimpClient(unittest.TestCase):
         # debug not called
         mock_debug.assert_not_called()
 
+    @patch.object(MailChimpClient, "transform_response")
+    @patch.object(MailChimpClient, "request_with_retry")
+    def test_iter_changed_members(self, mock_request_with_retry, mock_transform):
+        """Test the export sends the stored mark and projection, and moves the mark on"""
+        mock_transform.side_effect = [
+            {
+                "members": [
+                    {"id": "1", "last_changed": "2024-05-02T10:00:00+00:00"},
+                    {"id": "2", "last_changed": "2024-05-03T09:00:00+00:00"},
+                ],
+                "total_items": 3,
+            },
+            {
+                "members": [{"id": "3", "last_changed": "2024-05-01T00:00:00+00:00"}],
+                "total_items": 3,
+            },
+        ]
+        store = SQLiteFingerprintStore(":memory:")
+        store.set(
+            "changed_members:list1:since_last_changed", "2024-05-01T00:00:00+00:00"
+        )
+        self.test_client.sync_state_store = store
+
+        members = list(
+            self.test_client.iter_changed_members(
+                "list1",
+                fields=["email_address", "merge_fields.FNAME", "total_items"],
+                count=2,
+                status="subscribed",
+            )
+        )
+
+        self.assertEqual(["1", "2", "3"], [member["id"] for member in members])
+        self.assertEqual(
+            {
+                "count": 2,
+                "offset": 0,
+                "since_last_changed": "2024-05-01T00:00:00+00:00",
+                "fields": "members.email_address,members.merge_fields.FNAME,"
+                "total_items,members.last_changed",
+                "status": "subscribed",
+            },
+            mock_request_with_retry.call_args_list[0].kwargs["params"],
+        )
+        self.assertEqual(
+            "2024-05-03T09:00:00+00:00",
+            store.get("changed_members:list1:since_last_changed"),
+        )
+
+    @patch.object(MailChimpClient, "transform_response")
+    @patch.object(MailChimpClient, "request_with_retry")
+    def test_iter_changed_members_reset(self, mock_request_with_retry, mock_transform):
+        """Test the mark ignores the fingerprint store and a reset exports everyone"""
+        mock_transform.return_value = {"members": [], "total_items": 0}
+        self.test_client.fingerprint_store = SQLiteFingerprintStore(":memory:")
+        self.test_client.sync_state_store = store = SQLiteFingerprintStore(":memory:")
+        store.set(
+            "changed_members:list1:since_last_changed", "2024-05-01T00:00:00+00:00"
+        )
+
+        list(self.test_client.iter_changed_members("list1"))
+        params = mock_request_with_retry.call_args.kwargs["params"]
+        self.assertEqual("2024-05-01T00:00:00+00:00", params["since_last_changed"])
+        self.assertIsNone(
+            self.test_client.fingerprint_store.get(
+                "changed_members:list1:since_last_changed"
+            )
+        )
+
+        self.test_client.reset_changed_members("list1")
+        list(self.test_client.iter_changed_members("list1"))
+        params = mock_request_with_retry.call_args.kwargs["params"]
+        self.assertNotIn("since_last_changed", params)
+
+    @patch.object(MailChimpClient, "transform_response")
+    @patch.object(MailChimpClient, "request_with_retry")
+    def test_iter_changed_members_stopped_early(
+        self, mock_request_with_retry, mock_transform
+    ):
+        """Test a partial export leaves the mark alone, and exclusions keep last_changed"""
+        mock_transform.return_value = {
+            "members": [{"id": "1", "last_changed": "2024-05-02T10:00:00+00:00"}],
+            "total_items": 5,
+        }
+        store = SQLiteFingerprintStore(":memory:")
+
+        members = self.test_client.iter_changed_members(
+            "list1", exclude_fields=["_links", "last_changed", "tags"], store=store
+        )
+        next(members)
+        members.close()
+
+        params = mock_request_with_retry.call_args.kwargs["params"]
+        self.assertEqual("_links,members.tags", params["exclude_fields"])
+        self.assertNotIn("since_last_changed", params)
+        self.assertIsNone(store.get("changed_members:list1:since_last_changed"))
+
     @patch.object(MailChimpClient, "transform_response")
     @patch.object(logger, "debug")
     @patch.object(MailChimpClient, "request_with_retry")
@@ -307,6 +591,104 @@ class TestMailChimpClient(unittest.TestCase):
         # debug not called
         mock_debug.assert_not_called()
 
+    @patch.object(MailChimpClient, "transform_response")
+    @patch.object(MailChimpClient, "request_with_retry")
+    def test_iter_endpoint(self, mock_request_with_retry, mock_transform):
+        """Test iter_endpoint yields members page by page as they arrive"""
+        mock_transform.side_effect = [
+            {"members": [{"id": "1"}, {"id": "2"}], "total_items": 3},
+            {"members": [{"id": "3"}], "total_items": 3},
+        ]
+
+        pages = self.test_client.iter_endpoint(
+            base_endpoint="lists/010/members",
+            data_key="members",
+            count=2,
+            by_page=True,
+            prefetch=0,
+        )
+
+        self.assertEqual([{"id": "1"}, {"id": "2"}], next(pages))
+        mock_request_with_retry.assert_called_once_with(
+            method="GET",
+            endpoint_url=f"{self.test_client.base_url}/lists/010/members",
+            params={"count": 2, "offset": 0},
+        )
+        self.assertEqual([[{"id": "3"}]], list(pages))
+        self.assertEqual(2, mock_request_with_retry.call_count)
+
+    @patch.object(MailChimpClient, "request_with_retry")
+    def test_paginate_endpoint_parallel(self, mock_request_with_retry):
+        """Test parallel mode fetches every offset at once, capped at 10 connections, in order"""
+        lock = threading.Lock()
+        in_flight = 0
+        most_in_flight = 0
+
+        def request(method: str, endpoint_url: str, params: dict):
+            nonlocal in_flight, most_in_flight
+            with lock:
+                in_flight += 1
+                most_in_flight = max(most_in_flight, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+            offset = params["offset"]
+            response = MagicMock()
+            response.status_code = 200
+            response.json.return_value = {
+                "members": [{"id": i} for i in range(offset, min(offset + 2, 45))],
+                "total_items": 45,
+            }
+            response.content = json.dumps(response.json.return_value).encode()
+            return response
+
+        mock_request_with_retry.side_effect = request
+
+        results = self.test_client.paginate_endpoint(
+            "lists/898/members", "members", count=2, parallel=True
+        )
+
+        self.assertEqual([{"id": i} for i in range(45)], results)
+        self.assertEqual(23, mock_request_with_retry.call_count)
+        self.assertLessEqual(most_in_flight, 10)
+        self.assertGreater(most_in_flight, 1)
+
+    @patch.object(MailChimpClient, "request_with_retry")
+    def test_iter_endpoint_parallel_unordered(self, mock_request_with_retry):
+        """Test unordered parallel pages stream as they complete and respect max_pages"""
+
+        def request(method: str, endpoint_url: str, params: dict):
+            offset = params["offset"]
+            # later pages finish first
+            time.sleep(0.05 if offset == 1 else 0)
+            response = MagicMock()
+            response.status_code = 200
+            response.json.return_value = {
+                "members": [{"id": offset}],
+                "total_items": 10,
+            }
+            response.content = json.dumps(response.json.return_value).encode()
+            return response
+
+        mock_request_with_retry.side_effect = request
+
+        pages = list(
+            self.test_client.iter_endpoint(
+                "lists/898/members",
+                "members",
+                count=1,
+                max_pages=4,
+                by_page=True,
+                parallel=True,
+                ordered=False,
+            )
+        )
+
+        self.assertEqual([{"id": 0}], pages[0])
+        self.assertEqual([[{"id": 1}]], pages[-1:])
+        self.assertCountEqual([[{"id": i}] for i in range(4)], pages)
+        self.assertEqual(4, mock_request_with_retry.call_count)
+
     def test_get_subscriber_hash(self):
         """Test that get_subscriber_hash returns correct md5 hash and normalizes to lowercase"""
         email = "wEiRd@staclabs.coM"
@@ -476,6 +858,218 @@ class TestMailChimpClient(unittest.TestCase):
         # compare final email val to expected
         self.assertEqual(result["email_address"], "fake@none.com")
 
+    @staticmethod
+    def fake_tag_requests(method: str, endpoint_url: str, json: dict) -> MagicMock:
+        """Answer segment and member tag calls, failing for emails starting with bad"""
+        response = MagicMock()
+        response.status_code = 200
+        data = None
+        if endpoint_url.endswith("/segments"):
+            data = {"id": 99}
+        elif endpoint_url.endswith("/tags"):
+            if "bad" in endpoint_url:
+                response.status_code = 400
+                data = {"title": "Invalid Resource"}
+            else:
+                response.status_code = 204
+        else:
+            emails = json.get("members_to_add") or json.get("members_to_remove")
+            bad = [email for email in emails if email.startswith("bad")]
+            data = {
+                "errors": [{"email_addresses": bad, "error": "Not a member"}]
+                if bad
+                else []
+            }
+        response.json.return_value = data
+        response.content = b"" if data is None else dumps(data).encode()
+        return response
+
+    @patch.object(MailChimpClient, "get_tag_segments", return_value={"Donor": 11})
+    @patch.object(MailChimpClient, "request_with_retry")
+    def test_update_tags_auto(self, mock_request_with_retry, mock_segments):
+        """Test existing tags go through segments in chunks and small new tags per member"""
+        mock_request_with_retry.side_effect = self.fake_tag_requests
+        donors = [f"donor{i}@staclabs.com" for i in range(600)]
+        donors += ["DONOR0@staclabs.com ", "bad@staclabs.com", None, ""]
+
+        results = self.test_client.update_tags(
+            "list1",
+            {
+                "Donor": donors,
+                "New": ["a@staclabs.com", " A@staclabs.com"],
+                " ": ["b@staclabs.com"],
+            },
+        )
+
+        self.assertEqual(
+            {
+                "Donor": {
+                    "method": "segments",
+                    "members": 601,
+                    "errors": [
+                        {"email_address": "bad@staclabs.com", "error": "Not a member"}
+                    ],
+                },
+                "New": {"method": "members", "members": 1, "errors": []},
+            },
+            results,
+        )
+        calls = mock_request_with_retry.call_args_list
+        urls = [c.kwargs["endpoint_url"] for c in calls]
+        segment_calls = [
+            c.kwargs["json"]["members_to_add"]
+            for c in mock_request_with_retry.call_args_list
+            if c.kwargs["endpoint_url"].endswith("/segments/11")
+        ]
+        self.assertEqual([101, 500], sorted(len(emails) for emails in segment_calls))
+        self.assertEqual(3, len(urls))
+        a_hash = self.test_client.get_subscriber_hash("a@staclabs.com")
+        self.assertIn(
+            f"https://us9.api.mailchimp.com/3.0/lists/list1/members/{a_hash}/tags", urls
+        )
+
+    @patch.object(MailChimpClient, "get_tag_segments", return_value={})
+    @patch.object(MailChimpClient, "request_with_retry")
+    def test_update_tags_dataframe_creates_segment(
+        self, mock_request_with_retry, mock_segments
+    ):
+        """Test a DataFrame is grouped by tag and missing segments are created"""
+        import pandas as pd
+
+        mock_request_with_retry.side_effect = self.fake_tag_requests
+        frame = pd.DataFrame(
+            {
+                "email": ["a@staclabs.com", "b@staclabs.com", "a@staclabs.com"],
+                "tag": ["Volunteer", "Volunteer", "Donor"],
+            }
+        )
+
+        results = self.test_client.update_tags(
+            "list1", frame, method="segments", email_column="email"
+        )
+
+        self.assertEqual({"Donor", "Volunteer"}, set(results))
+        self.assertEqual(2, results["Volunteer"]["members"])
+        created = [
+            c.kwargs["json"]["name"]
+            for c in mock_request_with_retry.call_args_list
+            if c.kwargs["endpoint_url"].endswith("/segments")
+        ]
+        self.assertEqual(["Donor", "Volunteer"], sorted(created))
+        added = [
+            c.kwargs["json"]["members_to_add"]
+            for c in mock_request_with_retry.call_args_list
+            if c.kwargs["endpoint_url"].endswith("/segments/99")
+        ]
+        self.assertEqual(
+            [["a@staclabs.com"], ["a@staclabs.com", "b@staclabs.com"]], sorted(added)
+        )
+
+    @patch.object(MailChimpClient, "get_tag_segments", return_value={"Donor": 11})
+    @patch.object(MailChimpClient, "request_with_retry")
+    def test_update_tags_remove_skips_missing_tags(
+        self, mock_request_with_retry, mock_segments
+    ):
+        """Test removing a tag the audience doesn't have makes no segment or calls"""
+        mock_request_with_retry.side_effect = self.fake_tag_requests
+        new = [f"new{i}@staclabs.com" for i in range(50)]
+
+        results = self.test_client.update_tags(
+            "list1", {"Donor": ["a@staclabs.com"], "New": new}, active=False
+        )
+
+        self.assertEqual(
+            {
+                "Donor": {"method": "segments", "members": 1, "errors": []},
+                "New": {"method": "skipped", "members": 0, "errors": []},
+            },
+            results,
+        )
+        self.assertEqual(
+            ["https://us9.api.mailchimp.com/3.0/lists/list1/segments/11"],
+            [c.kwargs["endpoint_url"] for c in mock_request_with_retry.call_args_list],
+        )
+        self.assertEqual(
+            ["a@staclabs.com"],
+            mock_request_with_retry.call_args.kwargs["json"]["members_to_remove"],
+        )
+
+    @patch.object(MailChimpClient, "bulk_update_member_tags")
+    def test_update_tags_batch_groups_members(self, mock_bulk):
+        """Test batch mode sends one operation per member with all of their tags"""
+        bad_hash = self.test_client.get_subscriber_hash("bad@staclabs.com")
+        mock_bulk.return_value = {
+            bad_hash: {"status_code": 400, "response": {"title": "Invalid Resource"}}
+        }
+
+        results = self.test_client.update_tags(
+            "list1",
+            {"A": ["x@staclabs.com", "bad@staclabs.com"], "B": ["x@staclabs.com"]},
+            method="batch",
+            poll_interval=0,
+        )
+
+        members = list(mock_bulk.call_args.args[1])
+        self.assertEqual(
+            [
+                {"email_address": "x@staclabs.com", "tags": ["A", "B"], "active": True},
+                {"email_address": "bad@staclabs.com", "tags": ["A"], "active": True},
+            ],
+            members,
+        )
+        self.assertEqual({"poll_interval": 0}, mock_bulk.call_args.kwargs)
+        self.assertEqual(
+            [{"email_address": "bad@staclabs.com", "error": "Invalid Resource"}],
+            results["A"]["errors"],
+        )
+        self.assertEqual([], results["B"]["errors"])
+
+    def test_update_tags_bad_method(self):
+        """Test an unknown method is refused"""
+        self.assertRaises(
+            ValueError, self.test_client.update_tags, "list1", {}, method="fast"
+        )
+
+    @patch.object(MailChimpClient, "request_with_retry")
+    def test_upsert_member_skips_unchanged(self, mock_request_with_retry):
+        """Test an upsert identical to the last successful one isn't sent"""
+        fake_response = MagicMock()
+        fake_response.status_code = 200
+        fake_response.content = b"{}"
+        fake_response.json.return_value = {}
+        mock_request_with_retry.return_value = fake_response
+        self.test_client.fingerprint_store = SQLiteFingerprintStore(":memory:")
+
+        self.test_client.upsert_member("list1", "fake@none.com")
+        result = self.test_client.upsert_member("list1", "fake@none.com")
+        self.assertEqual(304, result["status_code"])
+        self.assertEqual(1, mock_request_with_retry.call_count)
+
+        # a different list or payload is sent
+        self.test_client.upsert_member("list2", "fake@none.com")
+        self.test_client.upsert_member("list1", "fake@none.com", language="fr")
+        self.assertEqual(3, mock_request_with_retry.call_count)
+        self.assertEqual(
+            {"skipped": 1, "sent": 3}, self.test_client.fingerprint_store.stats
+        )
+
+    @patch.object(MailChimpClient, "request_with_retry")
+    def test_upsert_member_error_not_recorded(self, mock_request_with_retry):
+        """Test a rejected upsert is sent again next time"""
+        fake_response = MagicMock()
+        fake_response.status_code = 400
+        fake_response.content = b"{}"
+        fake_response.json.return_value = {"title": "Invalid Resource"}
+        mock_request_with_retry.return_value = fake_response
+        self.test_client.fingerprint_store = SQLiteFingerprintStore(":memory:")
+
+        self.test_client.upsert_member("list1", "fake@none.com")
+        self.test_client.upsert_member("list1", "fake@none.com")
+        self.assertEqual(2, mock_request_with_retry.call_count)
+        self.assertEqual(
+            {"skipped": 0, "sent": 0}, self.test_client.fingerprint_store.stats
+        )
+
     @patch.object(MailChimpClient, "transform_response")
     @patch.object(MailChimpClient, "request_with_retry")
     def test_upsert_member_fail(self, mock_request_with_retry, mock_transform):
@@ -618,6 +1212,73 @@ class TestMailChimpClient(unittest.TestCase):
             mock_addr.assert_called_once()
             mock_num.assert_called_once()
 
+    @patch.object(MailChimpClient, "get_merge_fields_data_type_map")
+    def test_merge_fields_cached(self, mock_get_types):
+        """Test the merge field types are fetched once per list until the TTL passes"""
+        mock_get_types.return_value = {"FNAME": "text", "ZIP": "zip"}
+
+        with patch("time.time", return_value=1000):
+            self.test_client.format_merge_fields_for_list("list1", {"FNAME": "A"})
+            self.test_client.format_merge_fields_for_list("list1", {"ZIP": "12345"})
+            self.test_client.format_merge_fields_for_list("list2", {"FNAME": "B"})
+        self.assertEqual(2, mock_get_types.call_count)
+
+        with patch("time.time", return_value=1000 + self.test_client.merge_fields_ttl):
+            self.test_client.format_merge_fields_for_list("list1", {"FNAME": "A"})
+        self.assertEqual(3, mock_get_types.call_count)
+
+    @patch.object(MailChimpClient, "get_merge_fields_data_type_map")
+    def test_invalidate_merge_fields(self, mock_get_types):
+        """Test invalidated lists are refetched"""
+        mock_get_types.return_value = {"FNAME": "text"}
+
+        self.test_client.get_merge_fields("list1")
+        self.test_client.get_merge_fields("list2")
+        self.test_client.invalidate_merge_fields("list1")
+        self.test_client.get_merge_fields("list1")
+        self.test_client.get_merge_fields("list2")
+        self.assertEqual(3, mock_get_types.call_count)
+
+        self.test_client.invalidate_merge_fields()
+        self.test_client.get_merge_fields("list2")
+        self.assertEqual(4, mock_get_types.call_count)
+
+    @patch.object(MailChimpClient, "get_merge_fields_data_type_map")
+    def test_merge_field_formatters(self, mock_get_types):
+        """Test the dispatch table maps each tag to its type's formatter"""
+        mock_get_types.return_value = {
+            "FNAME": "text",
+            "BDAY": "birthday",
+            "ZIP": "zip",
+            "PHONE": "phone",
+        }
+
+        formatters = self.test_client.get_merge_field_formatters("list1")
+
+        self.assertEqual(self.test_client.format_text, formatters["FNAME"])
+        self.assertEqual(self.test_client.format_birthday, formatters["BDAY"])
+        self.assertEqual(self.test_client.format_zip, formatters["ZIP"])
+        self.assertEqual(self.test_client.format_text, formatters["PHONE"])
+
+    @patch.object(MailChimpClient, "get_merge_fields_data_type_map")
+    def test_merge_fields_cache_file(self, mock_get_types):
+        """Test merge field types are shared with later clients through the cache file"""
+        mock_get_types.return_value = {"FNAME": "text"}
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "merge_fields.json")
+            self.test_client.merge_fields_cache_path = path
+            self.test_client.get_merge_fields("list1")
+
+            other_client = MailChimpClient(api_key="fake-us9")
+            other_client.merge_fields_cache_path = path
+            self.assertEqual({"FNAME": "text"}, other_client.get_merge_fields("list1"))
+            mock_get_types.assert_called_once()
+
+            other_client.invalidate_merge_fields("list1")
+            with open(path) as file:
+                self.assertEqual({}, json.load(file))
+
     def test_format_date(self):
         """Test where input value is a date/datetime or string instance"""
         # using datetime
@@ -726,3 +1387,248 @@ class TestMailChimpClient(unittest.TestCase):
 
         # float string is valid
         self.assertEqual(self.test_client.format_number("9.99"), 9.99)
+
+    def test_format_date_column(self):
+        """Test dates are parsed with the column's format, with outliers falling back"""
+        self.assertEqual(
+            ["2020-01-13", "2020-01-02", None, None, "2020-01-05", "2025-01-01"],
+            self.test_client.format_date_column(
+                ["01-13-2020", "01-02-2020", None, "  ", "2020/01/05", date(2025, 1, 1)]
+            ),
+        )
+        self.assertRaises(
+            ValueError, self.test_client.format_date_column, ["2020-01-01", "soon"]
+        )
+        self.assertEqual(
+            ["2020-01-01", None],
+            self.test_client.format_date_column(
+                ["2020-01-01", "soon"], errors="coerce"
+            ),
+        )
+
+    def test_format_birthday_column_series(self):
+        """Test a Series comes back as a Series with its index, NaN staying blank"""
+        import pandas as pd
+
+        result = self.test_client.format_birthday_column(
+            pd.Series(["1/2", "03/04", float("nan"), "1990-12-25"], index=[5, 6, 7, 8])
+        )
+
+        self.assertIsInstance(result, pd.Series)
+        self.assertEqual([5, 6, 7, 8], list(result.index))
+        self.assertEqual(["01/02", "03/04", None, "12/25"], result.tolist())
+
+    def test_format_number_column(self):
+        """Test numeric Series pass straight through and strings are parsed"""
+        import pandas as pd
+
+        result = self.test_client.format_number_column(pd.Series([1, 2, 3]))
+        self.assertEqual([1, 2, 3], result.tolist())
+        self.assertEqual(
+            [5, 2.5, None, None],
+            self.test_client.format_number_column(
+                ["5", " 2.5", "x", None], errors="coerce"
+            ),
+        )
+        self.assertRaises(ValueError, self.test_client.format_number_column, [True])
+
+    @staticmethod
+    def _benchmark_columns() -> tuple[list[str], list[str]]:
+        """20k rows of distinct dates and numbers for the column formatters"""
+        start = date(1950, 1, 1)
+        dates = [(start + timedelta(days=i)).strftime("%m/%d/%Y") for i in range(20000)]
+        numbers = [str(i) for i in range(20000)]
+        return dates, numbers
+
+    def _format_scalar(self, dates: list[str], numbers: list[str]) -> tuple:
+        return (
+            [self.test_client.format_date(val) for val in dates],
+            [self.test_client.format_birthday(val) for val in dates],
+            [self.test_client.format_number(val) for val in numbers],
+        )
+
+    def _format_columns(self, dates: list[str], numbers: list[str]) -> tuple:
+        return (
+            self.test_client.format_date_column(dates),
+            self.test_client.format_birthday_column(dates),
+            self.test_client.format_number_column(numbers),
+        )
+
+    def test_format_columns_match_scalar(self):
+        """Test the column formatters give the same output as the scalar ones on 20k rows"""
+        dates, numbers = self._benchmark_columns()
+        self.assertEqual(
+            self._format_scalar(dates, numbers), self._format_columns(dates, numbers)
+        )
+
+    @unittest.skipUnless(
+        os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1 to run benchmarks"
+    )
+    def test_format_columns_benchmark(self):
+        """Benchmark the column formatters against the scalar ones on 20k rows"""
+        dates, numbers = self._benchmark_columns()
+        with Benchmark("scalar") as scalar:
+            self._format_scalar(dates, numbers)
+        with Benchmark("column") as column:
+            self._format_columns(dates, numbers)
+
+        self.assertLess(column.time, scalar.time)
+
+    def test_get_subscriber_hashes(self):
+        """Test bulk hashes match get_subscriber_hash and keep a Series' index"""
+        import pandas as pd
+
+        emails = ["Foo@Bar.com", "baz@bar.com", "foo@bar.com"]
+        expected = [self.test_client.get_subscriber_hash(email) for email in emails]
+        self.assertEqual(expected, self.test_client.get_subscriber_hashes(emails))
+        self.assertEqual(expected[0], expected[2])
+
+        result = self.test_client.get_subscriber_hashes(
+            pd.Series(emails, index=[3, 4, 5], name="email")
+        )
+        self.assertEqual([3, 4, 5], list(result.index))
+        self.assertEqual(expected, result.tolist())
+
+
+class TestSubscriberHashIndex(unittest.TestCase):
+    def test_from_records(self):
+        """Test records are found by the member id MailChimp returns for them"""
+        rows = [
+            {"email": "Foo@Bar.com", "van_id": 1},
+            {"email": None, "van_id": 2},
+            {"email": "baz@bar.com", "van_id": 3},
+        ]
+        index = SubscriberHashIndex.from_records(rows, email_key="email")
+        member_id = MailChimpClient.get_subscriber_hash("foo@bar.com")
+
+        self.assertEqual(2, len(index))
+        self.assertIn(member_id, index)
+        self.assertEqual(rows[0], index[member_id])
+        self.assertEqual("Foo@Bar.com", index.get_email(member_id))
+        self.assertIsNone(index.get("nope"))
+        self.assertRaises(KeyError, index.__getitem__, "nope")
+
+    def test_from_dataframe_and_add(self):
+        """Test a DataFrame is indexed by row label and emails can be added later"""
+        import pandas as pd
+
+        frame = pd.DataFrame(
+            {"email_address": ["a@bar.com", None, "b@bar.com"]}, index=[10, 11, 12]
+        )
+        index = SubscriberHashIndex.from_dataframe(frame)
+        b_hash = MailChimpClient.get_subscriber_hash("b@bar.com")
+        self.assertEqual(12, index[b_hash])
+
+        c_hash = index.add("c@bar.com")
+        self.assertEqual("c@bar.com", index[c_hash])
+        self.assertEqual(3, len(list(index)))
+        self.assertRaises(ValueError, SubscriberHashIndex, ["a@bar.com"], [1, 2])
+
+
+class TestMailChimpBatches(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), BatchServerHandler)
+        self.server.batches = {}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.test_client = MailChimpClient(api_key="fake-us9")
+        self.test_client.base_url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.test_client.session.close()
+
+    def test_bulk_upsert_members(self):
+        """Test members are upserted in batches and outcomes are keyed by subscriber hash"""
+        members = [
+            {"email_address": f"person{i}@staclabs.com", "status_if_new": "pending"}
+            for i in range(5)
+        ] + [{"email_address": "bad@staclabs.com"}]
+
+        outcomes = self.test_client.bulk_upsert_members(
+            "list1", members, batch_size=4, poll_interval=0
+        )
+
+        self.assertEqual(
+            [4, 2],
+            [len(batch["operations"]) for batch in self.server.batches.values()],
+        )
+        good_hash = MailChimpClient.get_subscriber_hash("person0@staclabs.com")
+        bad_hash = MailChimpClient.get_subscriber_hash("bad@staclabs.com")
+        self.assertEqual(6, len(outcomes))
+        self.assertEqual(200, outcomes[good_hash]["status_code"])
+        self.assertEqual("pending", outcomes[good_hash]["response"]["status_if_new"])
+        self.assertEqual(
+            {"status_code": 400, "response": {"title": "Invalid Resource"}},
+            outcomes[bad_hash],
+        )
+        operation = self.server.batches["batch-0"]["operations"][0]
+        self.assertEqual("PUT", operation["method"])
+        self.assertEqual(f"/lists/list1/members/{good_hash}", operation["path"])
+
+    def test_bulk_update_member_tags(self):
+        """Test tag changes are batched and members without tags are skipped"""
+        outcomes = self.test_client.bulk_update_member_tags(
+            "list1",
+            [
+                {
+                    "email_address": "a@staclabs.com",
+                    "tags": ["Foo ", ""],
+                    "active": True,
+                },
+                {"email_address": "b@staclabs.com", "tags": [], "active": False},
+            ],
+            poll_interval=0,
+        )
+
+        operations = self.server.batches["batch-0"]["operations"]
+        self.assertEqual(1, len(operations))
+        self.assertEqual("POST", operations[0]["method"])
+        self.assertEqual(
+            {"tags": [{"name": "Foo", "status": "active"}]},
+            json.loads(operations[0]["body"]),
+        )
+        a_hash = MailChimpClient.get_subscriber_hash("a@staclabs.com")
+        b_hash = MailChimpClient.get_subscriber_hash("b@staclabs.com")
+        self.assertEqual(200, outcomes[a_hash]["status_code"])
+        self.assertEqual(204, outcomes[b_hash]["status_code"])
+
+    def test_bulk_upsert_members_skips_unchanged(self):
+        """Test members upserted successfully before aren't sent again, failures are"""
+        self.test_client.fingerprint_store = SQLiteFingerprintStore(":memory:")
+        members = [
+            {"email_address": "good@staclabs.com"},
+            {"email_address": "bad@staclabs.com"},
+        ]
+        self.test_client.bulk_upsert_members("list1", members, poll_interval=0)
+        outcomes = self.test_client.bulk_upsert_members(
+            "list1", members, poll_interval=0
+        )
+
+        operations = self.server.batches["batch-1"]["operations"]
+        bad_hash = MailChimpClient.get_subscriber_hash("bad@staclabs.com")
+        good_hash = MailChimpClient.get_subscriber_hash("good@staclabs.com")
+        self.assertEqual([bad_hash], [op["operation_id"] for op in operations])
+        self.assertEqual(304, outcomes[good_hash]["status_code"])
+        self.assertEqual(400, outcomes[bad_hash]["status_code"])
+
+    @patch("time.sleep")
+    def test_wait_for_batch_backoff_and_timeout(self, mock_sleep):
+        """Test polls back off exponentially up to the cap, and give up at the timeout"""
+        pending = MagicMock()
+        pending.status_code = 200
+        pending.content = b"{}"
+        pending.json.return_value = {"status": "started"}
+        self.test_client.request_with_retry = MagicMock(return_value=pending)
+
+        with patch("time.monotonic", side_effect=[0, 0, 1, 3, 7]):
+            self.assertRaises(
+                TimeoutError,
+                self.test_client.wait_for_batch,
+                "batch-0",
+                poll_interval=1,
+                max_poll_interval=4,
+                timeout=10,
+            )
+        self.assertEqual([1, 2, 4], [args[0][0] for args in mock_sleep.call_args_list])
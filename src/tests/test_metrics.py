@@ -0,0 +1,136 @@
+import unittest
+from unittest.mock import MagicMock, call
+
+from src.stac_utils.metrics import (
+    LatencyHistogram,
+    MetricsCollector,
+    logger as metrics_logger,
+    normalize_endpoint,
+)
+
+
+class TestMetrics(unittest.TestCase):
+    def test_normalize_endpoint(self):
+        """Test ids, hashes, UUIDs and Jira keys are turned into placeholders"""
+        self.assertEqual("people/{id}", normalize_endpoint("/people/123?$expand=x"))
+        self.assertEqual(
+            "lists/{id}/members/{id}",
+            normalize_endpoint(
+                "lists/a1b2c3d4e5/members/0cc175b9c0f1b6a831c399e269772661"
+            ),
+        )
+        self.assertEqual(
+            "forms/{id}/submissions",
+            normalize_endpoint(
+                "forms/d91b4b2e-ae0e-4cd3-9ed7-d0ec501b0bc3/submissions"
+            ),
+        )
+        self.assertEqual("issue/{id}", normalize_endpoint("issue/STAC-42"))
+        self.assertEqual("events/types", normalize_endpoint("events/types"))
+        self.assertEqual("deadbeef", normalize_endpoint("deadbeef"))
+
+    def test_histogram_percentiles(self):
+        """Test nearest rank percentiles"""
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.percentile(50))
+
+        for seconds in range(1, 101):
+            histogram.add(seconds)
+
+        self.assertEqual(50, histogram.percentile(50))
+        self.assertEqual(95, histogram.percentile(95))
+        self.assertEqual(99, histogram.percentile(99))
+        self.assertEqual(100, histogram.count)
+
+    def test_histogram_bounded(self):
+        """Test the histogram keeps at most max_samples"""
+        histogram = LatencyHistogram(max_samples=10)
+        for seconds in range(100):
+            histogram.add(seconds)
+
+        self.assertEqual(10, len(histogram.samples))
+        self.assertEqual(100, histogram.count)
+
+    def test_collector_summary(self):
+        """Test requests are grouped by method and endpoint template"""
+        collector = MetricsCollector()
+        collector.record_request("get", "people/1", 200, 0.1, 10, 100)
+        collector.record_request("GET", "people/2", 500, 0.3, 10, 20)
+        collector.record_request("GET", "people/3", None, 0.2)
+        collector.record_request("GET", "people/4", 200, 0.2, 0, 1000, 0, 100)
+        collector.increment("retries", "GET", "people/2", 2)
+        collector.increment("rate_limited", "GET", "people/2")
+        collector.increment("auth_refreshes", "POST", "people")
+
+        summary = collector.summary()
+        self.assertEqual(
+            {
+                "requests": 4,
+                "errors": 2,
+                "retries": 2,
+                "rate_limited": 1,
+                "auth_refreshes": 0,
+                "bytes_out": 20,
+                "bytes_in": 1120,
+                "wire_bytes_out": 20,
+                "wire_bytes_in": 220,
+                "p50": 0.2,
+                "p95": 0.3,
+                "p99": 0.3,
+            },
+            summary["GET people/{id}"],
+        )
+        self.assertEqual(1, summary["POST people"]["auth_refreshes"])
+        self.assertIsNone(summary["POST people"]["p50"])
+
+        collector.reset()
+        self.assertEqual({}, collector.summary())
+
+    def test_log_summary(self):
+        """Test one line is logged per endpoint template"""
+        collector = MetricsCollector()
+        collector.record_request("GET", "people/1", 200, 0.25, 3, 5)
+
+        with self.assertLogs(metrics_logger, level="INFO") as logs:
+            collector.log_summary()
+
+        self.assertEqual(
+            [
+                "INFO:src.stac_utils.metrics:GET people/{id}: 1 requests, 0 errors, "
+                "0 retries, 0 429s, 0 auth refreshes, out=3B in=5B "
+                "p50=250ms p95=250ms p99=250ms"
+            ],
+            logs.output,
+        )
+
+    def test_log_summary_compressed(self):
+        """Test the bytes on the wire are logged when they differ"""
+        collector = MetricsCollector()
+        collector.record_request("POST", "batches", 200, 0.25, 3000, 5, 400, 5)
+
+        with self.assertLogs(metrics_logger, level="INFO") as logs:
+            collector.log_summary()
+
+        self.assertIn("out=3000B in=5B (wire out=400B in=5B) p50", logs.output[0])
+
+    def test_send_to_ticker(self):
+        """Test the summary is added to the ticker"""
+        collector = MetricsCollector()
+        collector.increment("retries", "GET", "people")
+        mock_ticker = MagicMock()
+
+        collector.send_to_ticker(mock_ticker, "FL", "VAN", "sync")
+
+        mock_ticker.add_data.assert_has_calls(
+            [
+                call("FL", "VAN", "sync", "GET people requests", 0),
+                call("FL", "VAN", "sync", "GET people retries", 1),
+            ],
+            any_order=True,
+        )
+        # no latency samples, so no percentiles
+        self.assertEqual(9, mock_ticker.add_data.call_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
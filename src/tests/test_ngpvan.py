@@ -5,6 +5,7 @@ from unittest.mock import MagicMock, patch, call
 
 import requests
 
+from src.stac_utils.fingerprint import SQLiteFingerprintStore
 from src.stac_utils.ngpvan import NGPVANClient, NGPVANException, NGPVANLocationException
 
 
@@ -48,12 +49,23 @@ class TestNGPVAN(unittest.TestCase):
             (test_app, f"{test_key}|{test_mode}"),
             test_client.session.auth,
         )
+        adapter = test_client.session.get_adapter("https://api.securevan.com/v4")
+        self.assertEqual(NGPVANClient.max_connections, adapter._pool_maxsize)
 
     def test_check_response_for_rate_limit(self):
         """Test that it returns 2"""
 
         self.assertEqual(2, self.test_client.check_response_for_rate_limit(None))
 
+    def test_check_response_for_rate_limit_header(self):
+        """Test that Retry-After wins over the default"""
+
+        mock_response = MagicMock()
+        mock_response.headers = {"Retry-After": "7"}
+        self.assertEqual(
+            7.0, self.test_client.check_response_for_rate_limit(mock_response)
+        )
+
     def test_transform_response(self):
         """Test transform response handles normal data"""
 
@@ -195,6 +207,35 @@ class TestNGPVAN(unittest.TestCase):
             [call("spam"), call("spam"), call("spam")]
         )
 
+    def test_iter_paginated_items(self):
+        """Test items are yielded lazily, one page at a time"""
+
+        self.test_client.get = MagicMock(
+            side_effect=[
+                {"items": [{"foo": 1}, {"foo": 2}], "next_page_link": "foo.bar/spam"},
+                {"items": [{"foo": 3}]},
+            ]
+        )
+        items = self.test_client.iter_paginated_items("spam", prefetch=0)
+
+        self.assertEqual({"foo": 1}, next(items))
+        self.test_client.get.assert_called_once_with("spam")
+        self.assertEqual([{"foo": 2}, {"foo": 3}], list(items))
+
+    def test_iter_paginated_items_by_page(self):
+        """Test by_page yields each page's items"""
+
+        self.test_client.get = MagicMock(
+            side_effect=[
+                {"items": [{"foo": 1}, {"foo": 2}], "next_page_link": "foo.bar/spam"},
+                {"items": [{"foo": 3}]},
+            ]
+        )
+        self.assertEqual(
+            [[{"foo": 1}, {"foo": 2}], [{"foo": 3}]],
+            list(self.test_client.iter_paginated_items("spam", by_page=True)),
+        )
+
     def test_get_paginated_items_one_page(self):
         """Test it pages through one page"""
 
@@ -962,6 +1003,38 @@ class TestNGPVAN(unittest.TestCase):
         self.test_client.post = MagicMock(side_effect=NGPVANException)
         self.assertEqual("", self.test_client.validate_phone("555-123-4567"))
 
+    def test_find_or_create_person_skips_unchanged(self):
+        """Test a person is only sent again when their payload changed"""
+        self.test_client.post = MagicMock(return_value={"van_id": 123})
+        self.test_client.fingerprint_store = SQLiteFingerprintStore(":memory:")
+        person = {"vanId": 123, "firstName": "John", "lastName": "Smith"}
+
+        self.assertEqual(
+            {"van_id": 123}, self.test_client.find_or_create_person(person)
+        )
+        self.assertIsNone(self.test_client.find_or_create_person(dict(person)))
+        person["lastName"] = "Smyth"
+        self.test_client.find_or_create_person(person)
+
+        self.assertEqual(2, self.test_client.post.call_count)
+        self.test_client.post.assert_called_with("people/findOrCreate", body=person)
+        self.assertEqual(
+            {"skipped": 1, "sent": 2}, self.test_client.fingerprint_store.stats
+        )
+
+    def test_find_or_create_person_error_not_recorded(self):
+        """Test a failed upsert is retried on the next run"""
+        self.test_client.post = MagicMock(side_effect=NGPVANException)
+        self.test_client.fingerprint_store = SQLiteFingerprintStore(":memory:")
+
+        self.assertRaises(
+            NGPVANException,
+            self.test_client.find_or_create_person,
+            {"firstName": "John"},
+            fingerprint_key="row-1",
+        )
+        self.assertIsNone(self.test_client.fingerprint_store.get("row-1"))
+
 
 if __name__ == "__main__":
     unittest.main()
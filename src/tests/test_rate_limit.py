@@ -0,0 +1,231 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.stac_utils.deadline import DeadlineExceededException, deadline
+from src.stac_utils.rate_limit import (
+    RateLimiter,
+    TokenBucket,
+    parse_rate_limit_headers,
+    parse_retry_after,
+)
+
+
+class TestParseHeaders(unittest.TestCase):
+    def test_parse_retry_after_seconds(self):
+        """Test Retry-After in seconds"""
+        self.assertEqual(3.0, parse_retry_after("3"))
+        self.assertEqual(1.5, parse_retry_after(" 1.5 "))
+        self.assertEqual(0.0, parse_retry_after("-4"))
+
+    @patch("src.stac_utils.rate_limit.time.time", return_value=1700000000.0)
+    def test_parse_retry_after_http_date(self, mock_time: MagicMock):
+        """Test Retry-After as an HTTP-date"""
+        # 1700000000 is Tue, 14 Nov 2023 22:13:20 GMT
+        self.assertEqual(5.0, parse_retry_after("Tue, 14 Nov 2023 22:13:25 GMT"))
+        self.assertEqual(0.0, parse_retry_after("Tue, 14 Nov 2023 22:13:00 GMT"))
+
+    def test_parse_retry_after_invalid(self):
+        """Test unparseable Retry-After values"""
+        for value in [None, "", "soon", MagicMock()]:
+            self.assertIsNone(parse_retry_after(value))
+
+    def test_parse_rate_limit_headers(self):
+        """Test the X-RateLimit family is parsed"""
+        test_headers = {
+            "X-RateLimit-Limit": "100",
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": "12",
+        }
+        self.assertEqual(
+            {"limit": 100.0, "remaining": 0.0, "reset": 12.0},
+            parse_rate_limit_headers(test_headers),
+        )
+
+    @patch("src.stac_utils.rate_limit.time.time", return_value=1700000000.0)
+    def test_parse_rate_limit_headers_epoch_reset(self, mock_time: MagicMock):
+        """Test epoch resets, in seconds or milliseconds, become seconds from now"""
+        self.assertEqual(
+            {"reset": 30.0},
+            parse_rate_limit_headers({"RateLimit-Reset": "1700000030"}),
+        )
+        self.assertEqual(
+            {"reset": 2.5},
+            parse_rate_limit_headers({"X-Rate-Limit-Reset": "1700000002500"}),
+        )
+
+    def test_parse_rate_limit_headers_retry_after(self):
+        """Test Retry-After is included and junk is ignored"""
+        self.assertEqual(
+            {"retry_after": 4.0},
+            parse_rate_limit_headers({"Retry-After": "4", "RateLimit-Limit": "x"}),
+        )
+        self.assertEqual({}, parse_rate_limit_headers(None))
+        self.assertEqual({}, parse_rate_limit_headers(MagicMock()))
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_init_bad_rate(self):
+        """Test rate must be positive"""
+        self.assertRaises(ValueError, TokenBucket, 0)
+
+    @patch("src.stac_utils.rate_limit.time.monotonic", return_value=100.0)
+    def test_reserve(self, mock_monotonic: MagicMock):
+        """Test reserve spends the burst then paces at the rate"""
+        test_bucket = TokenBucket(rate=2.0, capacity=2)
+
+        self.assertEqual(0.0, test_bucket.reserve())
+        self.assertEqual(0.0, test_bucket.reserve())
+        self.assertAlmostEqual(0.5, test_bucket.reserve())
+        self.assertAlmostEqual(1.0, test_bucket.reserve())
+
+        # tokens refill over time, up to capacity
+        mock_monotonic.return_value = 110.0
+        self.assertEqual(0.0, test_bucket.reserve())
+        self.assertEqual(0.0, test_bucket.reserve())
+        self.assertAlmostEqual(0.5, test_bucket.reserve())
+
+    @patch("src.stac_utils.rate_limit.time.monotonic", return_value=100.0)
+    def test_pause(self, mock_monotonic: MagicMock):
+        """Test pause holds reservations, then the bucket is full again"""
+        test_bucket = TokenBucket(rate=1.0, capacity=2)
+        test_bucket.reserve()
+        test_bucket.reserve()
+
+        test_bucket.pause(10)
+        self.assertEqual(10.0, test_bucket.reserve())
+        self.assertEqual(10.0, test_bucket.reserve())
+        self.assertEqual(11.0, test_bucket.reserve())
+
+        # a shorter pause doesn't cut an existing one short
+        test_bucket.pause(1)
+        self.assertEqual(12.0, test_bucket.reserve())
+
+    @patch("src.stac_utils.rate_limit.time.sleep")
+    def test_acquire(self, mock_sleep: MagicMock):
+        """Test acquire only sleeps when the bucket is empty"""
+        test_bucket = TokenBucket(rate=1.0)
+        test_bucket.reserve = MagicMock(side_effect=[0.0, 0.75])
+
+        test_bucket.acquire()
+        mock_sleep.assert_not_called()
+
+        self.assertEqual(0.75, test_bucket.acquire())
+        mock_sleep.assert_called_once_with(0.75)
+
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    def test_acquire_async(self, mock_sleep: AsyncMock):
+        """Test async acquire awaits the wait instead of blocking"""
+        test_bucket = TokenBucket(rate=1.0)
+        test_bucket.reserve = MagicMock(return_value=0.25)
+
+        self.assertEqual(0.25, asyncio.run(test_bucket.acquire_async()))
+        mock_sleep.assert_awaited_once_with(0.25)
+
+    @patch("src.stac_utils.rate_limit.time.sleep")
+    def test_acquire_deadline(self, mock_sleep: MagicMock):
+        """Test acquire raises instead of waiting past the deadline, keeping the token"""
+        test_bucket = TokenBucket(rate=0.1)
+        test_bucket.acquire()
+
+        with deadline(seconds=1):
+            self.assertRaises(DeadlineExceededException, test_bucket.acquire)
+            with self.assertRaises(DeadlineExceededException):
+                asyncio.run(test_bucket.acquire_async())
+        mock_sleep.assert_not_called()
+        self.assertAlmostEqual(10.0, test_bucket.reserve(), delta=0.1)
+
+    @patch("src.stac_utils.rate_limit.time.monotonic", return_value=100.0)
+    def test_reserve_threads_share_budget(self, mock_monotonic: MagicMock):
+        """Test concurrent reservations queue up one after another"""
+        test_bucket = TokenBucket(rate=10.0)
+        waits = []
+        lock = threading.Lock()
+
+        def reserve():
+            wait = test_bucket.reserve()
+            with lock:
+                waits.append(round(wait, 6))
+
+        threads = [threading.Thread(target=reserve) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([round(i / 10, 6) for i in range(20)], sorted(waits))
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_bucket_rate_from_rate_limits(self):
+        """Test rate limits tuples are requests per window of minutes"""
+        test_limiter = RateLimiter({"people": (120, 1)})
+        self.assertEqual(2.0, test_limiter.buckets["people"].rate)
+
+    def test_bucket_for(self):
+        """Test endpoints match their longest rate limit prefix"""
+        test_limiter = RateLimiter({"people": (60, 1), "people/find": (6, 1)})
+
+        people = test_limiter.buckets["people"]
+        people_find = test_limiter.buckets["people/find"]
+        self.assertIs(people, test_limiter.bucket_for("people"))
+        self.assertIs(people, test_limiter.bucket_for("/people/123?$expand=x"))
+        self.assertIs(people_find, test_limiter.bucket_for("people/find"))
+        self.assertIsNone(test_limiter.bucket_for("peoples"))
+        self.assertIsNone(test_limiter.bucket_for("events"))
+
+    def test_bucket_for_global(self):
+        """Test a blank key paces every endpoint"""
+        test_limiter = RateLimiter({"/": (60, 1)})
+        self.assertIs(test_limiter.buckets[""], test_limiter.bucket_for("events"))
+
+    def test_wait_no_limit(self):
+        """Test wait is free for endpoints without a limit"""
+        test_limiter = RateLimiter()
+        self.assertEqual(0.0, test_limiter.wait("foo"))
+        self.assertEqual(0.0, asyncio.run(test_limiter.wait_async("foo")))
+
+    @patch("src.stac_utils.rate_limit.time.sleep")
+    @patch("src.stac_utils.rate_limit.time.monotonic", return_value=100.0)
+    def test_pause_without_bucket(self, mock_monotonic: MagicMock, mock_sleep):
+        """Test pausing an endpoint without a bucket holds the whole limiter"""
+        test_limiter = RateLimiter()
+        test_limiter.pause("foo", 3)
+        test_limiter.pause("foo", None)
+
+        self.assertEqual(3.0, test_limiter.wait("bar"))
+        mock_sleep.assert_called_once_with(3.0)
+
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    @patch("src.stac_utils.rate_limit.time.sleep")
+    def test_pause_deadline(self, mock_sleep: MagicMock, mock_async_sleep: AsyncMock):
+        """Test a pause longer than the deadline raises instead of sleeping"""
+        test_limiter = RateLimiter()
+        test_limiter.pause("foo", 30)
+
+        with deadline(seconds=1):
+            self.assertRaises(DeadlineExceededException, test_limiter.wait, "foo")
+            with self.assertRaises(DeadlineExceededException):
+                asyncio.run(test_limiter.wait_async("foo"))
+        mock_sleep.assert_not_called()
+        mock_async_sleep.assert_not_awaited()
+
+    def test_pause_with_bucket(self):
+        """Test pausing an endpoint with a bucket only pauses that bucket"""
+        test_limiter = RateLimiter({"foo": (60, 1)})
+        test_limiter.buckets["foo"].pause = MagicMock()
+
+        test_limiter.pause("foo/1", 3)
+        test_limiter.buckets["foo"].pause.assert_called_once_with(3)
+        self.assertEqual(0.0, test_limiter.wait("bar"))
+
+    def test_wait(self):
+        """Test wait acquires from the matching bucket"""
+        test_limiter = RateLimiter({"foo": (60, 1)})
+        test_limiter.buckets["foo"].acquire = MagicMock(return_value=0.5)
+        self.assertEqual(0.5, test_limiter.wait("foo/bar"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from src.stac_utils.retry import RetryPolicy
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_init_bad_backoff(self):
+        """Test unknown backoff raises"""
+        self.assertRaises(ValueError, RetryPolicy, backoff="fibonacci")
+
+    def test_get_max_delay(self):
+        """Test each backoff ladder"""
+        exponential = RetryPolicy(base_delay=2, max_delay=10)
+        self.assertEqual(
+            [0.0, 2.0, 4.0, 8.0, 10.0],
+            [exponential.get_max_delay(attempt) for attempt in range(5)],
+        )
+
+        linear = RetryPolicy(backoff="linear", base_delay=7, max_delay=None)
+        self.assertEqual(
+            [0.0, 7.0, 14.0, 21.0],
+            [linear.get_max_delay(attempt) for attempt in range(4)],
+        )
+
+        constant = RetryPolicy(backoff="constant", base_delay=3)
+        self.assertEqual(
+            [0.0, 3.0, 3.0], [constant.get_max_delay(attempt) for attempt in range(3)]
+        )
+
+    @patch("src.stac_utils.retry.random.uniform", return_value=0.5)
+    def test_get_delay_full_jitter(self, mock_uniform: MagicMock):
+        """Test full jitter picks between zero and the backoff"""
+        test_policy = RetryPolicy(base_delay=2)
+
+        self.assertEqual(0.0, test_policy.get_delay(0))
+        mock_uniform.assert_not_called()
+
+        self.assertEqual(0.5, test_policy.get_delay(3))
+        mock_uniform.assert_called_once_with(0, 8.0)
+
+    def test_get_delay_no_jitter(self):
+        """Test delay is the backoff without jitter"""
+        test_policy = RetryPolicy(base_delay=2, jitter=False)
+        self.assertEqual(4.0, test_policy.get_delay(2))
+
+    def test_should_retry_max_retries(self):
+        """Test retries stop after max_retries"""
+        test_policy = RetryPolicy(max_retries=2)
+        self.assertTrue(test_policy.should_retry(1, 503))
+        self.assertTrue(test_policy.should_retry(2, 503))
+        self.assertFalse(test_policy.should_retry(3, 503))
+
+    def test_should_retry_statuses(self):
+        """Test only retry statuses are retried"""
+        test_policy = RetryPolicy()
+        self.assertTrue(test_policy.should_retry(1, 429))
+        self.assertFalse(test_policy.should_retry(1, 400))
+
+        any_status = RetryPolicy(retry_statuses=None)
+        self.assertTrue(any_status.should_retry(1, 400))
+
+    def test_should_retry_status_rules(self):
+        """Test per-status rules override max_retries"""
+        test_policy = RetryPolicy(
+            max_retries=5, retry_statuses=None, status_rules={404: 0, 429: 1}
+        )
+        self.assertFalse(test_policy.should_retry(1, 404))
+        self.assertTrue(test_policy.should_retry(1, 429))
+        self.assertFalse(test_policy.should_retry(2, 429))
+        self.assertTrue(test_policy.should_retry(2, 500))
+
+    def test_should_retry_exceptions(self):
+        """Test exceptions are retried only if they're retry exceptions"""
+        test_policy = RetryPolicy()
+        self.assertTrue(
+            test_policy.should_retry(1, exception=requests.exceptions.ConnectionError())
+        )
+        self.assertFalse(test_policy.should_retry(1, exception=KeyError()))
+        # a status code wins over the exception type
+        self.assertTrue(test_policy.should_retry(1, 503, KeyError()))
+
+    @patch("src.stac_utils.retry.time.monotonic", return_value=100.0)
+    def test_should_retry_deadline(self, mock_monotonic: MagicMock):
+        """Test retries stop once the backoff would pass the deadline"""
+        test_policy = RetryPolicy(base_delay=4, deadline=30)
+
+        self.assertTrue(test_policy.should_retry(1, 503, started=90.0))
+        # 12s elapsed + 8s backoff fits, 25s elapsed + 8s backoff doesn't
+        self.assertTrue(test_policy.should_retry(2, 503, started=88.0))
+        self.assertFalse(test_policy.should_retry(2, 503, started=75.0))
+        # no start time, no deadline
+        self.assertTrue(test_policy.should_retry(2, 503))
+
+
+if __name__ == "__main__":
+    unittest.main()